@@ -73,6 +73,23 @@ auth_params:   Final[Dict[str, Any]] = {
 token_type: Final = "bearer"
 token_algorithm: Final = "HS256"
 token_expire_minutes: Final = 60
+token_expires_format: Final = "%Y-%m-%d %H:%M:%S"
+# Verified tokens kept in memory by get_current_user.
+token_cache_size: Final = 1024
+
+# Password hashing: bcrypt cost, worker threads and the longest queue of waiting checks.
+password_bcrypt_rounds: Final = 12
+password_hash_workers: Final = 2
+password_hash_queue: Final = 64
+
+# Login throttling: token bucket size and refill rate (tokens per second) per email and per client IP.
+login_rate_email_capacity: Final = 5
+login_rate_email_refill: Final = 1 / 60
+login_rate_ip_capacity: Final = 20
+login_rate_ip_refill: Final = 1 / 6
+# Buckets kept in memory and the interval between purges of idle buckets in the database (s).
+login_rate_limit_keys: Final = 10_000
+login_rate_limit_purge_interval: Final = 600.0
 
 # Storage service constants
 storage_tags: Final[List[str | Enum] | None] = ["Storage"]
@@ -82,6 +99,10 @@ storage_params:   Final[Dict[str, Any]] = {
     "prefix": f"/{storage_url}", 
     "tags": storage_tags
     }
+storage_low_stock_threshold: Final = 1
+storage_movements_limit: Final = 50
+storage_search_limit: Final = 50
+storage_number_cache_size: Final = 4096
 
 # Converters service constants
 converters_tags: Final[List[str | Enum] | None] = ["Converters"]
@@ -100,6 +121,54 @@ sensors_params:   Final[Dict[str, Any]] = {
     "prefix": f"/{sensors_url}", 
     "tags": sensors_tags
     }
+sensor_buffer_capacity: Final = 100_000
+sensor_batch_size: Final = 2000
+sensor_flush_interval: Final = 1.0
+sensor_date_cache_size: Final = 4096
+sensor_stream_chunk_size: Final = 1000
+# Длины интервалов агрегатов показаний в миллисекундах: минута, час, сутки.
+sensor_rollup_resolutions: Final = (60_000, 3_600_000, 86_400_000)
+sensor_rollup_points: Final = 500
+sensor_max_points: Final = 10_000
+# Наибольшее количество показаний в памяти при прореживании: длинный интервал
+# сначала сжимается до первой, последней, наименьшей и наибольшей точки частей.
+sensor_downsample_candidates: Final = 50_000
+sensor_latest_refresh_interval: Final = 5.0
+# Окно последних показаний в памяти: 12 часов при показании раз в 10 секунд.
+sensor_window_capacity: Final = 4320
+sensor_window_max_sensors: Final = 512
+sensor_stream_batch_size: Final = 5000
+# Наибольшая длина строки NDJSON и строкового протокола и размер бинарного пакета показаний.
+sensor_max_line_bytes: Final = 4096
+sensor_max_body_bytes: Final = 16 * 1024 * 1024
+sensor_alert_config_ttl: Final = 30
+sensor_alerts_limit: Final = 100
+# Обнаружение аномалий: вес EWMA, порог |z| и число показаний до начала оценки.
+sensor_anomaly_alpha: Final = 0.05
+sensor_anomaly_threshold: Final = 3.0
+sensor_anomaly_warmup: Final = 30
+# Количество последних ключей (address, ts), по которым отбрасываются повторные показания.
+sensor_dedup_keys: Final = 200_000
+# Обслуживание показаний: интервал проходов (с), часть выгрузки, суток за проход, пауза (с).
+sensor_retention_interval: Final = 3600.0
+sensor_retention_chunk_size: Final = 5000
+sensor_retention_max_days: Final = 7
+sensor_retention_pause: Final = 0.1
+# Потоки событий датчиков: размер очереди подписчика и интервал keepalive (с).
+sensor_events_queue_size: Final = 256
+sensor_events_keepalive: Final = 15.0
+
+# Speed service constants
+speed_tags: Final[List[str | Enum] | None] = ["Speeds"]
+speed_url: Final = "speeds"
+
+speed_params:   Final[Dict[str, Any]] = {
+    "prefix": f"/{speed_url}", 
+    "tags": speed_tags
+    }
+speed_table_cache_size: Final = 1024
+speed_table_cache_ttl: Final = 600
+speed_lut_cache_size: Final = 64
 
 # Posts service constants
 post_tags: Final[List[str | Enum] | None] = ["Posts"]
@@ -109,6 +178,9 @@ post_params:   Final[Dict[str, Any]] = {
     "prefix": f"/{post_url}", 
     "tags": post_tags
     }
+post_page_size: Final = 20
+post_page_size_max: Final = 100
+post_count_cache_ttl: Final = 60
 
 # Manuals service constants
 manual_tags: Final[List[str | Enum] | None] = ["Manuals"]
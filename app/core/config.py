@@ -1,4 +1,4 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Literal
 from pydantic import Field, SecretStr
 from pydantic_settings import (
     BaseSettings,
@@ -21,6 +21,15 @@ class Settings(BaseSettings):
     dsn: str =  Field(default="sqlite+aiosqlite:///./database_aedb.db")
     docs_access: bool = True
 
+    sensor_window_path: str | None = None
+    sensor_listener_host: str = "0.0.0.0"
+    sensor_udp_port: int | None = None
+    sensor_tcp_port: int | None = None
+    sensor_retention_days: int | None = None
+    sensor_archive_path: str | None = None
+
+    login_rate_limit_backend: Literal["memory", "database"] = "memory"
+
     allow_origins: List[str] = Field(default_factory=list)
     allow_credentials: bool = True
     allow_methods: List[str] = ["*"]
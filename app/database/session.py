@@ -6,6 +6,7 @@
 
 Основные компоненты:
 - DatabaseSession: Класс для настройки подключения к базе данных и создания фабрики сессий.
+- get_session_factory: Общая для процесса фабрика сессий (движок и пул соединений создаются один раз).
 - SessionContextManager: Контекстный менеджер для управления жизненным циклом сессий.
 - get_db_session: Асинхронный генератор для получения сессии базы данных.
 
@@ -13,6 +14,7 @@
 в асинхронных приложениях.
 """
 
+from functools import lru_cache
 from typing import Dict, Any
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
@@ -138,6 +140,20 @@ class DatabaseSession():
         return session_factory
 
 
+@lru_cache(maxsize=1)
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """
+    Возвращает общую для процесса фабрику сессий.
+
+    Движок и пул соединений создаются при первом вызове и переиспользуются
+    всеми запросами и фоновыми задачами.
+
+    Returns:
+        async_sessionmaker[AsyncSession]: Фабрика асинхронных сессий.
+    """
+    return DatabaseSession(config).create_async_session_factory()
+
+
 class SessionContextManager():
     """
     Контекстный менеджер для управления сессиями базы данных.
@@ -147,8 +163,7 @@ class SessionContextManager():
         """
         Инициализирует экземпляр SessionContextManager.
         """
-        self.db_session = DatabaseSession(config)
-        self.session_factory = self.db_session.create_async_session_factory()
+        self.session_factory = get_session_factory()
         self.session = None
 
     async def __aenter__(self) -> 'SessionContextManager':
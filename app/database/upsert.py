@@ -0,0 +1,34 @@
+"""
+Модуль для построения INSERT-запросов с поддержкой ON CONFLICT.
+
+SQLAlchemy предоставляет конструкции ``on_conflict_do_update`` и
+``on_conflict_do_nothing`` только в диалектных вариантах ``insert``.
+Функция dialect_insert выбирает нужный вариант по диалекту, к которому
+привязана сессия, что позволяет одинаково выполнять upsert в SQLite и PostgreSQL.
+"""
+from typing import Any
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def dialect_insert(session: AsyncSession, model: Any):
+    """
+    Создает INSERT-запрос для диалекта, к которому привязана сессия.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        model (Any): Модель или таблица для вставки.
+
+    Returns:
+        Insert: Диалектный INSERT-запрос с поддержкой ON CONFLICT.
+
+    Raises:
+        NotImplementedError: Если диалект не поддерживает ON CONFLICT.
+    """
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        return postgresql.insert(model)
+    if dialect_name == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"Диалект {dialect_name} не поддерживает ON CONFLICT")
@@ -1,8 +1,17 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.routers import all_routers
+from app.services.sensors import sensor_buffer, sensor_window
+from app.services.sensor_listener import sensor_listener
+from app.services.sensor_alerts import sensor_alert_engine
+from app.services.sensor_retention import sensor_retention_job
+from app.services.sensor_events import sensor_event_hub
+from app.services.cabinet_health import refresh_on_flush
 from app.middlewares.docs_blocker import BlockDocsMiddleware
 from app.const import (
     app_params,
@@ -10,9 +19,27 @@ from app.const import (
     static_params
 )
 from app.version import __version__
-from app.core.config import cors_params
+from app.core.config import config, cors_params
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Запускает фоновые задачи приложения и корректно завершает их при остановке."""
+    sensor_buffer.add_flush_handler(sensor_alert_engine.evaluate)
+    sensor_buffer.add_flush_handler(refresh_on_flush)
+    sensor_buffer.add_commit_handler(sensor_event_hub.on_commit)
+    await sensor_buffer.start()
+    await sensor_listener.start(config.sensor_listener_host, config.sensor_udp_port, config.sensor_tcp_port)
+    await sensor_retention_job.start()
+    try:
+        yield
+    finally:
+        await sensor_retention_job.stop()
+        await sensor_listener.stop()
+        await sensor_buffer.stop()
+        sensor_event_hub.close()
+        sensor_window.flush()
 
-app = FastAPI(**app_params)
+app = FastAPI(**app_params, lifespan=lifespan)
 
 app.mount(**static_params)
 
@@ -1,5 +1,6 @@
 from typing import List
 
+from sqlalchemy import String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import SQLModel
 from app.models.posts import PostModel
@@ -12,11 +13,33 @@ class UserModel(SQLModel):
     name: Mapped[str] = mapped_column("name")
     hashed_password: Mapped[str] = mapped_column("hashed_password")
 
+    # Posts are loaded only when a query asks for them (selectinload);
+    # implicit loading raises instead of hydrating every post of the user.
     posts: Mapped[List["PostModel"]] = relationship(
         back_populates="author",
-        lazy='joined',
+        lazy='raise',
         cascade="all, delete-orphan",
     )
 
     def __repr__(self):
         return f"User(id={self.id}, name='{self.name}', email='{self.email}')"
+
+
+class LoginBucketModel(SQLModel):
+    """
+    Модель для представления корзины токенов ограничения попыток входа.
+
+    Общая для всех процессов приложения при login_rate_limit_backend="database".
+
+    Attributes:
+        key (str): Ключ корзины: email:<SHA-256 адреса> или ip:<SHA-256 адреса>.
+        tokens (float): Оставшиеся токены.
+        updated_at (float): Время последнего обращения (Unix).
+        allowed (bool): Разрешена ли последняя попытка.
+    """
+    __tablename__ = "login_buckets"
+
+    key: Mapped[str] = mapped_column("key", String(400), primary_key=True)
+    tokens: Mapped[float] = mapped_column("tokens")
+    updated_at: Mapped[float] = mapped_column("updated_at", index=True)
+    allowed: Mapped[bool] = mapped_column("allowed", default=True)
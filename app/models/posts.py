@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey, String, Text
+from sqlalchemy import ForeignKey, Index, String, Text
 
 from app.models.base import SQLModel
 if TYPE_CHECKING:
@@ -9,7 +9,11 @@ if TYPE_CHECKING:
 
 class PostModel(SQLModel):
     __tablename__ = "posts"
-    
+    __table_args__ = (
+        # Курсорная пагинация ленты по (created_at, id)
+        Index("ix_posts_created_at_id", "created_at", "id"),
+    )
+
     id: Mapped[int] = mapped_column("id", primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     content: Mapped[str] = mapped_column("content", Text())
@@ -18,6 +22,6 @@ class PostModel(SQLModel):
     title: Mapped[str] = mapped_column("title", String(100))
     description: Mapped[str] = mapped_column("description", Text())
 
-    author: Mapped["UserModel"] = relationship(back_populates="posts")
+    author: Mapped["UserModel"] = relationship(back_populates="posts", lazy="raise")
     def __repr__(self) -> str:
         return f"Post(id={self.id!r}, title={self.title!r}, description={self.description!r})"
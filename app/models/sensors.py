@@ -0,0 +1,241 @@
+"""
+Модуль, содержащий модели данных для показаний датчиков.
+
+Этот модуль определяет следующие модели SQLAlchemy:
+- SensorReadingModel: представляет одно показание датчика
+- SensorRollupModel: представляет агрегаты показаний датчика за интервал
+- SensorLatestModel: представляет последнее показание датчика
+- SensorDeviceModel: представляет датчик, его группу и шкаф
+- CabinetHealthModel: представляет сводное состояние шкафа привода
+- SensorAlertRuleModel: представляет правило оповещения
+- SensorAlertModel: представляет срабатывание правила оповещения
+
+Показания записываются пакетами из буфера приёма (см. app.services.sensors),
+поэтому таблица только дополняется и не содержит внешних ключей.
+
+Время показания разбирается один раз при приёме и хранится целым числом
+миллисекунд Unix (ts). Запросы по датчику за интервал времени выполняются
+просмотром диапазона индекса (address, ts), который в PostgreSQL включает
+значения показаний и не требует обращения к таблице. Номер суток (day)
+задаёт разбиение таблицы на дневные части: по нему удаляются и архивируются
+старые показания без просмотра всей таблицы.
+
+Агрегаты (минимум, максимум, сумма и количество) за минуту, час и сутки
+обновляются инкрементально в той же транзакции, что и запись пакета
+показаний, поэтому графики за недели строятся без чтения сырых показаний.
+"""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, DateTime, BigInteger, Index, ForeignKey, text
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import SQLModel
+from app.models.speed import moscow_tz
+
+class SensorReadingModel(SQLModel):
+    """
+    Модель для представления показания датчика.
+
+    Attributes:
+        id (int): Уникальный идентификатор показания.
+        name (str): Название датчика.
+        address (str): Адрес датчика.
+        date (str): Время показания в том виде, в котором его передал датчик.
+        ts (int): Время показания в миллисекундах Unix.
+        day (int): Номер суток показания от 1970-01-01 (UTC).
+        status (str): Состояние датчика.
+        battery (float): Заряд батареи.
+        temperature (float): Температура.
+        received_at (datetime): Время приёма показания сервером.
+    """
+    __tablename__ = "sensor_readings"
+    __table_args__ = (
+        Index(
+            "ix_sensor_readings_address_ts", "address", "ts",
+            unique=True,
+            postgresql_include=["status", "battery", "temperature"],
+        ),
+        Index("ix_sensor_readings_day", "day"),
+    )
+
+    id: Mapped[int] = mapped_column("id", primary_key=True)
+    name: Mapped[str] = mapped_column("name", String(100))
+    address: Mapped[str] = mapped_column("address", String(100))
+    date: Mapped[str] = mapped_column("date", String(50))
+    ts: Mapped[int] = mapped_column("ts", BigInteger)
+    day: Mapped[int] = mapped_column("day")
+    status: Mapped[str] = mapped_column("status", String(50))
+    battery: Mapped[float] = mapped_column("battery")
+    temperature: Mapped[float] = mapped_column("temperature")
+    received_at: Mapped[datetime] = mapped_column(
+        "received_at", DateTime(timezone=True), default=lambda: datetime.now(moscow_tz)
+    )
+
+
+class SensorRollupModel(SQLModel):
+    """
+    Модель для представления агрегатов показаний датчика за интервал.
+
+    Среднее значение вычисляется как сумма, делённая на количество, поэтому
+    агрегаты можно дополнять новыми показаниями без пересчёта.
+
+    Attributes:
+        resolution (int): Длина интервала в миллисекундах.
+        address (str): Адрес датчика.
+        bucket (int): Начало интервала в миллисекундах Unix.
+        count (int): Количество показаний.
+        temperature_min (float): Наименьшая температура.
+        temperature_max (float): Наибольшая температура.
+        temperature_sum (float): Сумма температур.
+        battery_min (float): Наименьший заряд батареи.
+        battery_max (float): Наибольший заряд батареи.
+        battery_sum (float): Сумма зарядов батареи.
+    """
+    __tablename__ = "sensor_rollups"
+
+    resolution: Mapped[int] = mapped_column("resolution", primary_key=True)
+    address: Mapped[str] = mapped_column("address", String(100), primary_key=True)
+    bucket: Mapped[int] = mapped_column("bucket", BigInteger, primary_key=True)
+    count: Mapped[int] = mapped_column("count")
+    temperature_min: Mapped[float] = mapped_column("temperature_min")
+    temperature_max: Mapped[float] = mapped_column("temperature_max")
+    temperature_sum: Mapped[float] = mapped_column("temperature_sum")
+    battery_min: Mapped[float] = mapped_column("battery_min")
+    battery_max: Mapped[float] = mapped_column("battery_max")
+    battery_sum: Mapped[float] = mapped_column("battery_sum")
+
+
+class SensorLatestModel(SQLModel):
+    """
+    Модель для представления последнего показания датчика.
+
+    Строка датчика обновляется при записи каждого пакета показаний, если
+    в пакете есть более позднее показание, поэтому текущее состояние всех
+    датчиков читается без поиска последнего показания в sensor_readings.
+
+    Attributes:
+        address (str): Адрес датчика.
+        name (str): Название датчика.
+        ts (int): Время показания в миллисекундах Unix.
+        status (str): Состояние датчика.
+        battery (float): Заряд батареи.
+        temperature (float): Температура.
+    """
+    __tablename__ = "sensor_latest"
+
+    address: Mapped[str] = mapped_column("address", String(100), primary_key=True)
+    name: Mapped[str] = mapped_column("name", String(100))
+    ts: Mapped[int] = mapped_column("ts", BigInteger)
+    status: Mapped[str] = mapped_column("status", String(50))
+    battery: Mapped[float] = mapped_column("battery")
+    temperature: Mapped[float] = mapped_column("temperature")
+
+
+class SensorDeviceModel(SQLModel):
+    """
+    Модель для представления датчика.
+
+    Группа датчика определяет, какие правила оповещений к нему применяются,
+    а шкаф — в сводное состояние какого шкафа привода входят его показания.
+
+    Attributes:
+        address (str): Адрес датчика.
+        name (str): Название датчика.
+        group (str | None): Группа датчика.
+        cabinet_id (int | None): ID шкафа, в котором установлен датчик.
+    """
+    __tablename__ = "sensor_devices"
+
+    address: Mapped[str] = mapped_column("address", String(100), primary_key=True)
+    name: Mapped[str] = mapped_column("name", String(100))
+    group: Mapped[Optional[str]] = mapped_column("group", String(100), default=None, index=True)
+    cabinet_id: Mapped[Optional[int]] = mapped_column(
+        "cabinet_id", ForeignKey("cabinets.id", ondelete="SET NULL"), default=None, index=True
+    )
+
+
+class CabinetHealthModel(SQLModel):
+    """
+    Модель для представления сводного состояния шкафа привода.
+
+    Таблица играет роль материализованного представления: строка шкафа
+    пересчитывается по sensor_latest и converters при записи пакета показаний
+    его датчиков и при изменении преобразователей (см. app.services.cabinet_health).
+
+    Attributes:
+        cabinet_id (int): ID шкафа.
+        max_temperature (float | None): Наибольшая температура датчиков шкафа.
+        min_battery (float | None): Наименьший заряд батареи датчиков шкафа.
+        sensor_count (int): Количество датчиков шкафа с показаниями.
+        converter_count (int): Количество преобразователей в шкафу.
+        ts (int | None): Время последнего показания датчиков шкафа в миллисекундах Unix.
+    """
+    __tablename__ = "cabinet_health"
+
+    cabinet_id: Mapped[int] = mapped_column(
+        "cabinet_id", ForeignKey("cabinets.id", ondelete="CASCADE"), primary_key=True
+    )
+    max_temperature: Mapped[Optional[float]] = mapped_column("max_temperature", default=None)
+    min_battery: Mapped[Optional[float]] = mapped_column("min_battery", default=None)
+    sensor_count: Mapped[int] = mapped_column("sensor_count", default=0)
+    converter_count: Mapped[int] = mapped_column("converter_count", default=0)
+    ts: Mapped[Optional[int]] = mapped_column("ts", BigInteger, default=None)
+
+class SensorAlertRuleModel(SQLModel):
+    """
+    Модель для представления правила оповещения.
+
+    Правило вида min срабатывает, когда показание ниже порога, max — когда
+    выше, rise — когда показание выросло больше чем на порог относительно
+    минимума за последние window секунд.
+
+    Attributes:
+        id (int): Уникальный идентификатор правила.
+        group (str | None): Группа датчиков. Если None, правило применяется ко всем датчикам.
+        field (str): Показание: battery или temperature.
+        kind (str): Вид правила: min, max или rise.
+        threshold (float): Порог.
+        window (int): Окно правила rise в секундах.
+        enabled (bool): Признак действующего правила.
+    """
+    __tablename__ = "sensor_alert_rules"
+
+    id: Mapped[int] = mapped_column("id", primary_key=True)
+    group: Mapped[Optional[str]] = mapped_column("group", String(100), default=None)
+    field: Mapped[str] = mapped_column("field", String(20))
+    kind: Mapped[str] = mapped_column("kind", String(10))
+    threshold: Mapped[float] = mapped_column("threshold")
+    window: Mapped[int] = mapped_column("window", default=300)
+    enabled: Mapped[bool] = mapped_column("enabled", default=True)
+
+class SensorAlertModel(SQLModel):
+    """
+    Модель для представления срабатывания правила оповещения.
+
+    Для пары (правило, датчик) открыто не больше одного оповещения:
+    повторное нарушение не создаёт новую строку, а возврат показания
+    в норму закрывает оповещение.
+
+    Attributes:
+        id (int): Уникальный идентификатор оповещения.
+        rule_id (int): ID правила.
+        address (str): Адрес датчика.
+        value (float): Показание, вызвавшее срабатывание.
+        fired_at (int): Время срабатывания в миллисекундах Unix.
+        resolved_at (int | None): Время возврата в норму или None, если оповещение активно.
+    """
+    __tablename__ = "sensor_alerts"
+    __table_args__ = (
+        Index(
+            "ix_sensor_alerts_active", "address", "rule_id",
+            postgresql_where=text("resolved_at IS NULL"),
+            sqlite_where=text("resolved_at IS NULL"),
+        ),
+        Index("ix_sensor_alerts_fired_at", "fired_at"),
+    )
+
+    id: Mapped[int] = mapped_column("id", primary_key=True)
+    rule_id: Mapped[int] = mapped_column(ForeignKey(SensorAlertRuleModel.id, ondelete="CASCADE"))
+    address: Mapped[str] = mapped_column("address", String(100))
+    value: Mapped[float] = mapped_column("value")
+    fired_at: Mapped[int] = mapped_column("fired_at", BigInteger)
+    resolved_at: Mapped[Optional[int]] = mapped_column("resolved_at", BigInteger, default=None)
@@ -5,6 +5,7 @@
 - ReelModel: представляет моталку
 - RollModel: представляет формирующий ролик моталки
 - SpeedModel: представляет параметры скоростей формирующего ролика моталки
+- SpeedHistoryModel: представляет версию набора параметров скоростей ролика
 
 Каждая модель наследуется от базового класса SQLModel и определяет 
 соответствующие поля и отношения между таблицами базы данных.
@@ -16,11 +17,11 @@
 для выполнения операций с базой данных, связанных с инструкциями по эксплуатации.
 """
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List
 import pytz
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import String, ForeignKey, Index, DateTime, JSON
 
 from app.models.base import SQLModel
 
@@ -86,7 +87,7 @@ class RollModel(SQLModel):
     reel_id: Mapped["int"] = mapped_column(ForeignKey(ReelModel.id, ondelete="CASCADE"))
         
     reel: Mapped["ReelModel"] = relationship("ReelModel", back_populates="rolls")
-    speeds: Mapped[List["SpeedModel"]] = relationship("SpeedModel", back_populates="rolls")
+    speeds: Mapped[List["SpeedModel"]] = relationship("SpeedModel", back_populates="roll")
 
 class SpeedModel(SQLModel):
     """
@@ -108,6 +109,9 @@ class SpeedModel(SQLModel):
         roll (relationship): Формирующий ролик, к которому относится этот параметр скорости.
     """
     __tablename__ = "speeds"
+    __table_args__ = (
+        Index("ix_speeds_roll_id_task", "roll_id", "task"),
+    )
 
     id: Mapped[int] = mapped_column("id", primary_key=True, index=True)
     task: Mapped[float] = mapped_column("task", nullable=False)
@@ -123,3 +127,29 @@ class SpeedModel(SQLModel):
     updated_at: Mapped[datetime] = mapped_column("updated_at", default=lambda: datetime.now(moscow_tz), onupdate=lambda: datetime.now(moscow_tz))
     roll: Mapped["RollModel"] = relationship("RollModel", back_populates="speeds")
     roll_id: Mapped[int] = mapped_column(ForeignKey(RollModel.id, ondelete="CASCADE"))
+
+class SpeedHistoryModel(SQLModel):
+    """
+    Модель для представления версии набора параметров скоростей формирующего ролика.
+
+    История только дополняется: каждое изменение таблицы скоростей ролика
+    сохраняет полный набор её строк с моментом начала действия. Версия,
+    действовавшая в момент времени, находится одним поиском по индексу
+    (roll_id, valid_from), а текущие чтения обслуживаются таблицей speeds
+    и не зависят от размера истории.
+
+    Attributes:
+        id (int): Уникальный идентификатор версии.
+        roll_id (int): ID формирующего ролика.
+        valid_from (datetime): Момент, с которого действует набор параметров.
+        speeds (List[Dict[str, Any]]): Строки таблицы скоростей, отсортированные по заданию.
+    """
+    __tablename__ = "speed_history"
+    __table_args__ = (
+        Index("ix_speed_history_roll_id_valid_from", "roll_id", "valid_from", unique=True),
+    )
+
+    id: Mapped[int] = mapped_column("id", primary_key=True)
+    roll_id: Mapped[int] = mapped_column(ForeignKey(RollModel.id, ondelete="CASCADE"), nullable=False)
+    valid_from: Mapped[datetime] = mapped_column("valid_from", DateTime(timezone=True), nullable=False)
+    speeds: Mapped[List[Dict[str, Any]]] = mapped_column("speeds", JSON, nullable=False)
@@ -1,22 +1,50 @@
+"""
+Модуль, содержащий модели данных для учёта оборудования на складах.
+
+Этот модуль определяет следующие модели SQLAlchemy:
+- StorageLocationModel: представляет место хранения
+- StorageEquipmentModel: представляет единицу оборудования на складе
+- StorageMovementModel: представляет движение оборудования (приход/расход)
+- StorageStockModel: представляет сводный остаток по месту хранения и группе
+
+Журнал движений только дополняется и никогда не изменяется, а сводный остаток
+поддерживается инкрементально при каждом движении, поэтому отчёты по остаткам
+не требуют просмотра всей таблицы оборудования.
+
+Для быстрого поиска на складе оборудование индексируется по номенклатурному
+номеру, по паре (место хранения, группа), а в PostgreSQL дополнительно
+триграммными индексами по названию и характеристикам.
+"""
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import SQLModel
 
 class StorageLocationModel(SQLModel):
-    __tablename__ = 'locations'
-    
+    __tablename__ = 'storage_locations'
+
     id: Mapped[Optional[int]] = mapped_column(primary_key=True, index=True)
     name: Mapped[str]
-    place: Mapped[Optional[str]] = mapped_column(default=None)
-    used_place: Mapped[Optional[str]] = mapped_column(default=None)
-    new_place: Mapped[Optional[str]] = mapped_column(default=None)
+    place: Mapped[Optional[str]] = mapped_column(default=None, index=True)
+    used_place: Mapped[Optional[str]] = mapped_column(default=None, index=True)
+    new_place: Mapped[Optional[str]] = mapped_column(default=None, index=True)
 
     equipment: Mapped[list["StorageEquipmentModel"]] = relationship(back_populates="location")
-    
+
 class StorageEquipmentModel(SQLModel):
     __tablename__ = 'equipment'
+    __table_args__ = (
+        Index("ix_equipment_location_id_group", "location_id", "group"),
+        Index(
+            "ix_equipment_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_equipment_specs_trgm", "specs",
+            postgresql_using="gin", postgresql_ops={"specs": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[Optional[int]] = mapped_column(primary_key=True, index=True)
     group: Mapped[str]
@@ -24,10 +52,55 @@ class StorageEquipmentModel(SQLModel):
     specs: Mapped[Optional[str]] = mapped_column(default=None)
     qty: Mapped[int]
     install: Mapped[Optional[str]] = mapped_column(default=None)
-    number: Mapped[Optional[str]] = mapped_column(default=None)
+    number: Mapped[Optional[str]] = mapped_column(default=None, index=True)
     notes: Mapped[Optional[str]] = mapped_column(default=None)
     created_at: Mapped[datetime] = mapped_column("created_at", default=datetime.now)
     updated_at: Mapped[datetime] = mapped_column("updated_at", default=datetime.now, onupdate=datetime.now)
-    
-    location_id: Mapped[int] = mapped_column(ForeignKey("locations.id"), nullable=False)
+
+    location_id: Mapped[int] = mapped_column(ForeignKey("storage_locations.id"), nullable=False)
     location: Mapped["StorageLocationModel"] = relationship(back_populates="equipment")
+
+class StorageMovementModel(SQLModel):
+    """
+    Модель для представления движения оборудования на складе.
+
+    Записи журнала только добавляются: изменение количества оборудования
+    всегда сопровождается новой записью с приращением и остатком после него.
+
+    Attributes:
+        id (int): Уникальный идентификатор движения.
+        equipment_id (int): ID оборудования.
+        location_id (int): ID места хранения на момент движения.
+        group (str): Группа оборудования на момент движения.
+        delta (int): Приращение количества (положительное — приход, отрицательное — расход).
+        qty_after (int): Количество оборудования после движения.
+        notes (str): Примечание к движению.
+        created_at (datetime): Дата и время движения.
+    """
+    __tablename__ = 'storage_movements'
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    equipment_id: Mapped[int] = mapped_column(ForeignKey("equipment.id", ondelete="CASCADE"), index=True)
+    location_id: Mapped[int] = mapped_column(ForeignKey("storage_locations.id"))
+    group: Mapped[str]
+    delta: Mapped[int]
+    qty_after: Mapped[int]
+    notes: Mapped[Optional[str]] = mapped_column(default=None)
+    created_at: Mapped[datetime] = mapped_column("created_at", default=datetime.now)
+
+class StorageStockModel(SQLModel):
+    """
+    Модель для представления сводного остатка по месту хранения и группе.
+
+    Attributes:
+        location_id (int): ID места хранения.
+        group (str): Группа оборудования.
+        qty (int): Суммарное количество оборудования группы в месте хранения.
+        updated_at (datetime): Дата и время последнего изменения остатка.
+    """
+    __tablename__ = 'storage_stock'
+
+    location_id: Mapped[int] = mapped_column(ForeignKey("storage_locations.id"), primary_key=True)
+    group: Mapped[str] = mapped_column(primary_key=True)
+    qty: Mapped[int] = mapped_column(default=0)
+    updated_at: Mapped[datetime] = mapped_column("updated_at", default=datetime.now, onupdate=datetime.now)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.routers.v1 import main, auth, posts, manuals, sensors, converters
+from app.routers.v1 import main, auth, posts, manuals, sensors, converters, storage, speed
 from app.const import api_prefix
 
 all_routers = APIRouter()
@@ -10,3 +10,5 @@ all_routers.include_router(posts.router, prefix=api_prefix)
 all_routers.include_router(manuals.router, prefix=api_prefix)
 all_routers.include_router(converters.router, prefix=api_prefix)
 all_routers.include_router(sensors.router, prefix=api_prefix)
+all_routers.include_router(storage.router, prefix=api_prefix)
+all_routers.include_router(speed.router, prefix=api_prefix)
@@ -5,8 +5,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.const import auth_params
 from app.database.session import get_db_session
 
-from app.schemas.auth import TokenSchema, CreateUserSchema
-from app.services.auth import AuthService
+from app.schemas.auth import TokenSchema, CreateUserSchema, PasswordHashingStatsSchema
+from app.services.auth import AuthService, password_hasher
+from app.services.rate_limit import throttle_login
 
 router = APIRouter(**auth_params)
 
@@ -32,16 +33,28 @@ async def create_user(
 @router.post("")
 async def authenticate(
     login: OAuth2PasswordRequestForm = Depends(),
+    _throttle: None = Depends(throttle_login),
     session: AsyncSession = Depends(get_db_session)
     ) -> TokenSchema | None:
     """User authentication.
 
+    Attempts are limited per email and per client IP before the password is checked.
+
     Raises:
         HTTPException: 401 Unauthorized
         HTTPException: 404 Not Found
+        HTTPException: 429 Too Many Requests
 
     Returns:
         Access token.
     """
     return await AuthService(session).authenticate(login)
 
+@router.get("/hashing/stats")
+async def get_hashing_stats() -> PasswordHashingStatsSchema:
+    """Password hashing pool load and queueing metrics.
+
+    Returns:
+        Pool metrics.
+    """
+    return password_hasher.stats()
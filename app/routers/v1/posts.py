@@ -1,29 +1,39 @@
-from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.const import post_params
+from app.const import post_params, post_page_size, post_page_size_max
 from app.database.session import get_db_session
 
 from app.schemas.auth import UserSchema
-from app.schemas.posts import PostSchema
+from app.schemas.posts import PostSchema, PostFeedSchema
 from app.services.auth import get_current_user
 from app.services.posts import PostService
 
 router = APIRouter(**post_params)
 
-@router.get("/", response_model=PostSchema)
-async def get_post(
-    post_id: int,
+@router.get("/", response_model=PostFeedSchema)
+async def get_posts(
+    cursor: str | None = None,
+    limit: int = Query(default=post_page_size, ge=1, le=post_page_size_max),
     _user: UserSchema = Depends(get_current_user),
     session: AsyncSession = Depends(get_db_session)
-) -> PostSchema:
-    return PostService(session).get_post(post_id)
+) -> PostFeedSchema:
+    """Лента постов от новых к старым с курсорной пагинацией.
 
-@router.get("/", response_model=List[PostSchema])
-async def get_posts(
+    Raises:
+        HTTPException: 400 Bad Request
+    """
+    return await PostService(session).get_feed(cursor, limit)
+
+@router.get("/{post_id}", response_model=PostSchema)
+async def get_post(
+    post_id: int,
     _user: UserSchema = Depends(get_current_user),
     session: AsyncSession = Depends(get_db_session)
-) -> List[PostSchema]:
+) -> PostSchema:
+    """Пост по ID.
 
-    return PostService(session).get_posts()
\ No newline at end of file
+    Raises:
+        HTTPException: 404 Not Found
+    """
+    return await PostService(session).get_post(post_id)
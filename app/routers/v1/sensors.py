@@ -1,13 +1,278 @@
-from fastapi import APIRouter
-from app.schemas.sensors import SensorData
-from app.const import sensors_params
+from datetime import datetime
+from typing import List, Literal
+from fastapi import APIRouter, Depends, Header, Query, Request, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.session import get_db_session
+from app.schemas.auth import UserSchema
+from app.services.auth import get_current_user
+from app.schemas.sensors import (
+    SensorData,
+    SensorIngestSchema,
+    SensorIngestStatsSchema,
+    SensorRollupSeriesSchema,
+    SensorWindowSchema,
+    SensorAlertSchema,
+    SensorAlertRuleCreateSchema,
+    SensorAlertRuleSchema,
+    SensorDeviceSchema,
+    SensorAnomalySchema,
+    CabinetHealthSchema
+)
+from app.services.cabinet_health import CabinetHealthService
+from app.services.sensor_alerts import SensorAlertService
+from app.services.sensor_anomalies import sensor_anomaly_detector
+from app.services.sensor_events import SensorSubscriber, get_group_addresses, sensor_event_hub, stream_events
+from app.services.sensors import (
+    SensorService,
+    decode_binary_batch,
+    get_recent_readings,
+    ingest_ndjson,
+    read_body,
+    sensor_buffer,
+    stream_readings
+)
+from app.const import sensors_params, sensor_max_points, sensor_alerts_limit, sensor_events_keepalive
+from app.utils.etag import etag_matches
 
 
 router = APIRouter(**sensors_params)
 
 
-@router.post("/receive_data")
-async def receive_data(sensor_data: SensorData):
-    # Обработка полученных данных
-    print(sensor_data)
-    return {"message": sensor_data}
\ No newline at end of file
+@router.post("/receive_data", response_model=SensorIngestSchema, status_code=status.HTTP_202_ACCEPTED)
+async def receive_data(sensor_data: SensorData) -> SensorIngestSchema:
+    """Принимает показания датчиков в буфер для пакетной записи.
+
+    Raises:
+        HTTPException: 429 Too Many Requests
+    """
+    return sensor_buffer.ingest(sensor_data.sensors)
+
+
+@router.post("/receive_ndjson", response_model=SensorIngestSchema, status_code=status.HTTP_202_ACCEPTED)
+async def receive_ndjson(request: Request) -> SensorIngestSchema:
+    """Принимает показания потоком NDJSON (по показанию Sensor на строку) по мере поступления.
+
+    Raises:
+        HTTPException: 413 Content Too Large
+        HTTPException: 422 Unprocessable Entity
+        HTTPException: 429 Too Many Requests
+    """
+    return await ingest_ndjson(request.stream(), sensor_buffer)
+
+
+@router.post("/receive_binary", response_model=SensorIngestSchema, status_code=status.HTTP_202_ACCEPTED)
+async def receive_binary(request: Request) -> SensorIngestSchema:
+    """Принимает бинарный пакет показаний (формат описан в app.services.sensors).
+
+    Raises:
+        HTTPException: 413 Content Too Large
+        HTTPException: 422 Unprocessable Entity
+        HTTPException: 429 Too Many Requests
+    """
+    return sensor_buffer.ingest_records(decode_binary_batch(await read_body(request.stream())))
+
+
+@router.get("/ingest/stats", response_model=SensorIngestStatsSchema)
+async def get_ingest_stats() -> SensorIngestStatsSchema:
+    """Состояние буфера приёма показаний."""
+    return sensor_buffer.stats()
+
+
+@router.get("/alerts", response_model=List[SensorAlertSchema])
+async def get_alerts(
+    active: bool = False,
+    address: str | None = None,
+    limit: int = Query(default=sensor_alerts_limit, ge=1, le=1000),
+    session: AsyncSession = Depends(get_db_session),
+) -> List[SensorAlertSchema]:
+    """Оповещения датчиков, начиная с последних."""
+    return await SensorAlertService(session).get_alerts(active, address, limit)
+
+
+@router.get("/anomalies", response_model=List[SensorAnomalySchema])
+async def get_anomalies() -> List[SensorAnomalySchema]:
+    """Датчики, последнее показание которых отклоняется от их собственной базовой линии (EWMA)."""
+    return sensor_anomaly_detector.anomalies()
+
+
+async def _subscribe(address: List[str] | None, group: List[str] | None) -> SensorSubscriber:
+    """Подписывает на события датчиков с адресами address и датчиков групп group (без фильтров — всех)."""
+    if address is None and group is None:
+        return sensor_event_hub.subscribe()
+    addresses = set(address or [])
+    if group:
+        addresses |= await get_group_addresses(group)
+    return sensor_event_hub.subscribe(addresses)
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream(
+    address: List[str] | None = Query(default=None),
+    group: List[str] | None = Query(default=None),
+) -> StreamingResponse:
+    """Поток Server-Sent Events: события reading (новые показания) и alert (переходы оповещений).
+
+    Медленный клиент отключается при переполнении очереди и должен переподключиться.
+    """
+    subscriber = await _subscribe(address, group)
+    return StreamingResponse(
+        stream_events(subscriber, sensor_event_hub),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def stream_websocket(
+    websocket: WebSocket,
+    address: List[str] | None = Query(default=None),
+    group: List[str] | None = Query(default=None),
+) -> None:
+    """Те же события, что и /stream, сообщениями WebSocket {"event": ..., "data": [...]}."""
+    await websocket.accept()
+    subscriber = await _subscribe(address, group)
+    try:
+        while True:
+            try:
+                message = await subscriber.get(sensor_events_keepalive)
+            except TimeoutError:
+                await websocket.send_text('{"event": "keepalive", "data": []}')
+                continue
+            if message is None:
+                await websocket.close(code=1013)
+                break
+            event, data = message
+            await websocket.send_text(f'{{"event": "{event}", "data": {data}}}')
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sensor_event_hub.unsubscribe(subscriber)
+
+
+@router.get("/alert_rules", response_model=List[SensorAlertRuleSchema])
+async def get_alert_rules(
+    session: AsyncSession = Depends(get_db_session),
+) -> List[SensorAlertRuleSchema]:
+    """Правила оповещений."""
+    return await SensorAlertService(session).get_rules()
+
+
+@router.post("/alert_rules", response_model=SensorAlertRuleSchema)
+async def add_alert_rule(
+    rule: SensorAlertRuleCreateSchema,
+    _user: UserSchema = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> SensorAlertRuleSchema:
+    """Добавляет правило оповещения для группы датчиков или для всех датчиков."""
+    return await SensorAlertService(session).add_rule(rule)
+
+
+@router.put("/alert_rules/{rule_id}", response_model=SensorAlertRuleSchema)
+async def update_alert_rule(
+    rule_id: int,
+    rule: SensorAlertRuleCreateSchema,
+    _user: UserSchema = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> SensorAlertRuleSchema:
+    """Изменяет правило оповещения; при отключении закрывает его активные оповещения.
+
+    Raises:
+        HTTPException: 404 Not Found
+    """
+    return await SensorAlertService(session).update_rule(rule_id, rule)
+
+
+@router.delete("/alert_rules/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_alert_rule(
+    rule_id: int,
+    _user: UserSchema = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> None:
+    """Удаляет правило оповещения.
+
+    Raises:
+        HTTPException: 404 Not Found
+    """
+    await SensorAlertService(session).delete_rule(rule_id)
+
+
+@router.put("/devices", response_model=SensorDeviceSchema)
+async def set_device(
+    device: SensorDeviceSchema,
+    _user: UserSchema = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> SensorDeviceSchema:
+    """Добавляет датчик или изменяет его группу."""
+    return await SensorAlertService(session).set_device(device)
+
+
+@router.get("/cabinets", response_model=List[CabinetHealthSchema])
+async def get_cabinets(
+    session: AsyncSession = Depends(get_db_session),
+) -> List[CabinetHealthSchema]:
+    """Обзор завода: шкафы приводов по цехам, линиям и помещениям с наибольшей
+    температурой, наименьшим зарядом батареи датчиков и количеством преобразователей."""
+    return await CabinetHealthService(session).get_overview()
+
+
+@router.get("/latest", response_class=Response)
+async def get_latest(
+    if_none_match: str | None = Header(default=None),
+    session: AsyncSession = Depends(get_db_session),
+) -> Response:
+    """Последние показания всех датчиков одним ответом.
+
+    Поддерживает условный запрос: при совпадении If-None-Match возвращается 304.
+    """
+    body, etag = await SensorService(session).get_latest()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/{address}/readings", response_class=StreamingResponse)
+async def get_readings(
+    address: str,
+    moment_from: datetime = Query(alias="from"),
+    moment_to: datetime = Query(alias="to"),
+    max_points: int | None = Query(default=None, ge=3, le=sensor_max_points),
+    field: Literal["temperature", "battery"] = "temperature",
+) -> StreamingResponse:
+    """Показания датчика за интервал времени потоком NDJSON (по строке на показание).
+
+    С max_points показания прореживаются на сервере алгоритмом LTTB
+    с сохранением формы графика показания field.
+    """
+    return StreamingResponse(
+        stream_readings(address, moment_from, moment_to, max_points=max_points, field=field),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/{address}/rollups", response_model=SensorRollupSeriesSchema)
+async def get_rollups(
+    address: str,
+    moment_from: datetime = Query(alias="from"),
+    moment_to: datetime = Query(alias="to"),
+    step: int | None = Query(default=None, gt=0, description="Шаг графика в секундах"),
+    session: AsyncSession = Depends(get_db_session),
+) -> SensorRollupSeriesSchema:
+    """Минимум, максимум и среднее показаний датчика по самым крупным подходящим агрегатам.
+
+    Raises:
+        HTTPException: 400 Bad Request
+    """
+    return await SensorService(session).get_rollups(
+        address, moment_from, moment_to, step * 1000 if step else None
+    )
+
+
+@router.get("/{address}/recent", response_model=SensorWindowSchema)
+async def get_recent(
+    address: str,
+    minutes: int = Query(default=60, ge=1, le=24 * 60),
+) -> SensorWindowSchema:
+    """Последние показания датчика из памяти процесса без обращения к базе данных."""
+    return get_recent_readings(address, minutes)
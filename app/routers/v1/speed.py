@@ -0,0 +1,130 @@
+from datetime import datetime
+from typing import List
+from fastapi import APIRouter, Depends, Query, Header, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.session import get_db_session
+from app.schemas.auth import UserSchema
+from app.services.auth import get_current_user
+from app.schemas.speed import (
+    SpeedSchema,
+    SpeedParamsSchema,
+    SpeedHistorySchema,
+    SpeedDiffSchema,
+    SpeedMotorSchema,
+    SpeedRecalculationSchema,
+    SpeedSetpointRequestSchema,
+    RollSetpointRequestSchema,
+    SpeedSetpointsSchema
+)
+from app.services.speed import SpeedService
+from app.const import speed_params
+from app.utils.etag import etag_matches
+
+router = APIRouter(**speed_params)
+
+@router.get("/rolls/{roll_id}", response_model=List[SpeedSchema])
+async def get_speeds(
+    roll_id: int,
+    session: AsyncSession = Depends(get_db_session),
+) -> List[SpeedSchema]:
+    """Таблица скоростей формирующего ролика."""
+    return await SpeedService(session).get_speeds(roll_id)
+
+@router.put("/rolls/{roll_id}", response_model=SpeedHistorySchema)
+async def put_speeds(
+    roll_id: int,
+    speeds: List[SpeedParamsSchema],
+    _user: UserSchema = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> SpeedHistorySchema:
+    """Заменяет таблицу скоростей ролика и сохраняет её версию в истории.
+
+    Raises:
+        HTTPException: 404 Not Found
+    """
+    return await SpeedService(session).replace_speeds(roll_id, speeds)
+
+@router.post("/rolls/{roll_id}/history", response_model=SpeedHistorySchema)
+async def record_history(
+    roll_id: int,
+    _user: UserSchema = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> SpeedHistorySchema:
+    """Сохраняет текущую таблицу скоростей ролика в истории."""
+    return await SpeedService(session).record_history(roll_id)
+
+@router.get("/rolls/{roll_id}/history", response_model=SpeedHistorySchema)
+async def get_speeds_as_of(
+    roll_id: int,
+    at: datetime,
+    session: AsyncSession = Depends(get_db_session),
+) -> SpeedHistorySchema:
+    """Параметры скоростей ролика, действовавшие в момент времени.
+
+    Raises:
+        HTTPException: 404 Not Found
+    """
+    return await SpeedService(session).get_speeds_as_of(roll_id, at)
+
+@router.get("/rolls/{roll_id}/diff", response_model=SpeedDiffSchema)
+async def get_speeds_diff(
+    roll_id: int,
+    moment_from: datetime = Query(alias="from"),
+    moment_to: datetime = Query(alias="to"),
+    session: AsyncSession = Depends(get_db_session),
+) -> SpeedDiffSchema:
+    """Разница параметров скоростей ролика между двумя моментами времени."""
+    return await SpeedService(session).get_speeds_diff(roll_id, moment_from, moment_to)
+
+@router.post("/recalculate", response_model=SpeedRecalculationSchema)
+async def recalculate(
+    motor: SpeedMotorSchema,
+    _user: UserSchema = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> SpeedRecalculationSchema:
+    """Пакетный пересчёт ЭДС и флагов коррекции после изменения данных двигателя."""
+    return await SpeedService(session).recalculate(motor)
+
+@router.post("/setpoints", response_model=SpeedSetpointsSchema)
+async def get_roll_setpoints(
+    request: RollSetpointRequestSchema,
+    session: AsyncSession = Depends(get_db_session),
+) -> SpeedSetpointsSchema:
+    """Уставки ролика для всех заданий графика за один запрос.
+
+    Raises:
+        HTTPException: 404 Not Found
+    """
+    return await SpeedService(session).get_roll_setpoints(request.roll_id, request.tasks)
+
+@router.post("/reels/{reel_id}/setpoints", response_model=List[SpeedSetpointsSchema])
+async def get_reel_setpoints(
+    reel_id: int,
+    request: SpeedSetpointRequestSchema,
+    session: AsyncSession = Depends(get_db_session),
+) -> List[SpeedSetpointsSchema]:
+    """Уставки всех роликов моталки для всех заданий графика за один запрос.
+
+    Raises:
+        HTTPException: 404 Not Found
+    """
+    return await SpeedService(session).get_reel_setpoints(reel_id, request.tasks)
+
+@router.get("/reels/{reel_id}/lut", response_class=Response)
+async def get_reel_lut(
+    reel_id: int,
+    if_none_match: str | None = Header(default=None),
+    session: AsyncSession = Depends(get_db_session),
+) -> Response:
+    """Бинарная таблица скоростей моталки для контроллеров приводов.
+
+    Поддерживает условный запрос: при совпадении If-None-Match возвращается 304.
+
+    Raises:
+        HTTPException: 404 Not Found
+    """
+    lut = await SpeedService(session).get_reel_lut(reel_id)
+    headers = {"ETag": lut.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, lut.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=lut.content, media_type="application/octet-stream", headers=headers)
@@ -1,16 +1,126 @@
-# from typing import List
-# from fastapi import APIRouter
-# from app.services.auth import get_current_user
-# from app.database.session import get_db_session
-# from app.schemas.auth import UserSchema
-# from app.schemas.storage import StorageSchema
-# from app.services.storage import StorageService
-# from app.const import storage_params
-
-# router = APIRouter(**storage_params)
-
-# @router.get("/")
-# async def get_storage() -> List[StorageSchema]:
-#     _user: UserSchema = Depends(get_current_user)
-#     session: Session = Depends(get_db_session)
-#     return await StorageService(session).get_storage()
\ No newline at end of file
+from typing import List
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.auth import get_current_user
+from app.database.session import get_db_session
+from app.schemas.auth import UserSchema
+from app.schemas.storage import (
+    StorageEquipmentSchema,
+    StorageAdjustSchema,
+    StorageMovementSchema,
+    StorageStockSchema
+)
+from app.services.storage import StorageService
+from app.const import (
+    storage_params,
+    storage_low_stock_threshold,
+    storage_movements_limit,
+    storage_search_limit
+)
+
+router = APIRouter(**storage_params)
+
+@router.get("/stock", response_model=List[StorageStockSchema])
+async def get_stock(
+    location_id: int | None = None,
+    session: AsyncSession = Depends(get_db_session),
+) -> List[StorageStockSchema]:
+    """Сводные остатки по местам хранения и группам."""
+    return await StorageService(session).get_stock(location_id)
+
+@router.get("/stock/low", response_model=List[StorageStockSchema])
+async def get_low_stock(
+    threshold: int = Query(default=storage_low_stock_threshold, ge=0),
+    session: AsyncSession = Depends(get_db_session),
+) -> List[StorageStockSchema]:
+    """Группы оборудования с остатком не выше порога."""
+    return await StorageService(session).get_low_stock(threshold)
+
+@router.get("/number/{number}", response_model=List[StorageEquipmentSchema])
+async def get_by_number(
+    number: str,
+    session: AsyncSession = Depends(get_db_session),
+) -> List[StorageEquipmentSchema]:
+    """Оборудование по номенклатурному номеру."""
+    return await StorageService(session).get_by_number(number)
+
+@router.get("/search", response_model=List[StorageEquipmentSchema])
+async def search_equipment(
+    q: str = Query(..., min_length=3),
+    limit: int = Query(default=storage_search_limit, ge=1, le=500),
+    session: AsyncSession = Depends(get_db_session),
+) -> List[StorageEquipmentSchema]:
+    """Поиск оборудования по названию и характеристикам."""
+    return await StorageService(session).search(q, limit)
+
+@router.get("/group", response_model=List[StorageEquipmentSchema])
+async def get_by_group(
+    group: str,
+    location_id: int | None = None,
+    session: AsyncSession = Depends(get_db_session),
+) -> List[StorageEquipmentSchema]:
+    """Оборудование группы, при необходимости в одном месте хранения."""
+    return await StorageService(session).get_by_group(group, location_id)
+
+@router.get("/place", response_model=List[StorageEquipmentSchema])
+async def get_by_place(
+    place: str,
+    session: AsyncSession = Depends(get_db_session),
+) -> List[StorageEquipmentSchema]:
+    """Оборудование на месте склада (основное, Б/У или новое размещение)."""
+    return await StorageService(session).get_by_place(place)
+
+@router.post("/stock/rebuild")
+async def rebuild_stock(
+    _user: UserSchema = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> int:
+    """Пересчитывает сводные остатки по таблице оборудования."""
+    return await StorageService(session).rebuild_stock()
+
+@router.post("/", response_model=StorageEquipmentSchema)
+async def add_equipment(
+    equipment: StorageEquipmentSchema,
+    _user: UserSchema = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> StorageEquipmentSchema:
+    """Добавляет оборудование на склад и учитывает его в сводном остатке."""
+    return await StorageService(session).add_equipment(equipment)
+
+@router.post("/{equipment_id}/check_in", response_model=StorageMovementSchema)
+async def check_in(
+    equipment_id: int,
+    adjust: StorageAdjustSchema,
+    _user: UserSchema = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> StorageMovementSchema:
+    """Приход оборудования на склад.
+
+    Raises:
+        HTTPException: 404 Not Found
+    """
+    return await StorageService(session).check_in(equipment_id, adjust.qty, adjust.notes)
+
+@router.post("/{equipment_id}/check_out", response_model=StorageMovementSchema)
+async def check_out(
+    equipment_id: int,
+    adjust: StorageAdjustSchema,
+    _user: UserSchema = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> StorageMovementSchema:
+    """Расход оборудования со склада.
+
+    Raises:
+        HTTPException: 404 Not Found
+        HTTPException: 409 Conflict
+    """
+    return await StorageService(session).check_out(equipment_id, adjust.qty, adjust.notes)
+
+@router.get("/{equipment_id}/movements", response_model=List[StorageMovementSchema])
+async def get_movements(
+    equipment_id: int,
+    limit: int = Query(default=storage_movements_limit, ge=1, le=1000),
+    session: AsyncSession = Depends(get_db_session),
+) -> List[StorageMovementSchema]:
+    """Журнал движений оборудования."""
+    return await StorageService(session).get_movements(equipment_id, limit)
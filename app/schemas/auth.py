@@ -16,3 +16,15 @@ class UserSchema(BaseSchema):
 class TokenSchema(BaseSchema):
     access_token: str
     token_type: str
+
+
+class PasswordHashingStatsSchema(BaseSchema):
+    workers: int
+    in_flight: int
+    waiting: int
+    completed: int
+    rejected: int
+    rehashed: int
+    avg_wait_ms: float
+    max_wait_ms: float
+    avg_hash_ms: float
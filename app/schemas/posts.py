@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import List, Optional
 from app.schemas.base import BaseSchema
 
 class PostSchema(BaseSchema):
@@ -11,3 +12,20 @@ class PostSchema(BaseSchema):
     updated_at: datetime
     title: str
     description: str
+
+class PostAuthorSchema(BaseSchema):
+    ''' Author of a post as shown in the feed. '''
+    id: int
+    name: str
+
+class PostFeedItemSchema(PostSchema):
+    ''' Post in the feed together with its author. '''
+    author: Optional[PostAuthorSchema] = None
+
+class PostFeedSchema(BaseSchema):
+    ''' One page of the post feed. '''
+    items: List[PostFeedItemSchema]
+    next_cursor: Optional[str] = None
+    page: int
+    pages: int
+    total: int
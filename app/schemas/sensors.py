@@ -1,13 +1,294 @@
-from typing import List
+from typing import Annotated, List, Literal, Optional
+from pydantic import Field, TypeAdapter
+from typing_extensions import NotRequired, TypedDict
 from app.schemas.base import BaseSchema
 
+# Показание датчика: NaN и бесконечность отклоняются во всех форматах приёма.
+FiniteFloat = Annotated[float, Field(allow_inf_nan=False)]
+
 class Sensor(BaseSchema):
     name: str
     address: str
     date: str
     status: str
+    battery: FiniteFloat
+    temperature: FiniteFloat
+
+class SensorData(BaseSchema):
+    sensors: List[Sensor]
+
+class SensorRecord(TypedDict):
+    """
+    Показание датчика для пакетного приёма.
+
+    В отличие от Sensor проверяется без создания объектов модели: пакет
+    разбирается из JSON в список словарей за один проход TypeAdapter.
+    Время ts в миллисекундах Unix заполняется, если оно уже известно
+    (например, в бинарном формате), иначе разбирается из date.
+    """
+    name: str
+    address: str
+    date: str
+    status: str
+    battery: FiniteFloat
+    temperature: FiniteFloat
+    ts: NotRequired[int]
+
+# Проверка пакета показаний из JSON за один проход.
+sensor_records_adapter: TypeAdapter[List[SensorRecord]] = TypeAdapter(List[SensorRecord])
+
+class SensorReadingSchema(BaseSchema):
+    """
+    Показание датчика из хранилища.
+
+    Attributes:
+        address (str): Адрес датчика.
+        ts (int): Время показания в миллисекундах Unix.
+        status (str): Состояние датчика.
+        battery (float): Заряд батареи.
+        temperature (float): Температура.
+    """
+    address: str
+    ts: int
+    status: str
     battery: float
     temperature: float
 
-class SensorData(BaseSchema):
-    sensors: List[Sensor]
\ No newline at end of file
+class SensorLatestSchema(SensorReadingSchema):
+    """
+    Последнее показание датчика.
+
+    Attributes:
+        name (str): Название датчика.
+    """
+    name: str
+
+class SensorRollupSchema(BaseSchema):
+    """
+    Агрегаты показаний датчика за интервал.
+
+    Attributes:
+        bucket (int): Начало интервала в миллисекундах Unix.
+        count (int): Количество показаний.
+        temperature_min (float): Наименьшая температура.
+        temperature_max (float): Наибольшая температура.
+        temperature_avg (float): Средняя температура.
+        battery_min (float): Наименьший заряд батареи.
+        battery_max (float): Наибольший заряд батареи.
+        battery_avg (float): Средний заряд батареи.
+    """
+    bucket: int
+    count: int
+    temperature_min: float
+    temperature_max: float
+    temperature_avg: float
+    battery_min: float
+    battery_max: float
+    battery_avg: float
+
+class SensorRollupSeriesSchema(BaseSchema):
+    """
+    Ряд агрегатов показаний датчика.
+
+    Attributes:
+        address (str): Адрес датчика.
+        resolution (int): Длина интервала выбранных агрегатов в миллисекундах.
+        buckets (List[SensorRollupSchema]): Агрегаты по возрастанию начала интервала.
+    """
+    address: str
+    resolution: int
+    buckets: List[SensorRollupSchema]
+
+class SensorWindowSchema(BaseSchema):
+    """
+    Последние показания датчика в столбцовом виде.
+
+    Attributes:
+        address (str): Адрес датчика.
+        ts (List[int]): Время показаний в миллисекундах Unix по возрастанию.
+        battery (List[float]): Заряд батареи.
+        temperature (List[float]): Температура.
+    """
+    address: str
+    ts: List[int]
+    battery: List[float]
+    temperature: List[float]
+
+class SensorAnomalySchema(BaseSchema):
+    """
+    Датчик, последнее показание которого отклоняется от его базовой линии.
+
+    Attributes:
+        address (str): Адрес датчика.
+        ts (int): Время последнего показания в миллисекундах Unix.
+        fields (List[str]): Аномальные величины: temperature и/или discharge_rate.
+        temperature (float): Последняя температура.
+        temperature_mean (float): Базовая линия (EWMA) температуры.
+        temperature_z (float): z-оценка последней температуры.
+        discharge_rate (float | None): Последняя скорость изменения заряда батареи в час.
+        discharge_rate_mean (float): Базовая линия скорости изменения заряда.
+        discharge_rate_z (float): z-оценка последней скорости изменения заряда.
+    """
+    address: str
+    ts: int
+    fields: List[str]
+    temperature: float
+    temperature_mean: float
+    temperature_z: float
+    discharge_rate: Optional[float] = None
+    discharge_rate_mean: float
+    discharge_rate_z: float
+
+class SensorDeviceSchema(BaseSchema):
+    """
+    Датчик, его группа и шкаф.
+
+    Attributes:
+        address (str): Адрес датчика.
+        name (str): Название датчика.
+        group (str | None): Группа датчика.
+        cabinet_id (int | None): ID шкафа, в котором установлен датчик.
+    """
+    address: str
+    name: str
+    group: Optional[str] = None
+    cabinet_id: Optional[int] = None
+
+class CabinetHealthSchema(BaseSchema):
+    """
+    Сводное состояние шкафа привода с его местом в структуре цехов.
+
+    Attributes:
+        mill_shop_id (int): ID цеха.
+        mill_shop (str): Цех.
+        production_line_id (int): ID линии.
+        production_line (str): Линия.
+        location_id (int): ID помещения.
+        location (str): Помещение.
+        cabinet_id (int): ID шкафа.
+        cabinet (str): Шкаф.
+        max_temperature (float | None): Наибольшая температура датчиков шкафа.
+        min_battery (float | None): Наименьший заряд батареи датчиков шкафа.
+        sensor_count (int): Количество датчиков шкафа с показаниями.
+        converter_count (int): Количество преобразователей в шкафу.
+        ts (int | None): Время последнего показания датчиков шкафа в миллисекундах Unix.
+    """
+    mill_shop_id: int
+    mill_shop: str
+    production_line_id: int
+    production_line: str
+    location_id: int
+    location: str
+    cabinet_id: int
+    cabinet: str
+    max_temperature: Optional[float] = None
+    min_battery: Optional[float] = None
+    sensor_count: int
+    converter_count: int
+    ts: Optional[int] = None
+
+class SensorAlertRuleCreateSchema(BaseSchema):
+    """
+    Правило оповещения.
+
+    Attributes:
+        group (str | None): Группа датчиков. Если None, правило применяется ко всем датчикам.
+        field (str): Показание: battery или temperature.
+        kind (str): min — ниже порога, max — выше порога, rise — рост больше порога за окно.
+        threshold (float): Порог.
+        window (int): Окно правила rise в секундах.
+        enabled (bool): Признак действующего правила.
+    """
+    group: Optional[str] = None
+    field: Literal["battery", "temperature"]
+    kind: Literal["min", "max", "rise"]
+    threshold: float
+    window: int = Field(default=300, gt=0, le=86_400)
+    enabled: bool = True
+
+class SensorAlertRuleSchema(SensorAlertRuleCreateSchema):
+    """
+    Сохранённое правило оповещения.
+
+    Attributes:
+        id (int): Уникальный идентификатор правила.
+    """
+    id: int
+
+class SensorAlertSchema(BaseSchema):
+    """
+    Срабатывание правила оповещения.
+
+    Attributes:
+        id (int): Уникальный идентификатор оповещения.
+        rule_id (int): ID правила.
+        address (str): Адрес датчика.
+        field (str): Показание правила.
+        kind (str): Вид правила.
+        threshold (float): Порог правила.
+        value (float): Показание, вызвавшее срабатывание.
+        fired_at (int): Время срабатывания в миллисекундах Unix.
+        resolved_at (int | None): Время возврата в норму или None, если оповещение активно.
+    """
+    id: int
+    rule_id: int
+    address: str
+    field: str
+    kind: str
+    threshold: float
+    value: float
+    fired_at: int
+    resolved_at: Optional[int] = None
+
+class SensorIngestSchema(BaseSchema):
+    """
+    Результат приёма пакета показаний.
+
+    Attributes:
+        accepted (int): Количество принятых показаний.
+        pending (int): Количество показаний в буфере, ожидающих записи.
+        duplicates (int): Количество отброшенных повторных показаний.
+    """
+    accepted: int
+    pending: int
+    duplicates: int = 0
+
+class SensorRetentionSchema(BaseSchema):
+    """
+    Результат прохода обслуживания показаний.
+
+    Attributes:
+        days (List[int]): Удалённые сутки (номер суток от 1970-01-01).
+        deleted (int): Количество удалённых показаний.
+        archived (List[str]): Файлы архива.
+    """
+    days: List[int]
+    deleted: int
+    archived: List[str]
+
+class SensorIngestStatsSchema(BaseSchema):
+    """
+    Состояние буфера приёма показаний.
+
+    Attributes:
+        pending (int): Показаний в буфере.
+        capacity (int): Наибольшее количество показаний в буфере.
+        accepted (int): Принято с момента запуска.
+        rejected (int): Отклонено из-за переполнения буфера.
+        written (int): Записано в базу данных.
+        dropped (int): Потеряно из-за ошибок записи.
+        duplicates (int): Отброшено повторных показаний при приёме.
+        duplicates_stored (int): Отброшено при записи как уже сохранённые в базе данных.
+        handler_errors (int): Ошибок обработчиков пакета; показания пакета при этом записываются.
+        flushes (int): Количество выполненных сбросов.
+    """
+    pending: int
+    capacity: int
+    accepted: int
+    rejected: int
+    written: int
+    dropped: int
+    duplicates: int
+    duplicates_stored: int
+    handler_errors: int = 0
+    flushes: int
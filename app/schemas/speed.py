@@ -1,5 +1,6 @@
 from typing import Optional, List
-from pydantic import datetime
+from datetime import datetime
+from pydantic import Field
 from app.schemas.base import BaseSchema
 
 
@@ -89,3 +90,159 @@ class ReelNestedSchema(BaseSchema):
     id: Optional[int] = None
     name: str
     rolls: List[RollNestedSchema]
+
+class SpeedSetpointRequestSchema(BaseSchema):
+    """
+    Схема запроса уставок скорости для набора заданий.
+
+    Attributes:
+        tasks (List[float]): Значения задания, для которых нужны уставки.
+    """
+    tasks: List[float] = Field(min_length=1, max_length=100_000)
+
+class RollSetpointRequestSchema(SpeedSetpointRequestSchema):
+    """
+    Схема запроса уставок скорости формирующего ролика.
+
+    Attributes:
+        roll_id (int): ID формирующего ролика.
+        tasks (List[float]): Значения задания, для которых нужны уставки.
+    """
+    roll_id: int
+
+class SpeedSetpointsSchema(BaseSchema):
+    """
+    Схема уставок скорости формирующего ролика в столбцовом виде.
+
+    Значение с индексом i каждого списка относится к заданию tasks[i].
+    Числовые параметры линейно интерполируются между строками таблицы
+    скоростей ролика, флаги берутся из ближайшей строки.
+
+    Attributes:
+        roll_id (int): ID формирующего ролика.
+        task (List[float]): Значения задания.
+        tspd (List[int]): Текущая скорость.
+        fspd (List[bool]): Флаг фиксированной скорости.
+        bmav (List[int]): Базовая скорость.
+        bemf (List[float]): Базовый электромагнитный момент.
+        amav (List[int]): Активная скорость.
+        aemf (List[float]): Активный электромагнитный момент.
+        memf (List[float]): Максимальный электромагнитный момент.
+        corr (List[bool]): Флаг корректированной скорости.
+    """
+    roll_id: int
+    task: List[float]
+    tspd: List[int]
+    fspd: List[bool]
+    bmav: List[int]
+    bemf: List[float]
+    amav: List[int]
+    aemf: List[float]
+    memf: List[float]
+    corr: List[bool]
+
+class SpeedParamsSchema(BaseSchema):
+    """
+    Схема для представления одной строки таблицы скоростей без служебных полей.
+
+    Attributes:
+        task (float): Задача, для которой определяется параметр скорости.
+        tspd (int): Текущая скорость.
+        fspd (bool): Флаг, указывающий на то, что скорость является фиксированной.
+        bmav (int): Базовая скорость.
+        bemf (float): Базовый электромагнитный момент.
+        amav (int): Активная скорость.
+        aemf (float): Активный электромагнитный момент.
+        memf (float): Максимальный электромагнитный момент.
+        corr (bool): Флаг, указывающий на то, что скорость является корректированной.
+    """
+    task: float
+    tspd: int
+    fspd: bool
+    bmav: int
+    bemf: float
+    amav: int
+    aemf: float
+    memf: float
+    corr: bool
+
+class SpeedHistorySchema(BaseSchema):
+    """
+    Схема для представления версии набора параметров скоростей ролика.
+
+    Attributes:
+        roll_id (int): ID формирующего ролика.
+        valid_from (datetime): Момент, с которого действует набор параметров.
+        speeds (List[SpeedParamsSchema]): Строки таблицы скоростей.
+    """
+    roll_id: int
+    valid_from: datetime
+    speeds: List[SpeedParamsSchema]
+
+class SpeedFieldChangeSchema(BaseSchema):
+    """
+    Схема для представления изменения строки таблицы скоростей.
+
+    Attributes:
+        task (float): Задание, к которому относится строка.
+        before (SpeedParamsSchema): Строка в первой версии.
+        after (SpeedParamsSchema): Строка во второй версии.
+        fields (List[str]): Изменившиеся параметры.
+    """
+    task: float
+    before: SpeedParamsSchema
+    after: SpeedParamsSchema
+    fields: List[str]
+
+class SpeedDiffSchema(BaseSchema):
+    """
+    Схема для представления разницы параметров скоростей ролика между двумя моментами.
+
+    Attributes:
+        roll_id (int): ID формирующего ролика.
+        from_valid_from (datetime | None): Начало действия версии на первый момент.
+        to_valid_from (datetime | None): Начало действия версии на второй момент.
+        added (List[SpeedParamsSchema]): Строки, появившиеся во второй версии.
+        removed (List[SpeedParamsSchema]): Строки, отсутствующие во второй версии.
+        changed (List[SpeedFieldChangeSchema]): Изменившиеся строки.
+    """
+    roll_id: int
+    from_valid_from: Optional[datetime] = None
+    to_valid_from: Optional[datetime] = None
+    added: List[SpeedParamsSchema]
+    removed: List[SpeedParamsSchema]
+    changed: List[SpeedFieldChangeSchema]
+
+class SpeedMotorSchema(BaseSchema):
+    """
+    Схема параметров двигателя для пересчёта ЭДС и флагов коррекции.
+
+    Attributes:
+        emf_per_speed (float): ЭДС на единицу скорости.
+        emf_limit (float): Предельная ЭДС двигателя; при её превышении скорость требует коррекции.
+        roll_ids (List[int] | None): ID роликов для пересчёта. Если не заданы, пересчитываются все.
+    """
+    emf_per_speed: float = Field(gt=0)
+    emf_limit: float = Field(gt=0)
+    roll_ids: Optional[List[int]] = None
+
+class SpeedRecalculationSchema(BaseSchema):
+    """
+    Схема отчёта о пакетном пересчёте параметров скоростей.
+
+    Attributes:
+        rows_total (int): Количество просмотренных строк.
+        rows_changed (int): Количество изменённых строк.
+        rolls_changed (int): Количество роликов с изменёнными строками.
+        load_ms (float): Время загрузки данных, мс.
+        compute_ms (float): Время расчёта, мс.
+        write_ms (float): Время записи изменений, мс.
+        total_ms (float): Общее время, мс.
+    """
+    rows_total: int
+    rows_changed: int
+    rolls_changed: int
+    load_ms: float
+    compute_ms: float
+    write_ms: float
+    total_ms: float
@@ -1,10 +1,12 @@
+from datetime import datetime
 from typing import Optional
+from pydantic import Field
 from app.schemas.base import BaseSchema
 
 class StorageLocationSchema(BaseSchema):
     """
     Схема для представления места хранения.
-    
+
     Attributes:
         id: Уникальный идентификатор места
         name: Название места
@@ -15,7 +17,7 @@ class StorageLocationSchema(BaseSchema):
     id: Optional[int] = None
     name: str
     place: Optional[str]
-    used_place: Optional[str] 
+    used_place: Optional[str]
     new_place: Optional[str]
 
     class Config:
@@ -24,7 +26,7 @@ class StorageLocationSchema(BaseSchema):
 class StorageEquipmentSchema(BaseSchema):
     """
     Схема для представления оборудования на складе.
-    
+
     Attributes:
         id: Уникальный идентификатор оборудования
         group: Группа оборудования
@@ -42,7 +44,7 @@ class StorageEquipmentSchema(BaseSchema):
     group: str
     name: Optional[str]
     specs: Optional[str]
-    qty: int
+    qty: int = Field(ge=0)
     install: Optional[str]
     number: Optional[str]
     notes: Optional[str]
@@ -50,3 +52,52 @@ class StorageEquipmentSchema(BaseSchema):
 
     class Config:
         from_attributes = True
+
+class StorageAdjustSchema(BaseSchema):
+    """
+    Схема для прихода или расхода оборудования.
+
+    Attributes:
+        qty: Количество (всегда положительное, направление задаётся операцией)
+        notes: Примечание к движению
+    """
+    qty: int = Field(gt=0)
+    notes: Optional[str] = None
+
+class StorageMovementSchema(BaseSchema):
+    """
+    Схема для представления движения оборудования.
+
+    Attributes:
+        id: Уникальный идентификатор движения
+        equipment_id: ID оборудования
+        location_id: ID места хранения
+        group: Группа оборудования
+        delta: Приращение количества
+        qty_after: Количество после движения
+        notes: Примечание
+        created_at: Дата и время движения
+    """
+    id: Optional[int] = None
+    equipment_id: int
+    location_id: int
+    group: str
+    delta: int
+    qty_after: int
+    notes: Optional[str] = None
+    created_at: datetime
+
+class StorageStockSchema(BaseSchema):
+    """
+    Схема для представления сводного остатка.
+
+    Attributes:
+        location_id: ID места хранения
+        group: Группа оборудования
+        qty: Суммарное количество
+        updated_at: Дата последнего изменения
+    """
+    location_id: int
+    group: str
+    qty: int
+    updated_at: datetime
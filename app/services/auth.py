@@ -1,39 +1,149 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
+from typing import Any, Callable, Tuple
 from fastapi import Depends, status
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from jose import jwt, JWTError
-from sqlalchemy import select
+from sqlalchemy import select, update
 from passlib.context import CryptContext
-from app.schemas.auth import UserSchema, CreateUserSchema, TokenSchema
+from app.schemas.auth import UserSchema, CreateUserSchema, TokenSchema, PasswordHashingStatsSchema
 from app.services.base import BaseService, BaseDataManager
 from app.models.auth import UserModel
+from app.utils.cache import LRUCache
 from app.utils.exc import raise_with_log
 from app.const import (
     auth_url,
     token_type,
     token_algorithm,
     token_expire_minutes,
+    token_expires_format,
+    token_cache_size,
+    password_bcrypt_rounds,
+    password_hash_workers,
+    password_hash_queue,
 )
 from app.core.config import config
 
 oauth2_schema = OAuth2PasswordBearer(tokenUrl=auth_url, auto_error=False)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=password_bcrypt_rounds)
+
+# Verified tokens: sha256(token) -> (user, expiration as Unix time).
+token_cache: LRUCache[Tuple[UserSchema, float]] = LRUCache(maxsize=token_cache_size)
+
+class PasswordHasher:
+    """Run bcrypt hashing and verification in a bounded thread pool.
+
+    bcrypt takes 100-300 ms of CPU per call, so it must not run on the event
+    loop. At most ``workers`` calls run at once; further calls wait on a
+    semaphore, and once ``max_waiting`` calls are waiting new ones are
+    rejected with 503 instead of growing the queue. Queueing and hashing
+    times are collected for :meth:`stats`.
+    """
+
+    def __init__(
+        self,
+        workers: int = password_hash_workers,
+        max_waiting: int = password_hash_queue,
+        context: CryptContext = pwd_context,
+    ) -> None:
+        self.workers = workers
+        self.max_waiting = max_waiting
+        self.context = context
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._semaphore = asyncio.Semaphore(workers)
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+        self._hash_time = 0.0
+
+    async def hash(self, password: str) -> str:
+        """Generate a bcrypt hashed password."""
+
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, hashed_password: str, plain_password: str) -> bool:
+        """Verify a password against a hash."""
+
+        return await self._run(self.context.verify, plain_password, hashed_password)
+
+    async def verify_and_update(self, hashed_password: str, plain_password: str) -> Tuple[bool, str | None]:
+        """Verify a password and rehash it if the hash uses outdated cost parameters.
+
+        Returns:
+            Whether the password is valid and the new hash, if it has to be replaced.
+        """
+
+        valid, new_hash = await self._run(self.context.verify_and_update, plain_password, hashed_password)
+        if new_hash is not None:
+            self.rehashed += 1
+        return valid, new_hash
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run ``func`` in the pool once a worker slot is free."""
+
+        if self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise_with_log(status.HTTP_503_SERVICE_UNAVAILABLE, "Too many password checks in progress")
+
+        queued = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        started = time.perf_counter()
+        self._wait_time += started - queued
+        self._max_wait = max(self._max_wait, started - queued)
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._hash_time += time.perf_counter() - started
+            self._semaphore.release()
+
+    def stats(self) -> PasswordHashingStatsSchema:
+        """Return pool load and queueing metrics."""
+
+        completed = max(self.completed, 1)
+        return PasswordHashingStatsSchema(
+            workers=self.workers,
+            in_flight=self.in_flight,
+            waiting=self.waiting,
+            completed=self.completed,
+            rejected=self.rejected,
+            rehashed=self.rehashed,
+            avg_wait_ms=self._wait_time / completed * 1000,
+            max_wait_ms=self._max_wait * 1000,
+            avg_hash_ms=self._hash_time / completed * 1000,
+        )
+
+
+password_hasher = PasswordHasher()
 
 class HashingMixin:
     """Hashing and verifying passwords."""
 
     @staticmethod
-    def bcrypt(password: str) -> str:
+    async def bcrypt(password: str) -> str:
         """Generate a bcrypt hashed password."""
 
-        return pwd_context.hash(password)
+        return await password_hasher.hash(password)
 
     @staticmethod
-    def verify(hashed_password: str, plain_password: str) -> bool:
+    async def verify(hashed_password: str, plain_password: str) -> bool:
         """Verify a password against a hash."""
 
-        return pwd_context.verify(plain_password, hashed_password)
+        return await password_hasher.verify(hashed_password, plain_password)
     
 class AuthService(HashingMixin, BaseService):
 
@@ -42,28 +152,36 @@ class AuthService(HashingMixin, BaseService):
         user_model = UserModel(
             name=user.name,
             email=user.email,
-            hashed_password=self.bcrypt(user.password)
+            hashed_password=await self.bcrypt(user.password)
         )
         await AuthDataManager(self.session, UserSchema).add_user(user_model)
         
     async def authenticate(self, login: OAuth2PasswordRequestForm = Depends()):
-        user = await AuthDataManager(self.session, UserSchema).get_user(login.username)
+        data_manager = AuthDataManager(self.session, UserSchema)
+        user = await data_manager.get_user(login.username)
     
         if user.hashed_password is None:
             raise_with_log(status.HTTP_401_UNAUTHORIZED, "Incorrect password")
             
-        if not self.verify(user.hashed_password, login.password):
+        valid, new_hash = await password_hasher.verify_and_update(user.hashed_password, login.password)
+        if not valid:
             raise_with_log(status.HTTP_401_UNAUTHORIZED, "Incorrect password")
+
+        # bcrypt cost parameters changed since the hash was created
+        if new_hash is not None:
+            await data_manager.update_password(user.email, new_hash)
             
         access_token = self._create_access_token(user.name, user.email)
         return TokenSchema(access_token=access_token, token_type=token_type)
     
     def _create_access_token(self, name: str, email: str) -> str:
         
+        expires_at = self._expiration_time()
         payload = {
             "name": name,
             "sub": email,
-            "expires_at": self._expiration_time()
+            "exp": int(expires_at.timestamp()),
+            "expires_at": expires_at.strftime(token_expires_format)
         }
         
         return jwt.encode(payload,
@@ -71,28 +189,41 @@ class AuthService(HashingMixin, BaseService):
                       algorithm=token_algorithm)
     
     @staticmethod
-    def _expiration_time() -> str:
+    def _expiration_time() -> datetime:
         """Get token expiration time."""
 
-        expires_at = datetime.now(timezone.utc) + timedelta(minutes=token_expire_minutes)
-        return expires_at.strftime("%Y-%m-%d %H:%M:%S")
+        return datetime.now(timezone.utc) + timedelta(minutes=token_expire_minutes)
     
 class AuthDataManager(BaseDataManager):
     async def add_user(self, user: UserModel) -> None:
         """Add user to database."""
         await self.add_one(user)
     
+    async def update_password(self, email: str, hashed_password: str) -> None:
+        """Replace the password hash of a user."""
+        await self.session.execute(
+            update(UserModel).where(UserModel.email == email).values(hashed_password=hashed_password)
+        )
+        await self.session.commit()
+
     async def get_user(self, email: str) -> UserSchema:
+        """Get user credentials by email.
 
-        model = await self.get_one(select(UserModel).where(UserModel.email == email))
+        Only the columns needed for authentication are selected, so no ORM
+        object and none of its relationships are loaded.
+        """
+        row = (await self.session.execute(
+            select(UserModel.name, UserModel.email, UserModel.hashed_password)
+            .where(UserModel.email == email)
+        )).one_or_none()
 
-        if not isinstance(model, UserModel):
+        if row is None:
             raise_with_log(status.HTTP_404_NOT_FOUND, "User not found")
 
         return UserSchema(
-            name=model.name,
-            email=model.email,
-            hashed_password=model.hashed_password
+            name=row.name,
+            email=row.email,
+            hashed_password=row.hashed_password
         )
 
 
@@ -103,6 +234,10 @@ async def get_current_user(token: str = Depends(oauth2_schema)) -> UserSchema |
     If token is valid then instance of :class:`~app.schemas.auth.UserSchema`
     is returned, otherwise exception is raised.
 
+    Verified tokens are kept in :data:`token_cache` keyed by the token hash,
+    so repeated requests with the same token skip signature verification and
+    only compare the cached expiration time with the current time.
+
     Args:
         token:
             The token to verify.
@@ -114,31 +249,69 @@ async def get_current_user(token: str = Depends(oauth2_schema)) -> UserSchema |
     if token is None:
         raise_with_log(status.HTTP_401_UNAUTHORIZED, "Invalid token")
 
+    key = hashlib.sha256(token.encode()).digest()
+    cached = token_cache.get(key)
+    if cached is None:
+        cached = decode_token(token)
+        token_cache.set(key, cached)
+
+    user, expires = cached
+    if expires <= time.time():
+        token_cache.pop(key)
+        raise_with_log(status.HTTP_401_UNAUTHORIZED, "Token expired")
+
+    return user
+
+
+def decode_token(token: str) -> Tuple[UserSchema, float]:
+    """Verify token signature and extract user and expiration time.
+
+    Tokens carry a numeric ``exp`` claim; tokens issued before it was added
+    only have the ``expires_at`` string, which is parsed as UTC.
+
+    Args:
+        token:
+            The token to verify.
+
+    Returns:
+        User and expiration as Unix time.
+    """
+
     try:
-        # decode token using secret token key provided by config
+        # decode token using secret token key provided by config;
+        # expiration is checked by the caller for both claim formats
         payload = jwt.decode(token=token,
                          key=config.token_key.get_secret_value(),
-                         algorithms=[token_algorithm])
+                         algorithms=[token_algorithm],
+                         options={"verify_exp": False})
+    except JWTError:
+        raise_with_log(status.HTTP_401_UNAUTHORIZED, "Invalid credentials")
 
-        # extract encoded information
-        name: str = payload.get("name")
-        sub: str = payload.get("sub")
-        expires_at: str = payload.get("expires_at")
+    # extract encoded information
+    name: str = payload.get("name")
+    sub: str = payload.get("sub")
+    exp = payload.get("exp")
+    expires_at: str = payload.get("expires_at")
 
-        if sub is None:
+    if sub is None or (exp is None and expires_at is None):
+        raise_with_log(status.HTTP_401_UNAUTHORIZED, "Invalid credentials")
+
+    if exp is None:
+        try:
+            exp = parse_expires_at(expires_at)
+        except (TypeError, ValueError):
             raise_with_log(status.HTTP_401_UNAUTHORIZED, "Invalid credentials")
 
-        if is_expired(expires_at):
-            raise_with_log(status.HTTP_401_UNAUTHORIZED, "Token expired")
+    return UserSchema(name=name, email=sub), float(exp)
 
-        return UserSchema(name=name, email=sub)
-    except JWTError:
-        raise_with_log(status.HTTP_401_UNAUTHORIZED, "Invalid credentials")
 
-    return None
+def parse_expires_at(expires_at: str) -> float:
+    """Convert the legacy ``expires_at`` UTC string to Unix time."""
+
+    return datetime.strptime(expires_at, token_expires_format).replace(tzinfo=timezone.utc).timestamp()
 
 
 def is_expired(expires_at: str) -> bool:
     """Return :obj:`True` if token has expired."""
     
-    return datetime.strptime(expires_at, "%Y-%m-%d %H:%M:%S") < datetime.now(timezone.utc)
\ No newline at end of file
+    return parse_expires_at(expires_at) < time.time()
\ No newline at end of file
@@ -0,0 +1,131 @@
+"""
+Модуль сводного состояния шкафов приводов.
+
+Датчики устанавливаются в шкафы приводов (sensor_devices.cabinet_id). Для
+каждого шкафа в таблице cabinet_health хранятся наибольшая температура и
+наименьший заряд батареи его датчиков и количество преобразователей.
+Таблица выполняет роль материализованного представления и обновляется
+инкрементально: пересчитываются только строки затронутых шкафов —
+при записи пакета показаний (обработчик пакета SensorIngestBuffer), при
+изменении датчика и после загрузки преобразователей.
+
+Обзор завода читается одним запросом: cabinet_health, соединённая по
+первичным ключам со шкафами, помещениями, линиями и цехами.
+"""
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.converters import CabinetModel, ConverterModel, LocationModel, MillShopModel, ProductionLineModel
+from app.models.sensors import CabinetHealthModel, SensorDeviceModel, SensorLatestModel
+from app.schemas.sensors import CabinetHealthSchema
+from app.services.base import BaseService
+
+
+async def refresh_cabinet_health(session: AsyncSession, cabinet_ids: Iterable[int] | None = None) -> None:
+    """
+    Пересчитывает сводное состояние шкафов без фиксации транзакции.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        cabinet_ids (Iterable[int] | None): ID шкафов; None — все шкафы.
+    """
+    if cabinet_ids is not None:
+        cabinet_ids = list(cabinet_ids)
+        if not cabinet_ids:
+            return
+
+    sensors = select(
+        SensorDeviceModel.cabinet_id,
+        func.max(SensorLatestModel.temperature).label("max_temperature"),
+        func.min(SensorLatestModel.battery).label("min_battery"),
+        func.count().label("sensor_count"),
+        func.max(SensorLatestModel.ts).label("ts"),
+    ).join(SensorLatestModel, SensorLatestModel.address == SensorDeviceModel.address)
+    converters = select(ConverterModel.cabinet_id, func.count().label("converter_count"))
+    cabinets = select(CabinetModel.id)
+    if cabinet_ids is not None:
+        sensors = sensors.where(SensorDeviceModel.cabinet_id.in_(cabinet_ids))
+        converters = converters.where(ConverterModel.cabinet_id.in_(cabinet_ids))
+        cabinets = cabinets.where(CabinetModel.id.in_(cabinet_ids))
+    sensors = sensors.group_by(SensorDeviceModel.cabinet_id).subquery()
+    converters = converters.group_by(ConverterModel.cabinet_id).subquery()
+    rows = (
+        cabinets.add_columns(
+            sensors.c.max_temperature,
+            sensors.c.min_battery,
+            func.coalesce(sensors.c.sensor_count, 0),
+            func.coalesce(converters.c.converter_count, 0),
+            sensors.c.ts,
+        )
+        .outerjoin(sensors, sensors.c.cabinet_id == CabinetModel.id)
+        .outerjoin(converters, converters.c.cabinet_id == CabinetModel.id)
+    )
+
+    statement = delete(CabinetHealthModel)
+    if cabinet_ids is not None:
+        statement = statement.where(CabinetHealthModel.cabinet_id.in_(cabinet_ids))
+    await session.execute(statement)
+    await session.execute(insert(CabinetHealthModel).from_select(
+        ["cabinet_id", "max_temperature", "min_battery", "sensor_count", "converter_count", "ts"], rows
+    ))
+
+
+async def refresh_on_flush(session: AsyncSession, _readings: List[Dict[str, Any]], latest: List[Dict[str, Any]]) -> None:
+    """
+    Обработчик пакета SensorIngestBuffer: пересчитывает шкафы датчиков пакета.
+
+    Args:
+        session (AsyncSession): Сессия транзакции пакета.
+        _readings (List[Dict[str, Any]]): Показания пакета.
+        latest (List[Dict[str, Any]]): Последнее показание каждого датчика пакета.
+    """
+    if not latest:
+        return
+    cabinet_ids = (await session.scalars(
+        select(SensorDeviceModel.cabinet_id)
+        .where(
+            SensorDeviceModel.address.in_([row["address"] for row in latest]),
+            SensorDeviceModel.cabinet_id.is_not(None),
+        )
+        .distinct()
+    )).all()
+    await refresh_cabinet_health(session, cabinet_ids)
+
+
+class CabinetHealthService(BaseService):
+    """
+    Сервис для чтения сводного состояния шкафов приводов.
+    """
+    async def get_overview(self) -> List[CabinetHealthSchema]:
+        """
+        Получает сводное состояние всех шкафов с цехом, линией и помещением.
+
+        Returns:
+            List[CabinetHealthSchema]: Шкафы по цеху, линии, помещению и названию.
+        """
+        statement = (
+            select(
+                MillShopModel.id.label("mill_shop_id"),
+                MillShopModel.name.label("mill_shop"),
+                ProductionLineModel.id.label("production_line_id"),
+                ProductionLineModel.name.label("production_line"),
+                LocationModel.id.label("location_id"),
+                LocationModel.name.label("location"),
+                CabinetModel.id.label("cabinet_id"),
+                CabinetModel.name.label("cabinet"),
+                CabinetHealthModel.max_temperature,
+                CabinetHealthModel.min_battery,
+                CabinetHealthModel.sensor_count,
+                CabinetHealthModel.converter_count,
+                CabinetHealthModel.ts,
+            )
+            .join(CabinetModel, CabinetModel.id == CabinetHealthModel.cabinet_id)
+            .join(LocationModel, LocationModel.id == CabinetModel.location_id)
+            .join(ProductionLineModel, ProductionLineModel.id == LocationModel.production_line_id)
+            .join(MillShopModel, MillShopModel.id == ProductionLineModel.mill_shop_id)
+            .order_by(MillShopModel.name, ProductionLineModel.name, LocationModel.name, CabinetModel.name)
+        )
+        rows = (await self.session.execute(statement)).mappings().all()
+        return [CabinetHealthSchema.model_validate(dict(row)) for row in rows]
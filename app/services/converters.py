@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.base import BaseService, BaseDataManager, GenericDataManager
 from app.schemas.converters import ( CabinetSchema, LocationSchema, ProductionLineSchema, UnitSchema, ConverterSchema, MillShopSchema )
 from app.models.converters import ConverterModel, MillShopModel, ProductionLineModel, LocationModel, CabinetModel, UnitModel
+from app.services.cabinet_health import refresh_cabinet_health
 
 class ConverterService(BaseService):
     """
@@ -50,6 +51,8 @@ class ConverterService(BaseService):
         # await self.add_cabinets('app/data/drivers/drivers.json')
         await self.add_converters('app/data/drivers/drivers.json')
         # await self.add_units('app/data/drivers/drivers.json')
+        await refresh_cabinet_health(self.session)
+        await self.session.commit()
         
     async def add_mill_shops(self, file_path: str) -> None:
         with open(file_path, 'r', encoding='utf-8') as file:
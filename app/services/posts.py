@@ -1,31 +1,282 @@
-from typing import List
+import asyncio
+import base64
+import binascii
+import math
+from datetime import datetime
+from typing import Dict, List, Tuple
 
-from sqlalchemy import select
+from fastapi import status
+from sqlalchemy import select, func, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.const import post_count_cache_ttl
+from app.models.auth import UserModel
 from app.models.posts import PostModel
-from app.schemas.posts import PostSchema
+from app.schemas.posts import PostSchema, PostAuthorSchema, PostFeedItemSchema, PostFeedSchema
 from app.services.base import BaseService, BaseDataManager
+from app.utils.cache import LRUCache
+from app.utils.exc import raise_with_log
+
+# Общее количество постов для отображения «страница X из Y».
+# Точность до времени жизни записи достаточна, COUNT(*) не выполняется на каждый запрос.
+post_count_cache: LRUCache[int] = LRUCache(maxsize=1, ttl=post_count_cache_ttl)
+
+
+def encode_cursor(created_at: datetime, post_id: int, page: int) -> str:
+    """
+    Кодирует позицию в ленте в непрозрачный курсор.
+
+    Args:
+        created_at (datetime): Дата создания последнего поста страницы.
+        post_id (int): ID последнего поста страницы.
+        page (int): Номер страницы, на которой остановилась выборка.
+
+    Returns:
+        str: Курсор для запроса следующей страницы.
+    """
+    raw = f"{created_at.isoformat()}|{post_id}|{page}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int, int]:
+    """
+    Декодирует курсор ленты.
+
+    Args:
+        cursor (str): Курсор, полученный из предыдущей страницы.
+
+    Returns:
+        Tuple[datetime, int, int]: Дата создания, ID поста и номер страницы.
+
+    Raises:
+        HTTPException: 400, если курсор повреждён.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, post_id, page = raw.split("|")
+        return datetime.fromisoformat(created_at), int(post_id), int(page)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise_with_log(status.HTTP_400_BAD_REQUEST, "Некорректный курсор ленты")
+
+
+class AuthorLoader:
+    """
+    Пакетный загрузчик авторов постов в стиле DataLoader.
+
+    Все вызовы ``load`` в пределах одной итерации цикла событий собираются
+    и обслуживаются одним запросом ``WHERE id IN (...)``; загруженные
+    авторы запоминаются на время жизни загрузчика.
+    """
+    def __init__(self, session: AsyncSession):
+        """
+        Инициализирует AuthorLoader.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия базы данных.
+        """
+        self.session = session
+        self._cache: Dict[int, PostAuthorSchema | None] = {}
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._task: asyncio.Task | None = None
+
+    async def load(self, user_id: int) -> PostAuthorSchema | None:
+        """
+        Возвращает автора по ID, откладывая запрос до сбора пакета.
+
+        Args:
+            user_id (int): ID пользователя.
+
+        Returns:
+            PostAuthorSchema | None: Автор или None, если пользователь удалён.
+        """
+        if user_id in self._cache:
+            return self._cache[user_id]
+        future = self._pending.get(user_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._pending:
+                # Запрос выполняется на следующей итерации цикла, когда все load текущей уже вызваны
+                self._task = loop.create_task(self._dispatch())
+            future = self._pending[user_id] = loop.create_future()
+        return await future
+
+    async def load_many(self, user_ids: List[int]) -> List[PostAuthorSchema | None]:
+        """
+        Возвращает авторов для списка ID одним запросом.
+
+        Args:
+            user_ids (List[int]): ID пользователей.
+
+        Returns:
+            List[PostAuthorSchema | None]: Авторы в порядке ``user_ids``.
+        """
+        return list(await asyncio.gather(*(self.load(user_id) for user_id in user_ids)))
+
+    async def _dispatch(self) -> None:
+        """
+        Выполняет один запрос для всех накопленных ID и разрешает ожидания.
+
+        Ошибка запроса передаётся всем ожидающим load, при отмене задачи
+        ожидания отменяются.
+        """
+        pending, self._pending = self._pending, {}
+        try:
+            statement = select(UserModel.id, UserModel.name).where(UserModel.id.in_(pending))
+            rows = (await self.session.execute(statement)).all()
+            authors = {row.id: PostAuthorSchema(id=row.id, name=row.name) for row in rows}
+        except asyncio.CancelledError:
+            for future in pending.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for user_id, future in pending.items():
+            self._cache[user_id] = authors.get(user_id)
+            if not future.done():
+                future.set_result(self._cache[user_id])
+
 
 class PostService(BaseService):
-    def get_post(self, post_id: int) -> PostSchema:
-        return PostDataManager(self.session).get_post(post_id)
+    """
+    Сервис для чтения постов.
 
-    def get_posts(self) -> List[PostSchema]:
-        return PostDataManager(self.session).get_posts()
+    Лента отдаётся по курсору на (``created_at``, ``id``): каждая страница —
+    это один проход по индексу ``ix_posts_created_at_id`` без OFFSET,
+    авторы страницы подгружаются одним запросом.
+    """
+    def __init__(self, session: AsyncSession):
+        """
+        Инициализирует PostService.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия базы данных.
+        """
+        super().__init__(session)
+        self.data_manager = PostDataManager(session)
+
+    async def get_post(self, post_id: int) -> PostSchema:
+        """
+        Получает пост по ID.
+
+        Args:
+            post_id (int): ID поста.
+
+        Returns:
+            PostSchema: Пост.
+
+        Raises:
+            HTTPException: 404, если пост не найден.
+        """
+        post = await self.data_manager.get_post(post_id)
+        if post is None:
+            raise_with_log(status.HTTP_404_NOT_FOUND, "Пост не найден")
+        return post
+
+    async def get_feed(self, cursor: str | None, limit: int) -> PostFeedSchema:
+        """
+        Получает страницу ленты постов, начиная с самых новых.
+
+        Args:
+            cursor (str | None): Курсор из предыдущей страницы или None для первой.
+            limit (int): Количество постов на странице.
+
+        Returns:
+            PostFeedSchema: Посты с авторами, курсор следующей страницы и счётчики.
+
+        Raises:
+            HTTPException: 400, если курсор повреждён.
+        """
+        after, page = None, 1
+        if cursor is not None:
+            created_at, post_id, previous = decode_cursor(cursor)
+            after, page = (created_at, post_id), previous + 1
+
+        models = await self.data_manager.get_page(after, limit + 1)
+        has_next = len(models) > limit
+        models = models[:limit]
+
+        authors = await AuthorLoader(self.session).load_many([m.user_id for m in models])
+        items = [
+            PostFeedItemSchema(**PostSchema.model_validate(m).model_dump(), author=author)
+            for m, author in zip(models, authors)
+        ]
+        next_cursor = encode_cursor(models[-1].created_at, models[-1].id, page) if has_next else None
 
+        total = await self.get_total()
+        return PostFeedSchema(
+            items=items,
+            next_cursor=next_cursor,
+            page=page,
+            pages=max(math.ceil(total / limit), page),
+            total=total,
+        )
 
-class PostDataManager(BaseDataManager):
-    
+    async def get_total(self) -> int:
+        """
+        Возвращает общее количество постов из кеша или базы.
+
+        Returns:
+            int: Количество постов.
+        """
+        total = post_count_cache.get("total")
+        if total is None:
+            total = await self.data_manager.count_posts()
+            post_count_cache.set("total", total)
+        return total
+
+
+class PostDataManager(BaseDataManager[PostSchema]):
+    """
+    Менеджер данных для постов.
+    """
     def __init__(self, session: AsyncSession):
+        """
+        Инициализирует PostDataManager.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия базы данных.
+        """
         super().__init__(session, PostSchema)
-        
-    def get_post(self, post_id: int) -> PostSchema:
+
+    async def get_post(self, post_id: int) -> PostSchema | None:
+        """
+        Получает пост по ID.
+
+        Args:
+            post_id (int): ID поста.
+
+        Returns:
+            PostSchema | None: Пост или None, если пост не найден.
+        """
         statement = select(PostModel).where(PostModel.id == post_id)
-        return self.get_one(statement)
-
-    def get_posts(self) -> List[PostSchema]:
-        schemas: List[PostSchema] = list()
-        statement = select(PostModel)
-        for model in self.get_all(statement):
-            schemas.append(PostSchema(**model.to_dict()))
-        return schemas
+        model = await self.get_one(statement)
+        return PostSchema.model_validate(model) if model is not None else None
+
+    async def get_page(self, after: Tuple[datetime, int] | None, limit: int) -> List[PostModel]:
+        """
+        Получает посты, опубликованные раньше заданной позиции.
+
+        Args:
+            after (Tuple[datetime, int] | None): (``created_at``, ``id``) последнего
+                поста предыдущей страницы или None для первой страницы.
+            limit (int): Максимальное количество постов.
+
+        Returns:
+            List[PostModel]: Посты от новых к старым.
+        """
+        statement = select(PostModel).order_by(PostModel.created_at.desc(), PostModel.id.desc()).limit(limit)
+        if after is not None:
+            statement = statement.where(tuple_(PostModel.created_at, PostModel.id) < tuple_(*after))
+        return await self.get_all(statement)
+
+    async def count_posts(self) -> int:
+        """
+        Считает общее количество постов.
+
+        Returns:
+            int: Количество постов.
+        """
+        return (await self.session.execute(select(func.count()).select_from(PostModel))).scalar_one()
@@ -0,0 +1,215 @@
+"""
+Модуль ограничения частоты попыток входа.
+
+Каждая попытка POST /token проверяет пароль bcrypt, поэтому серия попыток
+(скрипт, подбор пароля, неверно настроенный клиент) нагружает сервер.
+Перед AuthService.authenticate попытка берёт по токену из двух корзин —
+по email и по IP-адресу клиента. Если в одной из них токенов нет, запрос
+отклоняется с кодом 429 и заголовком Retry-After ещё до обращения к базе
+данных и проверки пароля.
+
+Корзины хранятся в бэкенде (RateLimitBackend):
+- MemoryRateLimitBackend — ограниченный LRU-кеш процесса; запись корзины
+  устаревает, когда корзина заполнилась бы полностью;
+- DatabaseRateLimitBackend — таблица login_buckets, общая для всех
+  процессов; корзина обновляется одним атомарным UPSERT ... RETURNING.
+
+Адрес клиента берётся из request.client, который uvicorn заполняет из
+X-Forwarded-For только для адресов из --forwarded-allow-ips (переменная
+FORWARDED_ALLOW_IPS в docker-entrypoint.sh). Там должен быть указан только
+обратный прокси: иначе клиент подставляет в заголовок любой адрес и
+обходит корзину по IP.
+
+Ключ корзины содержит SHA-256 идентификатора, а не сам email: длина ключа
+не зависит от присланного имени пользователя и помещается в login_buckets.key.
+"""
+import hashlib
+import time
+from typing import Callable, Protocol, Tuple
+
+from fastapi import Depends, Request, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import case, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.const import (
+    login_rate_email_capacity,
+    login_rate_email_refill,
+    login_rate_ip_capacity,
+    login_rate_ip_refill,
+    login_rate_limit_keys,
+    login_rate_limit_purge_interval
+)
+from app.core.config import config
+from app.database.session import get_session_factory
+from app.database.upsert import dialect_insert
+from app.models.auth import LoginBucketModel
+from app.utils.cache import LRUCache
+from app.utils.exc import raise_with_log
+
+
+class RateLimitBackend(Protocol):
+    """
+    Хранилище корзин токенов.
+    """
+    async def take(self, key: str, capacity: int, refill: float) -> float:
+        """
+        Берёт токен из корзины key.
+
+        Args:
+            key (str): Ключ корзины.
+            capacity (int): Размер корзины.
+            refill (float): Скорость пополнения в токенах в секунду.
+
+        Returns:
+            float: 0, если токен взят, иначе секунды до появления токена.
+        """
+
+
+class MemoryRateLimitBackend:
+    """
+    Корзины токенов в памяти процесса.
+
+    Attributes:
+        maxsize (int): Наибольшее количество корзин.
+    """
+    def __init__(self, maxsize: int = login_rate_limit_keys) -> None:
+        """
+        Инициализирует MemoryRateLimitBackend.
+
+        Args:
+            maxsize (int): Наибольшее количество корзин.
+        """
+        self._buckets: LRUCache[Tuple[float, float]] = LRUCache(maxsize=maxsize)
+
+    async def take(self, key: str, capacity: int, refill: float) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * refill)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # Полная корзина не отличается от отсутствующей.
+        self._buckets.set(key, (tokens, now), ttl=(capacity - tokens) / refill)
+        return 0.0 if allowed else (1 - tokens) / refill
+
+    def clear(self) -> None:
+        """Удаляет все корзины."""
+        self._buckets.clear()
+
+
+class DatabaseRateLimitBackend:
+    """
+    Корзины токенов в таблице login_buckets, общие для всех процессов.
+
+    Attributes:
+        purge_interval (float): Интервал удаления давно не использованных корзин в секундах.
+    """
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] | None = None,
+        purge_interval: float = login_rate_limit_purge_interval,
+    ) -> None:
+        """
+        Инициализирует DatabaseRateLimitBackend.
+
+        Args:
+            session_factory (Callable | None): Фабрика сессий. По умолчанию общая фабрика приложения.
+            purge_interval (float): Интервал удаления давно не использованных корзин в секундах.
+        """
+        self._session_factory = session_factory
+        self.purge_interval = purge_interval
+        self._purged_at = time.time()
+
+    async def take(self, key: str, capacity: int, refill: float) -> float:
+        now = time.time()
+        async with (self._session_factory or get_session_factory())() as session:
+            statement = dialect_insert(session, LoginBucketModel).values(
+                key=key, tokens=capacity - 1, updated_at=now, allowed=True
+            )
+            table = LoginBucketModel.__table__.c
+            refilled = table.tokens + (now - table.updated_at) * refill
+            refilled = case((refilled > capacity, capacity), else_=refilled)
+            # Выражения SET видят значения строки до обновления.
+            statement = statement.on_conflict_do_update(
+                index_elements=["key"],
+                set_={
+                    "tokens": case((refilled >= 1, refilled - 1), else_=refilled),
+                    "updated_at": now,
+                    "allowed": refilled >= 1,
+                },
+            ).returning(LoginBucketModel.tokens, LoginBucketModel.allowed)
+            tokens, allowed = (await session.execute(statement)).one()
+            if now - self._purged_at > self.purge_interval:
+                self._purged_at = now
+                await session.execute(
+                    delete(LoginBucketModel).where(LoginBucketModel.updated_at < now - self.purge_interval)
+                )
+            await session.commit()
+        return 0.0 if allowed else (1 - tokens) / refill
+
+
+def bucket_key(kind: str, identifier: str) -> str:
+    """
+    Возвращает ключ корзины фиксированной длины.
+
+    Args:
+        kind (str): Вид корзины: email или ip.
+        identifier (str): Email или IP-адрес клиента.
+
+    Returns:
+        str: Ключ вида <вид>:<SHA-256 идентификатора>.
+    """
+    return f"{kind}:{hashlib.sha256(identifier.encode()).hexdigest()}"
+
+
+class LoginThrottle:
+    """
+    Ограничение частоты попыток входа по email и IP-адресу клиента.
+    """
+    def __init__(self, backend: RateLimitBackend) -> None:
+        """
+        Инициализирует LoginThrottle.
+
+        Args:
+            backend (RateLimitBackend): Хранилище корзин.
+        """
+        self.backend = backend
+        self.rejected = 0
+
+    async def check(self, email: str, client_ip: str | None) -> None:
+        """
+        Берёт токены попытки входа из корзин email и IP-адреса.
+
+        Raises:
+            HTTPException: 429 с заголовком Retry-After, если попыток слишком много.
+        """
+        retry_after = await self.backend.take(
+            bucket_key("email", email.strip().lower()), login_rate_email_capacity, login_rate_email_refill
+        )
+        if client_ip is not None:
+            retry_after = max(retry_after, await self.backend.take(
+                bucket_key("ip", client_ip), login_rate_ip_capacity, login_rate_ip_refill
+            ))
+        if retry_after > 0:
+            self.rejected += 1
+            raise_with_log(
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                "Too many login attempts",
+                {"Retry-After": str(int(retry_after) + 1)},
+            )
+
+
+login_throttle = LoginThrottle(
+    DatabaseRateLimitBackend() if config.login_rate_limit_backend == "database" else MemoryRateLimitBackend()
+)
+
+
+async def throttle_login(request: Request, login: OAuth2PasswordRequestForm = Depends()) -> None:
+    """
+    Зависимость POST /token: отклоняет попытку входа при превышении частоты.
+
+    Raises:
+        HTTPException: 429 Too Many Requests
+    """
+    await login_throttle.check(login.username, request.client.host if request.client else None)
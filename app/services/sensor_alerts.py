@@ -0,0 +1,422 @@
+"""
+Модуль правил оповещений по показаниям датчиков.
+
+Правила (порог снизу, порог сверху, рост за окно) задаются для группы
+датчиков и проверяются для каждого записываемого пакета показаний
+(SensorAlertEngine.evaluate — обработчик пакета SensorIngestBuffer).
+Все правила проверяются для всех показаний пакета одной операцией над
+матрицей «правило × показание», а переходы применяются в порядке ts; рост за окно считается по окну последних
+показаний в памяти, без обращения к таблице sensor_readings.
+
+Для пары (правило, датчик) хранится не больше одного активного оповещения:
+в таблицу записываются только переходы — срабатывание и возврат в норму.
+Переходы также сохраняются в session.info[ALERT_EVENTS_KEY] для рассылки
+подписчикам после фиксации пакета.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from fastapi import status
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.const import sensor_alert_config_ttl
+from app.models.sensors import SensorAlertModel, SensorAlertRuleModel, SensorDeviceModel
+from app.schemas.sensors import (
+    SensorAlertSchema,
+    SensorAlertRuleCreateSchema,
+    SensorAlertRuleSchema,
+    SensorDeviceSchema
+)
+from app.services.base import BaseService
+from app.services.cabinet_health import refresh_cabinet_health
+from app.services.sensors import sensor_window, to_epoch_ms
+from app.utils.cache import LRUCache
+from app.utils.exc import raise_with_log
+from app.utils.ringbuffer import ColumnarRingBuffer
+
+# Показания, для которых задаются правила, в порядке строк матрицы значений.
+ALERT_FIELDS = ("battery", "temperature")
+# Ключ session.info с переходами оповещений пакета.
+ALERT_EVENTS_KEY = "sensor_alert_events"
+
+
+class SensorAlertEngine:
+    """
+    Проверка правил оповещений для пакетов показаний.
+
+    Правила и группы датчиков кешируются на sensor_alert_config_ttl секунд
+    и сбрасываются при их изменении через SensorAlertService.
+    """
+    def __init__(self, window: ColumnarRingBuffer = sensor_window) -> None:
+        """
+        Инициализирует SensorAlertEngine.
+
+        Args:
+            window (ColumnarRingBuffer): Окно последних показаний для правил rise.
+        """
+        self.window = window
+        self._config: LRUCache[Tuple[List[SensorAlertRuleSchema], Dict[str, str]]] = LRUCache(
+            maxsize=1, ttl=sensor_alert_config_ttl
+        )
+
+    def invalidate(self) -> None:
+        """Сбрасывает закешированные правила и группы датчиков."""
+        self._config.clear()
+
+    async def _load_config(self, session: AsyncSession) -> Tuple[List[SensorAlertRuleSchema], Dict[str, str]]:
+        """
+        Получает действующие правила и группы датчиков.
+        """
+        config = self._config.get("config")
+        if config is None:
+            rules = (await session.scalars(
+                select(SensorAlertRuleModel).where(SensorAlertRuleModel.enabled.is_(True))
+            )).all()
+            groups = (await session.execute(
+                select(SensorDeviceModel.address, SensorDeviceModel.group)
+                .where(SensorDeviceModel.group.is_not(None))
+            )).all()
+            config = ([SensorAlertRuleSchema.model_validate(rule) for rule in rules], dict(groups))
+            self._config.set("config", config)
+        return config
+
+    def check(
+        self,
+        rules: List[SensorAlertRuleSchema],
+        groups: Dict[str, str],
+        readings: List[Dict[str, Any]],
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Проверяет правила для показаний пакета.
+
+        Args:
+            rules (List[SensorAlertRuleSchema]): Действующие правила.
+            groups (Dict[str, str]): Группы датчиков по адресу.
+            readings (List[Dict[str, Any]]): Показания, упорядоченные по (адрес, ts).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Матрицы «правило × показание»:
+                применимость правила, нарушение правила и проверенное значение
+                (для rise — рост относительно минимума за окно).
+        """
+        addresses = [row["address"] for row in readings]
+        ts = np.fromiter((row["ts"] for row in readings), dtype=np.int64, count=len(readings))
+        values = np.array([[row[field] for row in readings] for field in ALERT_FIELDS], dtype=np.float64)
+
+        sensor_groups = np.array([groups.get(address) for address in addresses], dtype=object)
+        rule_groups = np.array([rule.group for rule in rules], dtype=object)
+        for_all = np.array([rule.group is None for rule in rules])
+        applicable = for_all[:, None] | (rule_groups[:, None] == sensor_groups[None, :])
+
+        field_index = np.array([ALERT_FIELDS.index(rule.field) for rule in rules])
+        threshold = np.array([rule.threshold for rule in rules])[:, None]
+        kinds = np.array([rule.kind for rule in rules])
+        observed = values[field_index]
+
+        is_rise = kinds == "rise"
+        if is_rise.any():
+            rise_rules = np.flatnonzero(is_rise)
+            observed[rise_rules] -= self._window_minimums(
+                [rules[i] for i in rise_rules], addresses, ts, observed[rise_rules]
+            )
+
+        with np.errstate(invalid="ignore"):
+            violated = np.where((kinds == "min")[:, None], observed < threshold, observed > threshold)
+        violated &= applicable & ~np.isnan(observed)
+        return applicable, violated, observed
+
+    def _window_minimums(
+        self,
+        rules: List[SensorAlertRuleSchema],
+        addresses: List[str],
+        ts: np.ndarray,
+        current: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Вычисляет минимумы показаний правил rise за их окна.
+
+        Окно каждого датчика читается один раз, а минимумы по всем правилам и
+        показаниям датчика вычисляются одной операцией над массивом
+        «правило × показание × запись окна».
+
+        Returns:
+            np.ndarray: Минимумы формы (правила, показания); без записей в окне — текущее значение.
+        """
+        windows = np.array([rule.window * 1000 for rule in rules], dtype=np.int64)
+        fields = [rule.field for rule in rules]
+        minimums = current.copy()
+        for start, end in _address_ranges(addresses):
+            reading_ts = ts[start:end]
+            records = self.window.window(addresses[start], since=int(reading_ts.min() - windows.max()))
+            records = records[records["ts"] <= reading_ts.max()]
+            if not len(records):
+                continue
+            record_ts = records["ts"][None, None, :]
+            in_window = (
+                (record_ts >= (reading_ts[None, :] - windows[:, None])[:, :, None])
+                & (record_ts <= reading_ts[None, :, None])
+            )
+            series = np.stack([records[field].astype(np.float64) for field in fields])[:, None, :]
+            window_min = np.where(in_window, series, np.inf).min(axis=2)
+            minimums[:, start:end] = np.minimum(window_min, current[:, start:end])
+        return minimums
+
+    async def evaluate(
+        self,
+        session: AsyncSession,
+        readings: List[Dict[str, Any]],
+        latest: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Проверяет правила для пакета и записывает переходы оповещений без фиксации транзакции.
+
+        Проверяется каждое показание пакета, а переходы применяются в порядке
+        ts, поэтому нарушение, возникшее и исчезнувшее внутри одного пакета
+        (например, при дозагрузке истории), записывается как закрытое оповещение.
+
+        Args:
+            session (AsyncSession): Сессия транзакции пакета.
+            readings (List[Dict[str, Any]]): Показания пакета.
+            latest (List[Dict[str, Any]]): Последнее показание каждого датчика пакета.
+        """
+        if not readings:
+            return
+        rules, groups = await self._load_config(session)
+        if not rules:
+            return
+        readings = sorted(readings, key=lambda row: (row["address"], row["ts"]))
+        applicable, violated, observed = self.check(rules, groups, readings)
+        addresses = [row["address"] for row in readings]
+        active = dict(
+            ((rule_id, address), alert_id)
+            for alert_id, rule_id, address in (await session.execute(
+                select(SensorAlertModel.id, SensorAlertModel.rule_id, SensorAlertModel.address)
+                .where(SensorAlertModel.resolved_at.is_(None), SensorAlertModel.address.in_(set(addresses)))
+            )).all()
+        )
+
+        # Состояние перед показанием: предыдущее показание датчика в пакете
+        # или, для первого показания датчика, наличие активного оповещения.
+        previous = np.empty_like(violated)
+        previous[:, 1:] = violated[:, :-1]
+        for start, _ in _address_ranges(addresses):
+            previous[:, start] = [(rule.id, addresses[start]) in active for rule in rules]
+        changed = applicable & (violated != previous)
+
+        opened: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        fired: List[Dict[str, Any]] = []
+        resolved: List[Dict[str, Any]] = []
+        events: List[Dict[str, Any]] = []
+        for i, j in zip(*np.nonzero(changed)):
+            key = (rules[i].id, addresses[j])
+            ts = readings[j]["ts"]
+            if violated[i, j]:
+                opened[key] = {
+                    "rule_id": rules[i].id,
+                    "address": addresses[j],
+                    "value": float(observed[i, j]),
+                    "fired_at": ts,
+                    "resolved_at": None,
+                }
+                fired.append(opened[key])
+            elif key in opened:
+                opened.pop(key)["resolved_at"] = ts
+            else:
+                resolved.append({"id": active[key], "resolved_at": ts})
+            events.append({
+                "rule_id": rules[i].id,
+                "address": addresses[j],
+                "field": rules[i].field,
+                "value": float(observed[i, j]),
+                "ts": ts,
+                "active": bool(violated[i, j]),
+            })
+        if fired:
+            await session.execute(insert(SensorAlertModel), fired)
+        if resolved:
+            await session.execute(update(SensorAlertModel), resolved)
+        session.info.setdefault(ALERT_EVENTS_KEY, []).extend(events)
+
+
+def _address_ranges(addresses: List[str]) -> List[Tuple[int, int]]:
+    """
+    Возвращает границы подряд идущих показаний одного датчика.
+
+    Args:
+        addresses (List[str]): Адреса показаний, упорядоченных по адресу.
+
+    Returns:
+        List[Tuple[int, int]]: Пары (начало, конец) для каждого датчика.
+    """
+    starts = [j for j in range(len(addresses)) if j == 0 or addresses[j] != addresses[j - 1]]
+    return list(zip(starts, starts[1:] + [len(addresses)]))
+
+
+# Проверка правил оповещений процесса; подключается к буферу приёма в lifespan приложения.
+sensor_alert_engine = SensorAlertEngine()
+
+
+class SensorAlertService(BaseService):
+    """
+    Сервис для управления правилами оповещений и чтения оповещений.
+    """
+    async def get_alerts(self, active: bool, address: str | None, limit: int) -> List[SensorAlertSchema]:
+        """
+        Получает оповещения, начиная с последних.
+
+        Args:
+            active (bool): Только активные оповещения.
+            address (str | None): Адрес датчика.
+            limit (int): Наибольшее количество оповещений.
+
+        Returns:
+            List[SensorAlertSchema]: Оповещения по убыванию времени срабатывания.
+        """
+        statement = (
+            select(
+                SensorAlertModel.id,
+                SensorAlertModel.rule_id,
+                SensorAlertModel.address,
+                SensorAlertRuleModel.field,
+                SensorAlertRuleModel.kind,
+                SensorAlertRuleModel.threshold,
+                SensorAlertModel.value,
+                SensorAlertModel.fired_at,
+                SensorAlertModel.resolved_at,
+            )
+            .join(SensorAlertRuleModel, SensorAlertRuleModel.id == SensorAlertModel.rule_id)
+            .order_by(SensorAlertModel.fired_at.desc(), SensorAlertModel.id.desc())
+            .limit(limit)
+        )
+        if active:
+            statement = statement.where(SensorAlertModel.resolved_at.is_(None))
+        if address is not None:
+            statement = statement.where(SensorAlertModel.address == address)
+        rows = (await self.session.execute(statement)).mappings().all()
+        return [SensorAlertSchema.model_validate(dict(row)) for row in rows]
+
+    async def get_rules(self) -> List[SensorAlertRuleSchema]:
+        """
+        Получает все правила оповещений.
+
+        Returns:
+            List[SensorAlertRuleSchema]: Правила по возрастанию ID.
+        """
+        rules = (await self.session.scalars(select(SensorAlertRuleModel).order_by(SensorAlertRuleModel.id))).all()
+        return [SensorAlertRuleSchema.model_validate(rule) for rule in rules]
+
+    async def add_rule(self, rule: SensorAlertRuleCreateSchema) -> SensorAlertRuleSchema:
+        """
+        Добавляет правило оповещения.
+
+        Args:
+            rule (SensorAlertRuleCreateSchema): Правило.
+
+        Returns:
+            SensorAlertRuleSchema: Сохранённое правило.
+        """
+        model = SensorAlertRuleModel(**rule.model_dump())
+        self.session.add(model)
+        await self.session.commit()
+        sensor_alert_engine.invalidate()
+        return SensorAlertRuleSchema.model_validate(model)
+
+    async def update_rule(self, rule_id: int, rule: SensorAlertRuleCreateSchema) -> SensorAlertRuleSchema:
+        """
+        Изменяет правило оповещения.
+
+        Отключённое правило больше не проверяется, поэтому его активные
+        оповещения закрываются временем изменения правила. Так же
+        закрываются оповещения датчиков, не входящих в новую группу правила.
+
+        Args:
+            rule_id (int): ID правила.
+            rule (SensorAlertRuleCreateSchema): Новые параметры правила.
+
+        Returns:
+            SensorAlertRuleSchema: Сохранённое правило.
+
+        Raises:
+            HTTPException: 404, если правило не найдено.
+        """
+        model = await self.session.get(SensorAlertRuleModel, rule_id)
+        if model is None:
+            raise_with_log(status.HTTP_404_NOT_FOUND, "Правило оповещения не найдено")
+        for field, value in rule.model_dump().items():
+            setattr(model, field, value)
+        if not rule.enabled:
+            await self._resolve_open_alerts(SensorAlertModel.rule_id == rule_id)
+        elif rule.group is not None:
+            await self._resolve_open_alerts(
+                SensorAlertModel.rule_id == rule_id,
+                SensorAlertModel.address.not_in(
+                    select(SensorDeviceModel.address).where(SensorDeviceModel.group == rule.group)
+                ),
+            )
+        await self.session.commit()
+        sensor_alert_engine.invalidate()
+        return SensorAlertRuleSchema.model_validate(model)
+
+    async def delete_rule(self, rule_id: int) -> None:
+        """
+        Удаляет правило оповещения вместе с его оповещениями.
+
+        Args:
+            rule_id (int): ID правила.
+
+        Raises:
+            HTTPException: 404, если правило не найдено.
+        """
+        await self.session.execute(delete(SensorAlertModel).where(SensorAlertModel.rule_id == rule_id))
+        result = await self.session.execute(delete(SensorAlertRuleModel).where(SensorAlertRuleModel.id == rule_id))
+        if not result.rowcount:
+            await self.session.rollback()
+            raise_with_log(status.HTTP_404_NOT_FOUND, "Правило оповещения не найдено")
+        await self.session.commit()
+        sensor_alert_engine.invalidate()
+
+    async def set_device(self, device: SensorDeviceSchema) -> SensorDeviceSchema:
+        """
+        Добавляет датчик или изменяет его название, группу и шкаф.
+
+        Сводное состояние прежнего и нового шкафа датчика пересчитывается,
+        активные оповещения правил чужих групп закрываются.
+
+        Args:
+            device (SensorDeviceSchema): Датчик.
+
+        Returns:
+            SensorDeviceSchema: Сохранённый датчик.
+        """
+        previous = await self.session.scalar(
+            select(SensorDeviceModel.cabinet_id).where(SensorDeviceModel.address == device.address)
+        )
+        await self.session.merge(SensorDeviceModel(**device.model_dump()))
+        await self.session.flush()
+        group_rules = select(SensorAlertRuleModel.id).where(SensorAlertRuleModel.group.is_not(None))
+        if device.group is not None:
+            group_rules = group_rules.where(SensorAlertRuleModel.group != device.group)
+        await self._resolve_open_alerts(
+            SensorAlertModel.address == device.address, SensorAlertModel.rule_id.in_(group_rules)
+        )
+        await refresh_cabinet_health(
+            self.session, {cabinet_id for cabinet_id in (previous, device.cabinet_id) if cabinet_id is not None}
+        )
+        await self.session.commit()
+        sensor_alert_engine.invalidate()
+        return device
+
+    async def _resolve_open_alerts(self, *criteria) -> None:
+        """
+        Закрывает активные оповещения текущим временем.
+
+        Args:
+            *criteria: Условия отбора оповещений.
+        """
+        await self.session.execute(
+            update(SensorAlertModel)
+            .where(SensorAlertModel.resolved_at.is_(None), *criteria)
+            .values(resolved_at=to_epoch_ms(datetime.now(timezone.utc)))
+        )
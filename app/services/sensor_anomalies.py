@@ -0,0 +1,181 @@
+"""
+Модуль обнаружения аномалий в показаниях датчиков.
+
+Для каждого датчика инкрементально поддерживаются экспоненциально
+взвешенные среднее и дисперсия (EWMA) температуры и скорости разряда
+батареи. Каждое новое показание оценивается z-оценкой относительно
+собственной базовой линии датчика до её обновления; датчик считается
+аномальным, если |z| превышает порог.
+
+Состояние хранится в массивах NumPy фиксированного размера (по столбцу на
+датчик) и обновляется при приёме показаний одной операцией на пакет.
+Список аномальных датчиков пересчитывается только после изменений,
+поэтому запрос /sensors/anomalies отдаёт готовый результат.
+"""
+from typing import Dict, List
+
+import numpy as np
+
+from app.const import (
+    sensor_window_max_sensors,
+    sensor_anomaly_alpha,
+    sensor_anomaly_threshold,
+    sensor_anomaly_warmup
+)
+from app.schemas.sensors import SensorAnomalySchema
+
+# Оцениваемые величины в порядке строк массивов состояния.
+ANOMALY_FIELDS = ("temperature", "discharge_rate")
+MS_PER_HOUR = 3_600_000
+
+
+class SensorAnomalyDetector:
+    """
+    Инкрементальная оценка отклонения показаний датчиков от их базовой линии.
+
+    Attributes:
+        max_sensors (int): Наибольшее количество датчиков.
+        alpha (float): Вес нового показания в EWMA.
+        threshold (float): Порог |z| для признания показания аномальным.
+        warmup (int): Количество показаний до начала оценки.
+    """
+    def __init__(
+        self,
+        max_sensors: int = sensor_window_max_sensors,
+        alpha: float = sensor_anomaly_alpha,
+        threshold: float = sensor_anomaly_threshold,
+        warmup: int = sensor_anomaly_warmup,
+    ) -> None:
+        """
+        Инициализирует SensorAnomalyDetector.
+
+        Args:
+            max_sensors (int): Наибольшее количество датчиков.
+            alpha (float): Вес нового показания в EWMA.
+            threshold (float): Порог |z|.
+            warmup (int): Количество показаний до начала оценки.
+        """
+        self.max_sensors = max_sensors
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self._snapshot: List[SensorAnomalySchema] | None = None
+        self.clear()
+
+    def clear(self) -> None:
+        """
+        Сбрасывает состояние всех датчиков.
+        """
+        shape = (len(ANOMALY_FIELDS), self.max_sensors)
+        self._index: Dict[str, int] = {}
+        self._addresses: List[str] = []
+        self._mean = np.zeros(shape)
+        self._var = np.zeros(shape)
+        self._count = np.zeros(shape, dtype=np.int64)
+        self._value = np.full(shape, np.nan)
+        self._z = np.zeros(shape)
+        self._last_ts = np.zeros(self.max_sensors, dtype=np.int64)
+        self._last_battery = np.full(self.max_sensors, np.nan)
+        self._snapshot = None
+
+    def update(self, addresses: List[str], ts: np.ndarray, battery: np.ndarray, temperature: np.ndarray) -> None:
+        """
+        Учитывает пакет показаний.
+
+        Показания одного датчика обрабатываются по возрастанию времени: на
+        каждом шаге обновляется k-е показание всех датчиков пакета сразу.
+        Датчики сверх max_sensors не оцениваются.
+
+        Args:
+            addresses (List[str]): Адреса датчиков.
+            ts (np.ndarray): Время показаний в миллисекундах Unix.
+            battery (np.ndarray): Заряд батареи.
+            temperature (np.ndarray): Температура.
+        """
+        index = np.fromiter((self._slot(address) for address in addresses), dtype=np.int64, count=len(addresses))
+        known = index >= 0
+        if not known.any():
+            return
+        index, ts = index[known], np.asarray(ts, dtype=np.int64)[known]
+        battery = np.asarray(battery, dtype=np.float64)[known]
+        temperature = np.asarray(temperature, dtype=np.float64)[known]
+
+        order = np.lexsort((ts, index))
+        index, ts, battery, temperature = index[order], ts[order], battery[order], temperature[order]
+        _, starts, counts = np.unique(index, return_index=True, return_counts=True)
+        rank = np.arange(len(index)) - np.repeat(starts, counts)
+
+        for step in range(int(rank.max()) + 1):
+            selected = rank == step
+            sensors, step_ts = index[selected], ts[selected]
+            step_battery = battery[selected]
+            hours = (step_ts - self._last_ts[sensors]) / MS_PER_HOUR
+            has_rate = (hours > 0) & ~np.isnan(self._last_battery[sensors])
+            rate = (step_battery - self._last_battery[sensors]) / np.where(hours > 0, hours, 1.0)
+            self._observe(0, sensors, temperature[selected], np.ones(len(sensors), dtype=bool))
+            self._observe(1, sensors, rate, has_rate)
+            newer = step_ts >= self._last_ts[sensors]
+            self._last_ts[sensors[newer]] = step_ts[newer]
+            self._last_battery[sensors[newer]] = step_battery[newer]
+        self._snapshot = None
+
+    def _observe(self, row: int, sensors: np.ndarray, values: np.ndarray, mask: np.ndarray) -> None:
+        """
+        Оценивает значения и обновляет EWMA величины row для датчиков sensors.
+        """
+        sensors, values = sensors[mask], values[mask]
+        mean, var, count = self._mean[row, sensors], self._var[row, sensors], self._count[row, sensors]
+        deviation = values - mean
+        std = np.sqrt(var)
+        scored = (count >= self.warmup) & (std > 0)
+        self._z[row, sensors] = np.where(scored, deviation / np.where(std > 0, std, 1.0), 0.0)
+        first = count == 0
+        self._mean[row, sensors] = np.where(first, values, mean + self.alpha * deviation)
+        self._var[row, sensors] = np.where(first, 0.0, (1 - self.alpha) * (var + self.alpha * deviation ** 2))
+        self._count[row, sensors] = count + 1
+        self._value[row, sensors] = values
+
+    def anomalies(self) -> List[SensorAnomalySchema]:
+        """
+        Возвращает датчики, последнее показание которых отклоняется от базовой линии.
+
+        Returns:
+            List[SensorAnomalySchema]: Аномальные датчики по адресу.
+        """
+        if self._snapshot is None:
+            size = len(self._addresses)
+            flagged = np.abs(self._z[:, :size]) > self.threshold
+            self._snapshot = [
+                SensorAnomalySchema(
+                    address=self._addresses[i],
+                    ts=int(self._last_ts[i]),
+                    fields=[field for row, field in enumerate(ANOMALY_FIELDS) if flagged[row, i]],
+                    temperature=float(self._value[0, i]),
+                    temperature_mean=float(self._mean[0, i]),
+                    temperature_z=float(self._z[0, i]),
+                    discharge_rate=None if np.isnan(self._value[1, i]) else float(self._value[1, i]),
+                    discharge_rate_mean=float(self._mean[1, i]),
+                    discharge_rate_z=float(self._z[1, i]),
+                )
+                for i in sorted(np.flatnonzero(flagged.any(axis=0)).tolist(), key=self._addresses.__getitem__)
+            ]
+        return self._snapshot
+
+    def _slot(self, address: str) -> int:
+        """
+        Возвращает столбец состояния датчика, выделяя его для нового датчика.
+
+        Returns:
+            int: Номер столбца или -1, если свободных столбцов нет.
+        """
+        slot = self._index.get(address)
+        if slot is None:
+            if len(self._addresses) >= self.max_sensors:
+                return -1
+            slot = self._index[address] = len(self._addresses)
+            self._addresses.append(address)
+        return slot
+
+
+# Оценка аномалий процесса; обновляется при приёме показаний.
+sensor_anomaly_detector = SensorAnomalyDetector()
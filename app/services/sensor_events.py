@@ -0,0 +1,264 @@
+"""
+Модуль рассылки новых показаний и оповещений датчиков подписчикам.
+
+SensorEventHub — pub/sub в памяти процесса: после фиксации каждого пакета
+(обработчик фиксации SensorIngestBuffer) показания и переходы оповещений
+пакета рассылаются подписчикам потоков SSE и WebSocket.
+
+У каждого подписчика своя очередь ограниченного размера; публикация только
+кладёт готовые сообщения в очереди и никогда не ждёт подписчиков. Подписчик,
+очередь которого переполнена, отключается: его поток завершается, и клиент
+переподключается, не замедляя приём показаний.
+
+Сообщения сериализуются один раз на публикацию: общее сообщение для
+подписчиков без фильтра и по сообщению на адрес для подписчиков с фильтром
+по адресам. Поэтому рассылка стоит O(подписчики), а не O(подписчики × показания).
+"""
+import asyncio
+import json
+from typing import Any, AsyncIterator, Callable, Dict, FrozenSet, Iterable, List, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.const import sensor_events_queue_size, sensor_events_keepalive
+from app.database.session import get_session_factory
+from app.models.sensors import SensorDeviceModel
+from app.schemas.sensors import SensorReadingSchema
+from app.services.sensor_alerts import ALERT_EVENTS_KEY
+
+# Сообщение подписчику: тип события и данные в JSON.
+SensorEvent = Tuple[str, str]
+
+# Поля показания в событии reading.
+READING_FIELDS = tuple(SensorReadingSchema.model_fields)
+
+
+class SensorSubscriber:
+    """
+    Подписчик на события датчиков с ограниченной очередью.
+
+    Attributes:
+        addresses (FrozenSet[str] | None): Адреса датчиков; None — все датчики.
+        closed (bool): Подписчик отключён.
+    """
+    def __init__(self, addresses: FrozenSet[str] | None, maxsize: int) -> None:
+        """
+        Инициализирует SensorSubscriber.
+
+        Args:
+            addresses (FrozenSet[str] | None): Адреса датчиков; None — все датчики.
+            maxsize (int): Наибольшее количество сообщений в очереди.
+        """
+        self.addresses = addresses
+        self.closed = False
+        self._queue: asyncio.Queue[SensorEvent | None] = asyncio.Queue(maxsize=maxsize)
+
+    def send(self, event: SensorEvent) -> bool:
+        """
+        Кладёт сообщение в очередь, не дожидаясь подписчика.
+
+        Returns:
+            bool: False, если очередь переполнена.
+        """
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def close(self) -> None:
+        """
+        Отключает подписчика: поток завершается после непрочитанных сообщений,
+        а если очередь переполнена — сразу, и непрочитанные сообщения отбрасываются.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        if self._queue.full():
+            while not self._queue.empty():
+                self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+    async def get(self, timeout: float | None = None) -> SensorEvent | None:
+        """
+        Ожидает следующее сообщение.
+
+        Args:
+            timeout (float | None): Наибольшее время ожидания в секундах.
+
+        Returns:
+            SensorEvent | None: Сообщение или None, если подписчик отключён.
+
+        Raises:
+            asyncio.TimeoutError: Если за timeout сообщений не было.
+        """
+        event = await asyncio.wait_for(self._queue.get(), timeout)
+        if event is None:
+            self._queue.put_nowait(None)
+        return event
+
+
+class SensorEventHub:
+    """
+    Рассылка событий датчиков подписчикам процесса.
+
+    Attributes:
+        queue_size (int): Размер очереди подписчика.
+        published (int): Количество публикаций.
+        dropped (int): Количество подписчиков, отключённых из-за переполнения очереди.
+    """
+    def __init__(self, queue_size: int = sensor_events_queue_size) -> None:
+        """
+        Инициализирует SensorEventHub.
+
+        Args:
+            queue_size (int): Размер очереди подписчика.
+        """
+        self.queue_size = queue_size
+        self._subscribers: Set[SensorSubscriber] = set()
+        self.published = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, addresses: Iterable[str] | None = None) -> SensorSubscriber:
+        """
+        Добавляет подписчика.
+
+        Args:
+            addresses (Iterable[str] | None): Адреса датчиков; None — все датчики.
+
+        Returns:
+            SensorSubscriber: Подписчик.
+        """
+        subscriber = SensorSubscriber(None if addresses is None else frozenset(addresses), self.queue_size)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: SensorSubscriber) -> None:
+        """
+        Удаляет подписчика.
+
+        Args:
+            subscriber (SensorSubscriber): Подписчик.
+        """
+        self._subscribers.discard(subscriber)
+        subscriber.close()
+
+    def close(self) -> None:
+        """
+        Отключает всех подписчиков.
+        """
+        for subscriber in self._subscribers:
+            subscriber.close()
+        self._subscribers.clear()
+
+    def publish(self, event: str, items: List[Dict[str, Any]]) -> None:
+        """
+        Рассылает элементы с полем address подписчикам, не ожидая их.
+
+        Args:
+            event (str): Тип события.
+            items (List[Dict[str, Any]]): Элементы события.
+        """
+        if not items or not self._subscribers:
+            return
+        self.published += 1
+        by_address: Dict[str, List[Dict[str, Any]]] = {}
+        for item in items:
+            by_address.setdefault(item["address"], []).append(item)
+        everything: SensorEvent | None = None
+        per_address: Dict[str, SensorEvent] = {}
+
+        for subscriber in list(self._subscribers):
+            if subscriber.addresses is None:
+                if everything is None:
+                    everything = (event, json.dumps(items, ensure_ascii=False, default=str))
+                messages = [everything]
+            else:
+                messages = []
+                for address in subscriber.addresses & by_address.keys():
+                    if address not in per_address:
+                        per_address[address] = (event, json.dumps(by_address[address], ensure_ascii=False, default=str))
+                    messages.append(per_address[address])
+            if not all(subscriber.send(message) for message in messages):
+                self._subscribers.discard(subscriber)
+                subscriber.close()
+                self.dropped += 1
+
+    def on_commit(self, session: AsyncSession, readings: List[Dict[str, Any]], _latest: List[Dict[str, Any]]) -> None:
+        """
+        Рассылает показания и переходы оповещений зафиксированного пакета.
+
+        Args:
+            session (AsyncSession): Сессия транзакции пакета.
+            readings (List[Dict[str, Any]]): Записанные показания.
+            _latest (List[Dict[str, Any]]): Последнее показание каждого датчика пакета.
+        """
+        alerts = session.info.pop(ALERT_EVENTS_KEY, [])
+        if not self._subscribers:
+            return
+        self.publish("reading", [{name: reading[name] for name in READING_FIELDS} for reading in readings])
+        self.publish("alert", alerts)
+
+
+# Рассылка событий датчиков процесса; подключается к буферу приёма в lifespan приложения.
+sensor_event_hub = SensorEventHub()
+
+
+async def get_group_addresses(
+    groups: Iterable[str],
+    session_factory: Callable[[], AsyncSession] | None = None,
+) -> Set[str]:
+    """
+    Получает адреса датчиков групп.
+
+    Сессия закрывается сразу после запроса, а не держится всё время потока.
+
+    Args:
+        groups (Iterable[str]): Группы датчиков.
+        session_factory (Callable | None): Фабрика сессий. По умолчанию общая фабрика приложения.
+
+    Returns:
+        Set[str]: Адреса датчиков.
+    """
+    async with (session_factory or get_session_factory())() as session:
+        return set((await session.scalars(
+            select(SensorDeviceModel.address).where(SensorDeviceModel.group.in_(list(groups)))
+        )).all())
+
+
+async def stream_events(
+    subscriber: SensorSubscriber,
+    hub: SensorEventHub | None = None,
+    keepalive: float = sensor_events_keepalive,
+) -> AsyncIterator[str]:
+    """
+    Передаёт события подписчика в формате Server-Sent Events.
+
+    При отсутствии событий каждые keepalive секунд передаётся комментарий,
+    чтобы прокси не закрывали соединение. Подписчик удаляется при завершении потока.
+
+    Args:
+        subscriber (SensorSubscriber): Подписчик.
+        hub (SensorEventHub | None): Рассылка подписчика. По умолчанию sensor_event_hub.
+        keepalive (float): Интервал комментариев keepalive в секундах.
+
+    Yields:
+        str: События SSE.
+    """
+    try:
+        while True:
+            try:
+                message = await subscriber.get(keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if message is None:
+                return
+            event, data = message
+            yield f"event: {event}\ndata: {data}\n\n"
+    finally:
+        (hub or sensor_event_hub).unsubscribe(subscriber)
@@ -0,0 +1,248 @@
+"""
+Модуль приёма показаний датчиков по строковому протоколу через UDP и TCP.
+
+Шлюзы, которые не поддерживают HTTPS и JSON, передают по одному показанию
+на строку::
+
+    address,ts,status,battery,temperature
+
+где ts — время в секундах или миллисекундах Unix либо строка времени в
+формате, который понимает parse_sensor_date. Датаграмма UDP может содержать
+несколько строк, поток TCP — произвольное их количество.
+
+Разобранные показания передаются в тот же буфер пакетной записи, что и
+показания из /sensors/receive_data. Когда буфер заполнен, показания UDP
+отбрасываются, а чтение из TCP-соединения приостанавливается до сброса
+буфера, и шлюз получает обратное давление через TCP.
+"""
+import asyncio
+import math
+from typing import Dict, List, Tuple
+
+from fastapi import HTTPException
+from loguru import logger
+
+from app.const import sensor_max_line_bytes
+from app.schemas.sensors import SensorRecord
+from app.services.sensors import SensorIngestBuffer, parse_sensor_date, sensor_buffer
+
+# Значения ts меньше этого считаются секундами, а не миллисекундами.
+SECONDS_TS_LIMIT = 100_000_000_000
+# Наибольший размер пакета чтения из TCP-соединения.
+TCP_READ_SIZE = 65536
+
+
+class LineProtocolParser:
+    """
+    Разборщик строкового протокола показаний.
+
+    Строки адресов и состояний повторяются от пакета к пакету, поэтому их
+    декодированные значения кешируются, а числа разбираются прямо из bytes.
+
+    Attributes:
+        errors (int): Количество отброшенных некорректных строк.
+    """
+    def __init__(self) -> None:
+        """
+        Инициализирует LineProtocolParser.
+        """
+        self._strings: Dict[bytes, str] = {}
+        self.errors = 0
+
+    def _decode(self, value: bytes) -> str:
+        """Декодирует строку протокола, переиспользуя ранее декодированные."""
+        decoded = self._strings.get(value)
+        if decoded is None:
+            if len(self._strings) >= 65536:
+                self._strings.clear()
+            decoded = self._strings[value] = value.decode()
+        return decoded
+
+    def parse(self, lines: List[bytes]) -> List[SensorRecord]:
+        """
+        Разбирает строки протокола.
+
+        Некорректные строки пропускаются и учитываются в errors.
+
+        Args:
+            lines (List[bytes]): Строки без символов перевода строки.
+
+        Returns:
+            List[SensorRecord]: Показания с заполненным ts.
+        """
+        records: List[SensorRecord] = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                address, ts, status, battery, temperature = line.split(b",")
+                if ts.isdigit():
+                    ts_ms = int(ts)
+                    if ts_ms < SECONDS_TS_LIMIT:
+                        ts_ms *= 1000
+                else:
+                    ts_ms = parse_sensor_date(ts.decode())
+                    if ts_ms is None:
+                        raise ValueError(ts)
+                battery_value, temperature_value = float(battery), float(temperature)
+                if not (math.isfinite(battery_value) and math.isfinite(temperature_value)):
+                    raise ValueError(line)
+                address_str = self._decode(address.strip())
+                records.append({
+                    "name": address_str,
+                    "address": address_str,
+                    "date": ts.decode(),
+                    "status": self._decode(status.strip()),
+                    "battery": battery_value,
+                    "temperature": temperature_value,
+                    "ts": ts_ms,
+                })
+            except (ValueError, UnicodeDecodeError):
+                self.errors += 1
+        return records
+
+
+class SensorDatagramProtocol(asyncio.DatagramProtocol):
+    """
+    Протокол UDP: каждая датаграмма содержит одну или несколько строк.
+    """
+    def __init__(self, listener: "SensorListener") -> None:
+        self.listener = listener
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        records = self.listener.parser.parse(data.split(b"\n"))
+        if records and not self.listener.offer(records):
+            self.listener.dropped += len(records)
+
+
+class SensorListener:
+    """
+    Сервер приёма показаний по строковому протоколу через UDP и TCP.
+
+    Attributes:
+        buffer (SensorIngestBuffer): Буфер пакетной записи.
+        parser (LineProtocolParser): Разборщик строк.
+        received (int): Количество принятых показаний.
+        dropped (int): Количество показаний UDP, отброшенных при заполненном буфере.
+    """
+    def __init__(self, buffer: SensorIngestBuffer | None = None) -> None:
+        """
+        Инициализирует SensorListener.
+
+        Args:
+            buffer (SensorIngestBuffer | None): Буфер приёма. По умолчанию sensor_buffer.
+        """
+        self.buffer = buffer or sensor_buffer
+        self.parser = LineProtocolParser()
+        self.received = 0
+        self.dropped = 0
+        self._udp: asyncio.DatagramTransport | None = None
+        self._tcp: asyncio.Server | None = None
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    @property
+    def udp_address(self) -> Tuple[str, int] | None:
+        """Адрес, на котором принимаются датаграммы UDP."""
+        return self._udp.get_extra_info("sockname")[:2] if self._udp else None
+
+    @property
+    def tcp_address(self) -> Tuple[str, int] | None:
+        """Адрес, на котором принимаются соединения TCP."""
+        return self._tcp.sockets[0].getsockname()[:2] if self._tcp else None
+
+    def offer(self, records: List[SensorRecord]) -> bool:
+        """
+        Передаёт показания в буфер приёма.
+
+        Args:
+            records (List[SensorRecord]): Показания.
+
+        Returns:
+            bool: False, если буфер заполнен и показания не приняты.
+        """
+        try:
+            self.buffer.ingest_records(records)
+        except HTTPException:
+            return False
+        self.received += len(records)
+        return True
+
+    async def start(self, host: str, udp_port: int | None = None, tcp_port: int | None = None) -> None:
+        """
+        Запускает приём показаний на заданных портах.
+
+        Args:
+            host (str): Адрес для прослушивания.
+            udp_port (int | None): Порт UDP. Если None, UDP не используется; 0 — любой свободный.
+            tcp_port (int | None): Порт TCP. Если None, TCP не используется; 0 — любой свободный.
+        """
+        loop = asyncio.get_running_loop()
+        if udp_port is not None and self._udp is None:
+            self._udp, _ = await loop.create_datagram_endpoint(
+                lambda: SensorDatagramProtocol(self), local_addr=(host, udp_port)
+            )
+            logger.info("Приём показаний по UDP на {}", self.udp_address)
+        if tcp_port is not None and self._tcp is None:
+            self._tcp = await asyncio.start_server(self._handle_stream, host, tcp_port)
+            logger.info("Приём показаний по TCP на {}", self.tcp_address)
+
+    async def stop(self) -> None:
+        """
+        Останавливает приём показаний.
+
+        Открытые TCP-соединения шлюзов закрываются принудительно: начиная с
+        Python 3.12 Server.wait_closed ждёт завершения всех соединений.
+        """
+        if self._udp is not None:
+            self._udp.close()
+            self._udp = None
+        if self._tcp is not None:
+            self._tcp.close()
+            connections = list(self._connections)
+            for task in connections:
+                task.cancel()
+            await asyncio.gather(*connections, return_exceptions=True)
+            await self._tcp.wait_closed()
+            self._tcp = None
+
+    async def _handle_stream(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Читает строки из TCP-соединения пакетами до его закрытия.
+
+        Если строка длиннее sensor_max_line_bytes, соединение закрывается:
+        без перевода строки незавершённый хвост иначе рос бы неограниченно.
+        """
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        tail = b""
+        try:
+            while True:
+                chunk = await reader.read(TCP_READ_SIZE)
+                if not chunk:
+                    break
+                lines = (tail + chunk).split(b"\n")
+                tail = lines.pop()
+                records = self.parser.parse(lines)
+                while records and not self.offer(records):
+                    await asyncio.sleep(self.buffer.flush_interval)
+                if len(tail) > sensor_max_line_bytes:
+                    logger.warning("Строка шлюза датчиков длиннее {} байт, соединение закрыто", sensor_max_line_bytes)
+                    self.parser.errors += 1
+                    return
+            records = self.parser.parse([tail])
+            if records:
+                self.offer(records)
+        except ConnectionError as e:
+            logger.warning("Соединение шлюза датчиков прервано: {}", e)
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+# Сервер приёма показаний процесса; запускается в lifespan приложения, если заданы порты.
+sensor_listener = SensorListener()
@@ -0,0 +1,282 @@
+"""
+Модуль обслуживания таблицы показаний датчиков: срок хранения и архивирование.
+
+Сырые показания старше sensor_retention_days суток удаляются по суткам
+одним DELETE по столбцу day и его индексу. Удаление и выгрузка суток
+ограничены наибольшим ID показаний суток на начало прохода: показания,
+пришедшие за эти сутки позже, остаются до следующего прохода и не удаляются
+без выгрузки. Агрегаты sensor_rollups не
+затрагиваются, поэтому графики за удалённые интервалы остаются доступными.
+
+Если задан каталог архива, перед удалением показания суток выгружаются в
+файл sensor_readings_<ГГГГ-ММ-ДД>.ndjson.gz. Выгрузка читается частями, файл
+сначала пишется во временный и переименовывается после записи, поэтому при
+сбое сутки не удаляются. Если архив суток уже есть, выгрузка дописывается
+к нему отдельным членом gzip.
+
+Чтобы обслуживание не мешало приёму показаний, за один проход удаляется не
+больше max_days суток, а между частями выгрузки и сутками делается пауза.
+Задание выполняется в фоне приложения (start/stop в lifespan) или из
+командной строки:
+
+    python -m app.services.sensor_retention --days 90 --archive /data/archive
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, List, Sequence
+
+from loguru import logger
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.const import (
+    sensor_retention_interval,
+    sensor_retention_chunk_size,
+    sensor_retention_max_days,
+    sensor_retention_pause
+)
+from app.core.config import config
+from app.database.session import get_session_factory
+from app.models.sensors import SensorReadingModel
+from app.schemas.sensors import SensorRetentionSchema
+from app.services.sensors import MS_PER_DAY
+
+# Столбцы показания в архиве.
+ARCHIVE_FIELDS = ("name", "address", "date", "ts", "status", "battery", "temperature", "received_at")
+
+
+def day_to_date(day: int) -> str:
+    """
+    Возвращает дату суток показаний в формате ГГГГ-ММ-ДД (UTC).
+
+    Args:
+        day (int): Номер суток от 1970-01-01.
+
+    Returns:
+        str: Дата.
+    """
+    return datetime.fromtimestamp(day * MS_PER_DAY / 1000, tz=timezone.utc).date().isoformat()
+
+
+class SensorRetentionJob:
+    """
+    Удаление устаревших показаний датчиков сутками с необязательным архивированием.
+
+    Attributes:
+        retention_days (int | None): Срок хранения сырых показаний в сутках; None — без ограничения.
+        archive_path (str | None): Каталог архива; None — удалять без выгрузки.
+        interval (float): Интервал между проходами фонового задания в секундах.
+        chunk_size (int): Количество показаний в одной части выгрузки.
+        max_days (int): Наибольшее количество суток, удаляемых за проход.
+        pause (float): Пауза между частями выгрузки и сутками в секундах.
+    """
+    def __init__(
+        self,
+        retention_days: int | None = config.sensor_retention_days,
+        archive_path: str | None = config.sensor_archive_path,
+        interval: float = sensor_retention_interval,
+        chunk_size: int = sensor_retention_chunk_size,
+        max_days: int = sensor_retention_max_days,
+        pause: float = sensor_retention_pause,
+        session_factory: Callable[[], AsyncSession] | None = None,
+    ) -> None:
+        """
+        Инициализирует SensorRetentionJob.
+
+        Args:
+            retention_days (int | None): Срок хранения сырых показаний в сутках.
+            archive_path (str | None): Каталог архива.
+            interval (float): Интервал между проходами фонового задания в секундах.
+            chunk_size (int): Количество показаний в одной части выгрузки.
+            max_days (int): Наибольшее количество суток, удаляемых за проход.
+            pause (float): Пауза между частями выгрузки и сутками в секундах.
+            session_factory (Callable | None): Фабрика сессий. По умолчанию общая фабрика приложения.
+        """
+        self.retention_days = retention_days
+        self.archive_path = archive_path
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self.max_days = max_days
+        self.pause = pause
+        self._session_factory = session_factory
+        self._task: asyncio.Task | None = None
+
+    @property
+    def session_factory(self) -> Callable[[], AsyncSession]:
+        """Фабрика сессий для обслуживания таблицы показаний."""
+        return self._session_factory or get_session_factory()
+
+    async def run(self, now: datetime | None = None) -> SensorRetentionSchema:
+        """
+        Выполняет один проход: выгружает и удаляет сутки старше срока хранения.
+
+        Args:
+            now (datetime | None): Текущее время. По умолчанию системное.
+
+        Returns:
+            SensorRetentionSchema: Удалённые сутки, количество показаний и файлы архива.
+        """
+        result = SensorRetentionSchema(days=[], deleted=0, archived=[])
+        if self.retention_days is None:
+            return result
+        now = now or datetime.now(timezone.utc)
+        cutoff = int(now.timestamp() * 1000) // MS_PER_DAY - self.retention_days
+        async with self.session_factory() as session:
+            days = (await session.scalars(
+                select(SensorReadingModel.day)
+                .where(SensorReadingModel.day < cutoff)
+                .distinct()
+                .order_by(SensorReadingModel.day)
+                .limit(self.max_days)
+            )).all()
+        for day in days:
+            last_id = await self.last_id(day)
+            if self.archive_path is not None:
+                result.archived.append(await self.archive_day(day, last_id))
+            deleted = await self.delete_day(day, last_id)
+            result.days.append(day)
+            result.deleted += deleted
+            logger.info("Удалены показания датчиков за {}: {}", day_to_date(day), deleted)
+        return result
+
+    async def last_id(self, day: int) -> int:
+        """
+        Возвращает наибольший ID показаний суток.
+
+        Args:
+            day (int): Номер суток от 1970-01-01.
+
+        Returns:
+            int: ID или 0, если показаний нет.
+        """
+        async with self.session_factory() as session:
+            return await session.scalar(
+                select(func.coalesce(func.max(SensorReadingModel.id), 0)).where(SensorReadingModel.day == day)
+            )
+
+    async def delete_day(self, day: int, last_id: int) -> int:
+        """
+        Удаляет показания суток с ID не больше last_id одним запросом.
+
+        Args:
+            day (int): Номер суток от 1970-01-01.
+            last_id (int): Наибольший ID удаляемых показаний.
+
+        Returns:
+            int: Количество удалённых показаний.
+        """
+        statement = delete(SensorReadingModel).where(SensorReadingModel.day == day, SensorReadingModel.id <= last_id)
+        async with self.session_factory() as session:
+            deleted = (await session.execute(statement)).rowcount
+            await session.commit()
+        await asyncio.sleep(self.pause)
+        return deleted
+
+    async def archive_day(self, day: int, last_id: int) -> str:
+        """
+        Выгружает показания суток с ID не больше last_id в сжатый файл NDJSON.
+
+        Args:
+            day (int): Номер суток от 1970-01-01.
+            last_id (int): Наибольший ID выгружаемых показаний.
+
+        Returns:
+            str: Путь к файлу архива.
+        """
+        directory = Path(self.archive_path)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"sensor_readings_{day_to_date(day)}.ndjson.gz"
+        temporary = path.with_name(path.name + ".tmp")
+        statement = (
+            select(*(getattr(SensorReadingModel, name) for name in ARCHIVE_FIELDS))
+            .where(SensorReadingModel.day == day, SensorReadingModel.id <= last_id)
+            .order_by(SensorReadingModel.address, SensorReadingModel.ts)
+            .execution_options(yield_per=self.chunk_size)
+        )
+        with open(temporary, "wb") as raw:
+            if path.exists():
+                # Показания, пришедшие за сутки после прошлой выгрузки, дописываются к архиву
+                await asyncio.to_thread(_copy_file, path, raw)
+            with gzip.open(raw, "wt", encoding="utf-8") as archive:
+                async with self.session_factory() as session:
+                    result = await session.stream(statement)
+                    async for rows in result.partitions():
+                        await asyncio.to_thread(archive.write, _to_ndjson(rows))
+                        await asyncio.sleep(self.pause)
+        os.replace(temporary, path)
+        return str(path)
+
+    async def start(self) -> None:
+        """
+        Запускает фоновое задание, если задан срок хранения.
+        """
+        if self._task is None and self.retention_days is not None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Останавливает фоновое задание.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """
+        Выполняет проходы с интервалом interval.
+        """
+        while True:
+            try:
+                await self.run()
+            except Exception as e:
+                logger.error("Ошибка обслуживания показаний датчиков: {}", e)
+            await asyncio.sleep(self.interval)
+
+
+def _copy_file(path: Path, target) -> None:
+    """Копирует содержимое файла в открытый файл."""
+    with open(path, "rb") as source:
+        shutil.copyfileobj(source, target)
+
+
+def _to_ndjson(rows: Sequence[Sequence[Any]]) -> str:
+    """Сериализует строки показаний для архива."""
+    return "".join(
+        json.dumps(dict(zip(ARCHIVE_FIELDS, row)), ensure_ascii=False, default=str) + "\n" for row in rows
+    )
+
+
+# Обслуживание показаний процесса; запускается и останавливается в lifespan приложения.
+sensor_retention_job = SensorRetentionJob()
+
+
+def main(argv: List[str] | None = None) -> None:
+    """
+    Выполняет один проход обслуживания из командной строки.
+
+    Args:
+        argv (List[str] | None): Аргументы командной строки.
+    """
+    parser = argparse.ArgumentParser(description="Удаление и архивирование устаревших показаний датчиков")
+    parser.add_argument("--days", type=int, default=config.sensor_retention_days, help="срок хранения в сутках")
+    parser.add_argument("--archive", default=config.sensor_archive_path, help="каталог архива")
+    parser.add_argument("--max-days", type=int, default=sensor_retention_max_days, help="суток за проход")
+    args = parser.parse_args(argv)
+    if args.days is None:
+        parser.error("не задан срок хранения: --days или SENSOR_RETENTION_DAYS")
+    job = SensorRetentionJob(retention_days=args.days, archive_path=args.archive, max_days=args.max_days)
+    print(asyncio.run(job.run()).model_dump_json())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1079 @@
+"""
+Модуль сервиса приёма показаний датчиков.
+
+Показания не записываются в базу в обработчике запроса: они попадают в
+ограниченный буфер в памяти процесса (SensorIngestBuffer), а фоновая задача
+записывает их пакетами одним INSERT на пакет — по достижении размера пакета
+или по истечении интервала. Когда буфер заполнен, новые показания
+отклоняются с кодом 429, чтобы память процесса оставалась ограниченной.
+При остановке приложения буфер сбрасывается полностью.
+
+Время показания разбирается один раз при приёме (parse_sensor_date) и
+хранится в миллисекундах Unix, поэтому выборка показаний датчика за
+интервал — это просмотр диапазона индекса (address, ts), результаты
+которого передаются клиенту потоком (stream_readings).
+
+Вместе с каждым пакетом показаний в той же транзакции обновляются агрегаты
+за минуту, час и сутки (aggregate_rollups, upsert_rollups). Графики за
+длинные интервалы строятся по самым крупным агрегатам, которые ещё дают
+нужную детализацию (SensorService.get_rollups).
+
+Последнее показание каждого датчика сохраняется в таблице sensor_latest
+той же транзакцией и зеркалируется в памяти процесса (SensorLatestCache),
+откуда обзор всех датчиков отдаётся готовым телом ответа с ETag.
+
+Показания за последние часы хранятся в кольцевом буфере фиксированного
+размера (sensor_window) и читаются без обращения к базе данных.
+
+Шлюзы повторяют отправку и пересылают перекрывающиеся интервалы, поэтому
+повторные показания (тот же address и ts) отбрасываются при приёме по
+ограниченному набору последних ключей, а уникальный индекс (address, ts)
+с ON CONFLICT DO NOTHING отсекает повторы, которых уже нет в этом наборе.
+Агрегаты, последние показания и обработчики пакета получают только
+действительно записанные показания.
+
+Кроме JSON-объекта SensorData, шлюзы могут передавать показания потоком
+NDJSON (ingest_ndjson) или компактным бинарным пакетом (decode_binary_batch):
+оба формата проверяются пакетами без создания объектов pydantic.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import struct
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+from fastapi import status
+from loguru import logger
+from pydantic import ValidationError
+from sqlalchemy import select, case, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.const import (
+    sensor_buffer_capacity,
+    sensor_batch_size,
+    sensor_flush_interval,
+    sensor_date_cache_size,
+    sensor_stream_chunk_size,
+    sensor_downsample_candidates,
+    sensor_rollup_resolutions,
+    sensor_rollup_points,
+    sensor_latest_refresh_interval,
+    sensor_window_capacity,
+    sensor_window_max_sensors,
+    sensor_stream_batch_size,
+    sensor_max_line_bytes,
+    sensor_max_body_bytes,
+    sensor_dedup_keys
+)
+from app.core.config import config
+from app.database.session import get_session_factory
+from app.database.upsert import dialect_insert
+from app.models.sensors import SensorReadingModel, SensorRollupModel, SensorLatestModel
+from app.models.speed import moscow_tz
+from app.schemas.sensors import (
+    Sensor,
+    SensorRecord,
+    sensor_records_adapter,
+    SensorReadingSchema,
+    SensorLatestSchema,
+    SensorRollupSchema,
+    SensorRollupSeriesSchema,
+    SensorWindowSchema,
+    SensorIngestSchema,
+    SensorIngestStatsSchema
+)
+from app.services.base import BaseService
+from app.services.sensor_anomalies import sensor_anomaly_detector
+from app.utils.cache import LRUCache
+from app.utils.downsample import lttb
+from app.utils.exc import raise_with_log
+from app.utils.ringbuffer import ColumnarRingBuffer
+
+# Миллисекунд в сутках: ts // MS_PER_DAY — номер суток показания.
+MS_PER_DAY = 86_400_000
+# Форматы времени датчиков, которые не разбирает datetime.fromisoformat.
+SENSOR_DATE_FORMATS = ("%d.%m.%Y %H:%M:%S", "%d.%m.%Y %H:%M", "%Y/%m/%d %H:%M:%S")
+
+
+def to_epoch_ms(moment: datetime) -> int:
+    """
+    Переводит момент времени в миллисекунды Unix.
+
+    Args:
+        moment (datetime): Момент времени. Время без часового пояса считается московским.
+
+    Returns:
+        int: Миллисекунды Unix.
+    """
+    if moment.tzinfo is None:
+        moment = moscow_tz.localize(moment)
+    return int(moment.timestamp() * 1000)
+
+
+@lru_cache(maxsize=sensor_date_cache_size)
+def parse_sensor_date(date: str) -> int | None:
+    """
+    Разбирает время показания, переданное датчиком.
+
+    Датчики одного пакета обычно передают одинаковое время, поэтому
+    результаты разбора кешируются.
+
+    Args:
+        date (str): Время в формате ISO 8601 или одном из SENSOR_DATE_FORMATS.
+
+    Returns:
+        int | None: Миллисекунды Unix или None, если строку разобрать не удалось.
+    """
+    value = date.strip()
+    try:
+        return to_epoch_ms(datetime.fromisoformat(value))
+    except ValueError:
+        pass
+    for date_format in SENSOR_DATE_FORMATS:
+        try:
+            return to_epoch_ms(datetime.strptime(value, date_format))
+        except ValueError:
+            continue
+    return None
+
+
+def aggregate_rollups(
+    readings: List[Dict[str, Any]],
+    resolutions: Sequence[int] = sensor_rollup_resolutions,
+) -> List[Dict[str, Any]]:
+    """
+    Вычисляет агрегаты пакета показаний по датчикам и интервалам.
+
+    Показания сортируются по (адрес, начало интервала), после чего минимумы,
+    максимумы и суммы каждой группы вычисляются одной операцией reduceat.
+
+    Args:
+        readings (List[Dict[str, Any]]): Строки таблицы sensor_readings.
+        resolutions (Sequence[int]): Длины интервалов в миллисекундах.
+
+    Returns:
+        List[Dict[str, Any]]: Строки таблицы sensor_rollups.
+    """
+    count = len(readings)
+    if not count:
+        return []
+    addresses, address_index = np.unique([r["address"] for r in readings], return_inverse=True)
+    ts = np.fromiter((r["ts"] for r in readings), dtype=np.int64, count=count)
+    temperature = np.fromiter((r["temperature"] for r in readings), dtype=np.float64, count=count)
+    battery = np.fromiter((r["battery"] for r in readings), dtype=np.float64, count=count)
+
+    rows: List[Dict[str, Any]] = []
+    for resolution in resolutions:
+        buckets = ts - ts % resolution
+        order = np.lexsort((buckets, address_index))
+        group_address, group_bucket = address_index[order], buckets[order]
+        boundary = (group_address[1:] != group_address[:-1]) | (group_bucket[1:] != group_bucket[:-1])
+        starts = np.flatnonzero(np.r_[True, boundary])
+        columns = {
+            "address": addresses[group_address[starts]].tolist(),
+            "bucket": group_bucket[starts].tolist(),
+            "count": np.diff(np.r_[starts, count]).tolist(),
+        }
+        for name, values in (("temperature", temperature[order]), ("battery", battery[order])):
+            columns[f"{name}_min"] = np.minimum.reduceat(values, starts).tolist()
+            columns[f"{name}_max"] = np.maximum.reduceat(values, starts).tolist()
+            columns[f"{name}_sum"] = np.add.reduceat(values, starts).tolist()
+        names = list(columns)
+        rows.extend(
+            {"resolution": resolution, **dict(zip(names, values))}
+            for values in zip(*columns.values())
+        )
+    return rows
+
+
+async def upsert_rollups(session: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """
+    Дополняет агрегаты показаний без фиксации транзакции.
+
+    Существующие агрегаты объединяются с новыми в базе данных одним
+    INSERT ... ON CONFLICT DO UPDATE.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        rows (List[Dict[str, Any]]): Строки, полученные из aggregate_rollups.
+    """
+    if not rows:
+        return
+    statement = dialect_insert(session, SensorRollupModel)
+    excluded = statement.excluded
+    values: Dict[str, Any] = {"count": SensorRollupModel.count + excluded["count"]}
+    for name in ("temperature", "battery"):
+        current_min = getattr(SensorRollupModel, f"{name}_min")
+        current_max = getattr(SensorRollupModel, f"{name}_max")
+        current_sum = getattr(SensorRollupModel, f"{name}_sum")
+        new_min, new_max = excluded[f"{name}_min"], excluded[f"{name}_max"]
+        values[f"{name}_min"] = case((new_min < current_min, new_min), else_=current_min)
+        values[f"{name}_max"] = case((new_max > current_max, new_max), else_=current_max)
+        values[f"{name}_sum"] = current_sum + excluded[f"{name}_sum"]
+    statement = statement.on_conflict_do_update(
+        index_elements=["resolution", "address", "bucket"], set_=values
+    )
+    await session.execute(statement, rows)
+
+
+def latest_by_address(readings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Выбирает из пакета последнее показание каждого датчика.
+
+    Args:
+        readings (List[Dict[str, Any]]): Строки таблицы sensor_readings.
+
+    Returns:
+        List[Dict[str, Any]]: Строки таблицы sensor_latest.
+    """
+    fields = tuple(SensorLatestSchema.model_fields)
+    latest: Dict[str, Dict[str, Any]] = {}
+    for reading in readings:
+        current = latest.get(reading["address"])
+        if current is None or reading["ts"] >= current["ts"]:
+            latest[reading["address"]] = {field: reading[field] for field in fields}
+    return list(latest.values())
+
+
+async def upsert_latest(session: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """
+    Обновляет последние показания датчиков без фиксации транзакции.
+
+    Строка датчика заменяется, только если новое показание не старше сохранённого.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        rows (List[Dict[str, Any]]): Строки, полученные из latest_by_address.
+    """
+    if not rows:
+        return
+    statement = dialect_insert(session, SensorLatestModel)
+    excluded = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=["address"],
+        set_={field: excluded[field] for field in SensorLatestSchema.model_fields if field != "address"},
+        where=excluded["ts"] >= SensorLatestModel.ts,
+    )
+    await session.execute(statement, rows)
+
+
+class SensorLatestCache:
+    """
+    Последние показания всех датчиков в памяти процесса.
+
+    Кеш обновляется после записи каждого пакета и раз в refresh_interval
+    секунд перечитывается из таблицы sensor_latest, чтобы учитывать пакеты,
+    записанные другими процессами. Тело ответа и ETag вычисляются один раз
+    после изменения, а чтение без изменений выполняется за O(1).
+    """
+    def __init__(self, refresh_interval: float = sensor_latest_refresh_interval) -> None:
+        """
+        Инициализирует SensorLatestCache.
+
+        Args:
+            refresh_interval (float): Интервал перечитывания из базы данных в секундах.
+        """
+        self.refresh_interval = refresh_interval
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._loaded_at: float | None = None
+        self._snapshot: Tuple[bytes, str] | None = None
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def get(self, address: str) -> Dict[str, Any] | None:
+        """
+        Возвращает последнее показание датчика.
+
+        Args:
+            address (str): Адрес датчика.
+
+        Returns:
+            Dict[str, Any] | None: Последнее показание или None.
+        """
+        return self._states.get(address)
+
+    def update(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """
+        Применяет последние показания, не заменяя более поздние.
+
+        Args:
+            rows (Iterable[Dict[str, Any]]): Строки таблицы sensor_latest.
+        """
+        for row in rows:
+            current = self._states.get(row["address"])
+            if current is None or row["ts"] >= current["ts"]:
+                self._states[row["address"]] = row
+                self._snapshot = None
+
+    def is_stale(self) -> bool:
+        """Проверяет, пора ли перечитать кеш из базы данных."""
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_interval
+
+    async def load(self, session: AsyncSession) -> None:
+        """
+        Перечитывает последние показания из таблицы sensor_latest.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия базы данных.
+        """
+        fields = tuple(SensorLatestSchema.model_fields)
+        statement = select(*(getattr(SensorLatestModel, field) for field in fields))
+        rows = (await session.execute(statement)).all()
+        self.update(dict(zip(fields, row)) for row in rows)
+        self._loaded_at = time.monotonic()
+
+    def snapshot(self) -> Tuple[bytes, str]:
+        """
+        Возвращает тело ответа со всеми последними показаниями и его ETag.
+
+        Returns:
+            Tuple[bytes, str]: JSON-массив, отсортированный по адресу, и ETag.
+        """
+        if self._snapshot is None:
+            body = json.dumps(
+                [self._states[address] for address in sorted(self._states)], ensure_ascii=False
+            ).encode()
+            self._snapshot = (body, f'"{hashlib.sha256(body).hexdigest()}"')
+        return self._snapshot
+
+    def clear(self) -> None:
+        """Очищает кеш."""
+        self._states.clear()
+        self._loaded_at = None
+        self._snapshot = None
+
+
+# Последние показания датчиков процесса.
+sensor_latest_cache = SensorLatestCache()
+
+
+# Запись окна последних показаний: 16 байт на показание.
+SENSOR_WINDOW_DTYPE = np.dtype([("ts", "<i8"), ("battery", "<f4"), ("temperature", "<f4")])
+
+# Последние показания датчиков процесса; при заданном sensor_window_path хранятся в файлах.
+sensor_window = ColumnarRingBuffer(
+    SENSOR_WINDOW_DTYPE, sensor_window_capacity, sensor_window_max_sensors, config.sensor_window_path
+)
+
+
+def add_to_window(readings: List[Dict[str, Any]]) -> None:
+    """
+    Добавляет показания в окно последних показаний и в оценку аномалий.
+
+    Args:
+        readings (List[Dict[str, Any]]): Строки таблицы sensor_readings.
+    """
+    records = np.fromiter(
+        ((r["ts"], r["battery"], r["temperature"]) for r in readings),
+        dtype=SENSOR_WINDOW_DTYPE, count=len(readings),
+    )
+    addresses = [r["address"] for r in readings]
+    sensor_window.extend(addresses, records)
+    sensor_anomaly_detector.update(addresses, records["ts"], records["battery"], records["temperature"])
+
+
+def get_recent_readings(address: str, minutes: int) -> SensorWindowSchema:
+    """
+    Получает показания датчика за последние минуты из окна в памяти.
+
+    Args:
+        address (str): Адрес датчика.
+        minutes (int): Длина интервала в минутах.
+
+    Returns:
+        SensorWindowSchema: Показания в столбцовом виде по возрастанию времени.
+    """
+    since = to_epoch_ms(datetime.now(moscow_tz)) - minutes * 60_000
+    records = sensor_window.window(address, since)
+    return SensorWindowSchema(
+        address=address,
+        ts=records["ts"].tolist(),
+        battery=records["battery"].tolist(),
+        temperature=records["temperature"].tolist(),
+    )
+
+
+def select_rollup_resolution(step: int, resolutions: Sequence[int] = sensor_rollup_resolutions) -> int:
+    """
+    Выбирает самые крупные агрегаты, интервал которых не превышает шаг графика.
+
+    Args:
+        step (int): Требуемый шаг в миллисекундах.
+        resolutions (Sequence[int]): Доступные длины интервалов.
+
+    Returns:
+        int: Длина интервала агрегатов. Если шаг меньше всех интервалов — наименьшая.
+    """
+    suitable = [resolution for resolution in resolutions if resolution <= step]
+    return max(suitable) if suitable else min(resolutions)
+
+
+class SensorService(BaseService):
+    """
+    Сервис для чтения показаний датчиков.
+    """
+    async def get_latest(self) -> Tuple[bytes, str]:
+        """
+        Получает последние показания всех датчиков.
+
+        Returns:
+            Tuple[bytes, str]: JSON-массив последних показаний и его ETag.
+        """
+        if sensor_latest_cache.is_stale():
+            await sensor_latest_cache.load(self.session)
+        return sensor_latest_cache.snapshot()
+
+    async def get_rollups(
+        self,
+        address: str,
+        moment_from: datetime,
+        moment_to: datetime,
+        step: int | None = None,
+    ) -> SensorRollupSeriesSchema:
+        """
+        Получает агрегаты показаний датчика за интервал времени.
+
+        Args:
+            address (str): Адрес датчика.
+            moment_from (datetime): Начало интервала.
+            moment_to (datetime): Конец интервала (не включительно).
+            step (int | None): Требуемый шаг в миллисекундах. По умолчанию интервал
+                делится на sensor_rollup_points точек.
+
+        Returns:
+            SensorRollupSeriesSchema: Агрегаты по возрастанию времени.
+
+        Raises:
+            HTTPException: 400, если конец интервала не позже начала.
+        """
+        ts_from, ts_to = to_epoch_ms(moment_from), to_epoch_ms(moment_to)
+        if ts_to <= ts_from:
+            raise_with_log(status.HTTP_400_BAD_REQUEST, "Конец интервала должен быть позже начала")
+        resolution = select_rollup_resolution(step or (ts_to - ts_from) // sensor_rollup_points)
+        statement = (
+            select(SensorRollupModel)
+            .where(
+                SensorRollupModel.resolution == resolution,
+                SensorRollupModel.address == address,
+                SensorRollupModel.bucket >= ts_from - ts_from % resolution,
+                SensorRollupModel.bucket < ts_to,
+            )
+            .order_by(SensorRollupModel.bucket)
+        )
+        rollups = (await self.session.scalars(statement)).all()
+        return SensorRollupSeriesSchema(
+            address=address,
+            resolution=resolution,
+            buckets=[
+                SensorRollupSchema(
+                    bucket=rollup.bucket,
+                    count=rollup.count,
+                    temperature_min=rollup.temperature_min,
+                    temperature_max=rollup.temperature_max,
+                    temperature_avg=rollup.temperature_sum / rollup.count,
+                    battery_min=rollup.battery_min,
+                    battery_max=rollup.battery_max,
+                    battery_avg=rollup.battery_sum / rollup.count,
+                )
+                for rollup in rollups
+            ],
+        )
+
+
+async def insert_new_readings(session: AsyncSession, readings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Записывает показания, пропуская уже сохранённые с теми же address и ts.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        readings (List[Dict[str, Any]]): Строки таблицы sensor_readings.
+
+    Returns:
+        List[Dict[str, Any]]: Записанные показания.
+    """
+    if not readings:
+        return readings
+    statement = (
+        dialect_insert(session, SensorReadingModel)
+        .on_conflict_do_nothing(index_elements=["address", "ts"])
+        .returning(SensorReadingModel.address, SensorReadingModel.ts)
+    )
+    inserted = set((await session.execute(statement, readings)).tuples().all())
+    if len(inserted) == len(readings):
+        return readings
+    written = []
+    for reading in readings:
+        key = (reading["address"], reading["ts"])
+        if key in inserted:
+            inserted.discard(key)
+            written.append(reading)
+    return written
+
+
+# Обработчик пакета: сессия, записанные показания и последние показания датчиков пакета.
+FlushHandler = Callable[[AsyncSession, List[Dict[str, Any]], List[Dict[str, Any]]], Awaitable[None]]
+# Обработчик фиксации пакета: те же аргументы, вызывается синхронно после commit.
+CommitHandler = Callable[[AsyncSession, List[Dict[str, Any]], List[Dict[str, Any]]], None]
+
+
+class SensorIngestBuffer:
+    """
+    Буфер приёма показаний датчиков с пакетной записью в базу данных.
+
+    Attributes:
+        capacity (int): Наибольшее количество показаний в буфере.
+        batch_size (int): Количество показаний в одном INSERT.
+        flush_interval (float): Наибольший интервал между сбросами в секундах.
+        dedup_keys (int): Количество последних ключей (address, ts) для отбрасывания повторов.
+    """
+    def __init__(
+        self,
+        capacity: int = sensor_buffer_capacity,
+        batch_size: int = sensor_batch_size,
+        flush_interval: float = sensor_flush_interval,
+        session_factory: Callable[[], AsyncSession] | None = None,
+        dedup_keys: int = sensor_dedup_keys,
+    ) -> None:
+        """
+        Инициализирует SensorIngestBuffer.
+
+        Args:
+            capacity (int): Наибольшее количество показаний в буфере.
+            batch_size (int): Количество показаний в одном INSERT.
+            flush_interval (float): Наибольший интервал между сбросами в секундах.
+            session_factory (Callable | None): Фабрика сессий. По умолчанию общая фабрика приложения.
+            dedup_keys (int): Количество последних ключей (address, ts) для отбрасывания повторов.
+        """
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._session_factory = session_factory
+        self._pending: List[Dict[str, Any]] = []
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._running = False
+        self._handlers: List[FlushHandler] = []
+        self._commit_handlers: List[CommitHandler] = []
+        self._recent: LRUCache[bool] = LRUCache(maxsize=dedup_keys)
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.dropped = 0
+        self.duplicates = 0
+        self.duplicates_stored = 0
+        self.handler_errors = 0
+        self.flushes = 0
+
+    @property
+    def pending(self) -> int:
+        """Количество показаний, ожидающих записи."""
+        return len(self._pending)
+
+    @property
+    def session_factory(self) -> Callable[[], AsyncSession]:
+        """Фабрика сессий для записи показаний."""
+        return self._session_factory or get_session_factory()
+
+    def add_flush_handler(self, handler: FlushHandler) -> None:
+        """
+        Добавляет обработчик, вызываемый для каждого записываемого пакета.
+
+        Обработчики выполняются в транзакции пакета до её фиксации, каждый в
+        своей точке сохранения; ошибка обработчика откатывает только его
+        изменения и учитывается в handler_errors. Повторное добавление игнорируется.
+
+        Args:
+            handler (FlushHandler): Обработчик пакета.
+        """
+        if handler not in self._handlers:
+            self._handlers.append(handler)
+
+    def add_commit_handler(self, handler: CommitHandler) -> None:
+        """
+        Добавляет обработчик, вызываемый после фиксации каждого пакета.
+
+        Обработчик вызывается синхронно в цикле записи и не должен ожидать
+        ввода-вывода; его ошибка записывается в журнал и не влияет на запись.
+        Повторное добавление игнорируется.
+
+        Args:
+            handler (CommitHandler): Обработчик фиксации пакета.
+        """
+        if handler not in self._commit_handlers:
+            self._commit_handlers.append(handler)
+
+    def offer(self, readings: List[Dict[str, Any]]) -> bool:
+        """
+        Добавляет показания в буфер, не дожидаясь записи.
+
+        Args:
+            readings (List[Dict[str, Any]]): Строки для таблицы sensor_readings.
+
+        Returns:
+            bool: False, если показания не помещаются в буфер и отклонены целиком.
+        """
+        if len(self._pending) + len(readings) > self.capacity:
+            self.rejected += len(readings)
+            return False
+        self._pending.extend(readings)
+        self.accepted += len(readings)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def ingest(self, sensors: List[Sensor]) -> SensorIngestSchema:
+        """
+        Принимает показания датчиков в буфер.
+
+        Args:
+            sensors (List[Sensor]): Показания датчиков.
+
+        Returns:
+            SensorIngestSchema: Количество принятых и ожидающих записи показаний.
+
+        Raises:
+            HTTPException: 429, если буфер заполнен.
+        """
+        return self.ingest_records([sensor.model_dump() for sensor in sensors])
+
+    def ingest_records(self, records: List[SensorRecord]) -> SensorIngestSchema:
+        """
+        Принимает проверенные показания в буфер.
+
+        Если ts не задано, время разбирается из date, а если и это не удалось —
+        используется время приёма. Повторы уже принятых показаний и повторы
+        внутри пакета отбрасываются. Принятые показания сразу попадают в окно
+        последних показаний. Словари записей дополняются на месте.
+
+        Args:
+            records (List[SensorRecord]): Показания датчиков.
+
+        Returns:
+            SensorIngestSchema: Количество принятых и ожидающих записи показаний.
+
+        Raises:
+            HTTPException: 429, если буфер заполнен.
+        """
+        received_at = datetime.now(moscow_tz)
+        received_ts = to_epoch_ms(received_at)
+        readings: List[Dict[str, Any]] = []
+        keys: set[Tuple[str, int]] = set()
+        for reading in records:
+            ts = reading.get("ts")
+            if ts is None:
+                ts = parse_sensor_date(reading["date"])
+                if ts is None:
+                    ts = received_ts
+                reading["ts"] = ts
+            key = (reading["address"], ts)
+            if key in keys or key in self._recent:
+                continue
+            keys.add(key)
+            reading["day"] = ts // MS_PER_DAY
+            reading["received_at"] = received_at
+            readings.append(reading)
+        duplicates = len(records) - len(readings)
+        if not self.offer(readings):
+            raise_with_log(status.HTTP_429_TOO_MANY_REQUESTS, "Буфер приёма показаний заполнен")
+        for key in keys:
+            self._recent.set(key, True)
+        self.duplicates += duplicates
+        add_to_window(readings)
+        return SensorIngestSchema(accepted=len(readings), pending=self.pending, duplicates=duplicates)
+
+    async def flush(self) -> int:
+        """
+        Записывает все показания из буфера пакетами по batch_size.
+
+        Показания, уже сохранённые в базе данных, пропускаются (ON CONFLICT
+        DO NOTHING). Агрегаты и последние показания датчиков обновляются по
+        записанным показаниям пакета, а обработчики пакета вызываются с ними
+        в той же транзакции. Каждый обработчик выполняется в точке сохранения:
+        его ошибка откатывает только его изменения и не мешает записи пакета.
+
+        Если запись пакета не удалась, неотправленные показания возвращаются
+        в начало буфера в пределах его ёмкости, остальные считаются потерянными
+        и забываются при отбрасывании повторов.
+
+        Returns:
+            int: Количество записанных показаний.
+        """
+        async with self._lock:
+            pending, self._pending = self._pending, []
+            written = 0
+            for start in range(0, len(pending), self.batch_size):
+                batch = pending[start:start + self.batch_size]
+                try:
+                    async with self.session_factory() as session:
+                        batch = await insert_new_readings(session, batch)
+                        latest = latest_by_address(batch)
+                        await upsert_rollups(session, aggregate_rollups(batch))
+                        await upsert_latest(session, latest)
+                        for handler in self._handlers:
+                            await self._run_handler(session, handler, batch, latest)
+                        await session.commit()
+                except Exception as e:
+                    logger.error("Ошибка записи показаний датчиков: {}", e)
+                    rest = pending[start:]
+                    keep = rest[:max(self.capacity - len(self._pending), 0)]
+                    self._pending[:0] = keep
+                    self.dropped += len(rest) - len(keep)
+                    # Потерянные показания не записаны, их повторная отправка не должна считаться повтором
+                    for reading in rest[len(keep):]:
+                        self._recent.pop((reading["address"], reading["ts"]))
+                    break
+                sensor_latest_cache.update(latest)
+                for commit_handler in self._commit_handlers:
+                    try:
+                        commit_handler(session, batch, latest)
+                    except Exception as e:
+                        logger.error("Ошибка обработчика фиксации показаний датчиков: {}", e)
+                self.duplicates_stored += min(self.batch_size, len(pending) - start) - len(batch)
+                written += len(batch)
+            self.written += written
+            self.flushes += 1
+            return written
+
+    async def _run_handler(
+        self,
+        session: AsyncSession,
+        handler: FlushHandler,
+        batch: List[Dict[str, Any]],
+        latest: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Вызывает обработчик пакета в точке сохранения и журналирует его ошибку.
+        """
+        try:
+            async with session.begin_nested():
+                await handler(session, batch, latest)
+        except Exception as e:
+            self.handler_errors += 1
+            logger.error("Ошибка обработчика пакета показаний датчиков: {}", e)
+
+    async def start(self) -> None:
+        """
+        Запускает фоновую задачу периодического сброса буфера.
+        """
+        if self._task is None:
+            self._running = True
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Останавливает фоновую задачу и записывает оставшиеся показания.
+        """
+        if self._task is not None:
+            self._running = False
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        """
+        Сбрасывает буфер при заполнении пакета или по истечении интервала.
+        """
+        while self._running:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._pending:
+                await self.flush()
+
+    def stats(self) -> SensorIngestStatsSchema:
+        """
+        Возвращает счётчики буфера.
+
+        Returns:
+            SensorIngestStatsSchema: Состояние буфера.
+        """
+        return SensorIngestStatsSchema(
+            pending=self.pending,
+            capacity=self.capacity,
+            accepted=self.accepted,
+            rejected=self.rejected,
+            written=self.written,
+            dropped=self.dropped,
+            duplicates=self.duplicates,
+            duplicates_stored=self.duplicates_stored,
+            handler_errors=self.handler_errors,
+            flushes=self.flushes,
+        )
+
+
+# Буфер приёма показаний процесса; запускается и останавливается в lifespan приложения.
+sensor_buffer = SensorIngestBuffer()
+
+
+async def stream_readings(
+    address: str,
+    moment_from: datetime,
+    moment_to: datetime,
+    session_factory: Callable[[], AsyncSession] | None = None,
+    max_points: int | None = None,
+    field: str = "temperature",
+) -> AsyncIterator[str]:
+    """
+    Передаёт показания датчика за интервал времени построчно в формате NDJSON.
+
+    Запрос выбирает только столбцы индекса (address, ts) и читается с сервера
+    частями, поэтому память не зависит от длины интервала. Генератор открывает
+    собственную сессию, так как выполняется уже после выхода из обработчика.
+
+    Если задан max_points, показания прореживаются алгоритмом LTTB по
+    значению field и передаются одной частью. Интервал длиннее
+    sensor_downsample_candidates показаний сначала читается частями, и от
+    каждой части остаются первая, последняя, наименьшая и наибольшая точки
+    (M4), поэтому память ограничена и при прореживании, а пики сохраняются.
+
+    Args:
+        address (str): Адрес датчика.
+        moment_from (datetime): Начало интервала (включительно).
+        moment_to (datetime): Конец интервала (не включительно).
+        session_factory (Callable | None): Фабрика сессий. По умолчанию общая фабрика приложения.
+        max_points (int | None): Наибольшее количество передаваемых показаний.
+        field (str): Показание, форма графика которого сохраняется при прореживании.
+
+    Yields:
+        str: Части ответа — строки JSON, разделённые переводом строки.
+    """
+    fields = tuple(SensorReadingSchema.model_fields)
+    conditions = (
+        SensorReadingModel.address == address,
+        SensorReadingModel.ts >= to_epoch_ms(moment_from),
+        SensorReadingModel.ts < to_epoch_ms(moment_to),
+    )
+    statement = (
+        select(*(getattr(SensorReadingModel, name) for name in fields))
+        .where(*conditions)
+        .order_by(SensorReadingModel.ts)
+    )
+    async with (session_factory or get_session_factory())() as session:
+        total = None
+        if max_points is not None:
+            total = await session.scalar(select(func.count()).select_from(SensorReadingModel).where(*conditions))
+        if total is None or total <= max_points:
+            result = await session.stream(statement.execution_options(yield_per=sensor_stream_chunk_size))
+            async for rows in result.partitions():
+                yield _to_ndjson(fields, rows)
+            return
+
+        candidates = max(sensor_downsample_candidates, 4 * max_points)
+        if total <= candidates:
+            rows = list((await session.execute(statement)).all())
+        else:
+            part = math.ceil(4 * total / candidates)
+            result = await session.stream(statement.execution_options(yield_per=part))
+            rows = []
+            async for chunk in result.partitions():
+                values = np.fromiter((row[fields.index(field)] for row in chunk), dtype=np.float64, count=len(chunk))
+                keep = sorted({0, len(chunk) - 1, int(np.argmin(values)), int(np.argmax(values))})
+                rows.extend(chunk[i] for i in keep)
+
+    if rows:
+        ts = np.fromiter((row[fields.index("ts")] for row in rows), dtype=np.float64, count=len(rows))
+        values = np.fromiter((row[fields.index(field)] for row in rows), dtype=np.float64, count=len(rows))
+        yield _to_ndjson(fields, [rows[i] for i in lttb(ts, values, max_points).tolist()])
+
+
+def _to_ndjson(fields: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    """Сериализует строки результата запроса в NDJSON."""
+    return "".join(json.dumps(dict(zip(fields, row)), ensure_ascii=False) + "\n" for row in rows)
+
+
+async def ingest_ndjson(
+    chunks: AsyncIterable[bytes],
+    buffer: "SensorIngestBuffer | None" = None,
+    batch_size: int = sensor_stream_batch_size,
+) -> SensorIngestSchema:
+    """
+    Принимает показания из потока NDJSON по мере его поступления.
+
+    Строки собираются в пакеты по batch_size, каждый пакет проверяется одним
+    проходом TypeAdapter и сразу передаётся в буфер, поэтому память не зависит
+    от длины потока. Пакеты, принятые до ошибки, остаются принятыми.
+
+    Args:
+        chunks (AsyncIterable[bytes]): Части тела запроса.
+        buffer (SensorIngestBuffer | None): Буфер приёма. По умолчанию sensor_buffer.
+        batch_size (int): Количество строк в пакете.
+
+    Returns:
+        SensorIngestSchema: Количество принятых и ожидающих записи показаний.
+
+    Raises:
+        HTTPException: 413, если строка длиннее sensor_max_line_bytes.
+        HTTPException: 422, если строка не является показанием датчика.
+        HTTPException: 429, если буфер заполнен.
+    """
+    buffer = buffer or sensor_buffer
+    accepted = 0
+    line_number = 0
+    lines: List[bytes] = []
+    tail = b""
+
+    def ingest_lines() -> None:
+        nonlocal accepted, line_number
+        try:
+            records = sensor_records_adapter.validate_json(b"[" + b",".join(lines) + b"]")
+        except ValidationError as e:
+            first = e.errors()[0]
+            location = first["loc"][0] if first["loc"] else 0
+            raise_with_log(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                f"Строка {line_number + int(location) + 1}: {first['msg']}; принято показаний: {accepted}",
+            )
+        accepted += buffer.ingest_records(records).accepted
+        line_number += len(lines)
+        lines.clear()
+
+    async for chunk in chunks:
+        parts = (tail + chunk).split(b"\n")
+        tail = parts.pop()
+        if len(tail) > sensor_max_line_bytes or any(len(part) > sensor_max_line_bytes for part in parts):
+            raise_with_log(
+                status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                f"Строка длиннее {sensor_max_line_bytes} байт; принято показаний: {accepted}",
+            )
+        lines.extend(part for part in parts if part.strip())
+        if len(lines) >= batch_size:
+            ingest_lines()
+    if tail.strip():
+        lines.append(tail)
+    if lines:
+        ingest_lines()
+    return SensorIngestSchema(accepted=accepted, pending=buffer.pending)
+
+
+# Бинарный пакет показаний (все числа little-endian):
+#   заголовок SENSOR_BATCH_HEADER: b"ASNB", версия, число строк, число записей;
+#   таблица строк: для каждой строки длина (uint16) и байты UTF-8;
+#   записи SENSOR_BATCH_DTYPE, ссылающиеся на строки по номеру.
+SENSOR_BATCH_MAGIC = b"ASNB"
+SENSOR_BATCH_VERSION = 1
+SENSOR_BATCH_HEADER = struct.Struct("<4sHHI")
+SENSOR_BATCH_STRING = struct.Struct("<H")
+SENSOR_BATCH_DTYPE = np.dtype([
+    ("ts", "<i8"),
+    ("battery", "<f4"),
+    ("temperature", "<f4"),
+    ("address", "<u2"),
+    ("name", "<u2"),
+    ("status", "<u2"),
+    ("reserved", "<u2"),
+])
+
+
+def encode_binary_batch(records: List[SensorRecord]) -> bytes:
+    """
+    Упаковывает показания в бинарный пакет.
+
+    Args:
+        records (List[SensorRecord]): Показания с заполненным ts.
+
+    Returns:
+        bytes: Бинарный пакет.
+    """
+    strings: Dict[str, int] = {}
+    for record in records:
+        for field in ("address", "name", "status"):
+            strings.setdefault(record[field], len(strings))
+    data = np.zeros(len(records), dtype=SENSOR_BATCH_DTYPE)
+    for field in ("ts", "battery", "temperature"):
+        data[field] = [record[field] for record in records]
+    for field in ("address", "name", "status"):
+        data[field] = [strings[record[field]] for record in records]
+    parts = [SENSOR_BATCH_HEADER.pack(SENSOR_BATCH_MAGIC, SENSOR_BATCH_VERSION, len(strings), len(records))]
+    for string in strings:
+        encoded = string.encode()
+        parts.append(SENSOR_BATCH_STRING.pack(len(encoded)) + encoded)
+    parts.append(data.tobytes())
+    return b"".join(parts)
+
+
+async def read_body(chunks: AsyncIterable[bytes], limit: int = sensor_max_body_bytes) -> bytes:
+    """
+    Читает тело запроса, не допуская превышения размера.
+
+    Args:
+        chunks (AsyncIterable[bytes]): Части тела запроса.
+        limit (int): Наибольший размер тела в байтах.
+
+    Returns:
+        bytes: Тело запроса.
+
+    Raises:
+        HTTPException: 413, если тело больше limit.
+    """
+    body = bytearray()
+    async for chunk in chunks:
+        body += chunk
+        if len(body) > limit:
+            raise_with_log(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, f"Пакет показаний больше {limit} байт")
+    return bytes(body)
+
+
+def decode_binary_batch(payload: bytes) -> List[SensorRecord]:
+    """
+    Разбирает бинарный пакет показаний.
+
+    Записи читаются из пакета одним np.frombuffer и проверяются векторно:
+    номера строк должны существовать, значения — быть конечными.
+
+    Args:
+        payload (bytes): Бинарный пакет.
+
+    Returns:
+        List[SensorRecord]: Показания с заполненным ts.
+
+    Raises:
+        HTTPException: 422, если пакет повреждён.
+    """
+    if len(payload) < SENSOR_BATCH_HEADER.size:
+        raise_with_log(status.HTTP_422_UNPROCESSABLE_ENTITY, "Пакет показаний короче заголовка")
+    magic, version, string_count, record_count = SENSOR_BATCH_HEADER.unpack_from(payload)
+    if magic != SENSOR_BATCH_MAGIC or version != SENSOR_BATCH_VERSION:
+        raise_with_log(status.HTTP_422_UNPROCESSABLE_ENTITY, "Неизвестный формат пакета показаний")
+    offset = SENSOR_BATCH_HEADER.size
+    strings: List[str] = []
+    try:
+        for _ in range(string_count):
+            (length,) = SENSOR_BATCH_STRING.unpack_from(payload, offset)
+            offset += SENSOR_BATCH_STRING.size
+            strings.append(payload[offset:offset + length].decode())
+            offset += length
+    except (struct.error, UnicodeDecodeError):
+        raise_with_log(status.HTTP_422_UNPROCESSABLE_ENTITY, "Повреждена таблица строк пакета показаний")
+    if len(payload) - offset != record_count * SENSOR_BATCH_DTYPE.itemsize:
+        raise_with_log(status.HTTP_422_UNPROCESSABLE_ENTITY, "Размер пакета не совпадает с числом записей")
+
+    data = np.frombuffer(payload, dtype=SENSOR_BATCH_DTYPE, count=record_count, offset=offset)
+    indices = np.stack([data["address"], data["name"], data["status"]])
+    if record_count and indices.max() >= string_count:
+        raise_with_log(status.HTTP_422_UNPROCESSABLE_ENTITY, "Запись ссылается на несуществующую строку")
+    if not (np.isfinite(data["battery"]).all() and np.isfinite(data["temperature"]).all()):
+        raise_with_log(status.HTTP_422_UNPROCESSABLE_ENTITY, "Показания должны быть конечными числами")
+
+    table = np.array(strings, dtype=object)
+    dates = np.datetime_as_string(data["ts"].astype("datetime64[ms]"), timezone="UTC")
+    columns = (
+        table[data["name"]].tolist(),
+        table[data["address"]].tolist(),
+        dates.tolist(),
+        table[data["status"]].tolist(),
+        data["battery"].astype(np.float64).tolist(),
+        data["temperature"].astype(np.float64).tolist(),
+        data["ts"].tolist(),
+    )
+    fields = ("name", "address", "date", "status", "battery", "temperature", "ts")
+    return [dict(zip(fields, values)) for values in zip(*columns)]
@@ -0,0 +1,725 @@
+"""
+Модуль сервиса уставок скоростей моталок.
+
+Таблица скоростей каждого формирующего ролика один раз загружается из базы
+в массивы NumPy и кешируется. Уставки для набора заданий вычисляются одним
+векторизованным проходом: индексы соседних строк таблицы находятся через
+``np.searchsorted``, после чего все числовые параметры интерполируются
+одной операцией над матрицей.
+
+Для контроллеров приводов таблицы скоростей моталки компилируются в
+компактный бинарный артефакт (см. SpeedLookupTable), который кешируется
+до изменения строк таблицы speeds и отдаётся с ETag для условных запросов.
+"""
+import hashlib
+import struct
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+from fastapi import status
+from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.const import speed_table_cache_size, speed_table_cache_ttl, speed_lut_cache_size
+from app.models.speed import RollModel, SpeedModel, SpeedHistoryModel, moscow_tz
+from app.schemas.speed import (
+    SpeedSetpointsSchema,
+    SpeedSchema,
+    SpeedParamsSchema,
+    SpeedHistorySchema,
+    SpeedFieldChangeSchema,
+    SpeedDiffSchema,
+    SpeedMotorSchema,
+    SpeedRecalculationSchema
+)
+from app.services.base import BaseService, BaseDataManager
+from app.utils.cache import LRUCache
+from app.utils.exc import raise_with_log
+
+# Интерполируемые параметры таблицы скоростей в порядке столбцов матрицы.
+SPEED_VALUE_FIELDS = ("tspd", "bmav", "bemf", "amav", "aemf", "memf")
+# Целочисленные параметры округляются после интерполяции.
+SPEED_INT_FIELDS = ("tspd", "bmav", "amav")
+# Флаги не интерполируются, а берутся из ближайшей строки таблицы.
+SPEED_FLAG_FIELDS = ("fspd", "corr")
+# Все параметры строки таблицы скоростей, сохраняемые в истории.
+SPEED_PARAM_FIELDS = ("task", *SPEED_VALUE_FIELDS, *SPEED_FLAG_FIELDS)
+# Точность хранения пересчитанных значений ЭДС.
+SPEED_EMF_DECIMALS = 3
+# Сигнатура и версия формата бинарной таблицы скоростей.
+SPEED_LUT_MAGIC = b"ASPD"
+SPEED_LUT_VERSION = 1
+# Заголовок артефакта: сигнатура, версия, резерв, ID моталки, число роликов.
+SPEED_LUT_HEADER = struct.Struct("<4sHHII")
+# Заголовок ролика: ID ролика, число строк.
+SPEED_LUT_ROLL_HEADER = struct.Struct("<II")
+# Столбцы ролика в порядке записи и их типы (little-endian).
+SPEED_LUT_COLUMNS = (
+    ("task", "<f4"),
+    ("tspd", "<i4"),
+    ("bmav", "<i4"),
+    ("bemf", "<f4"),
+    ("amav", "<i4"),
+    ("aemf", "<f4"),
+    ("memf", "<f4"),
+)
+
+# Модель ЭДС двигателя: (bmav, amav, параметры двигателя) -> (bemf, aemf, memf, corr).
+EmfModel = Callable[[np.ndarray, np.ndarray, SpeedMotorSchema], Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]
+
+
+def linear_emf_model(
+    bmav: np.ndarray, amav: np.ndarray, motor: SpeedMotorSchema
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Модель ЭДС по умолчанию: ЭДС пропорциональна скорости.
+
+    Это допущение, а не паспортная характеристика двигателя:
+    bemf = bmav * k, aemf = amav * k, memf — наибольшая из них,
+    corr устанавливается, если memf превышает предельную ЭДС. Реальная
+    характеристика подключается через аргумент ``emf_model`` SpeedService.
+
+    Args:
+        bmav (np.ndarray): Скорости до задания.
+        amav (np.ndarray): Скорости после задания.
+        motor (SpeedMotorSchema): Параметры двигателя.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: bemf, aemf, memf и corr.
+    """
+    bemf = np.round(bmav * motor.emf_per_speed, SPEED_EMF_DECIMALS)
+    aemf = np.round(amav * motor.emf_per_speed, SPEED_EMF_DECIMALS)
+    memf = np.maximum(bemf, aemf)
+    return bemf, aemf, memf, memf > motor.emf_limit
+
+
+class RollSpeedTable:
+    """
+    Таблица скоростей формирующего ролика в виде массивов NumPy.
+
+    Attributes:
+        roll_id (int): ID формирующего ролика.
+        task (np.ndarray): Отсортированные значения задания, форма (n,).
+        values (np.ndarray): Числовые параметры SPEED_VALUE_FIELDS, форма (n, 6).
+        flags (np.ndarray): Флаги SPEED_FLAG_FIELDS, форма (n, 2).
+    """
+    __slots__ = ("roll_id", "task", "values", "flags")
+
+    def __init__(self, roll_id: int, task: np.ndarray, values: np.ndarray, flags: np.ndarray) -> None:
+        self.roll_id = roll_id
+        self.task = task
+        self.values = values
+        self.flags = flags
+
+    @classmethod
+    def from_rows(cls, roll_id: int, rows: List[tuple]) -> "RollSpeedTable":
+        """
+        Создает таблицу из строк (task, *SPEED_VALUE_FIELDS, *SPEED_FLAG_FIELDS).
+
+        Args:
+            roll_id (int): ID формирующего ролика.
+            rows (List[tuple]): Строки, отсортированные по заданию.
+
+        Returns:
+            RollSpeedTable: Таблица скоростей ролика.
+        """
+        data = np.asarray(rows, dtype=np.float64)
+        n_values = len(SPEED_VALUE_FIELDS)
+        task = np.ascontiguousarray(data[:, 0])
+        values = np.ascontiguousarray(data[:, 1:1 + n_values])
+        flags = data[:, 1 + n_values:].astype(bool)
+        return cls(roll_id, task, values, flags)
+
+    def interpolate(self, tasks: np.ndarray) -> SpeedSetpointsSchema:
+        """
+        Вычисляет уставки для набора заданий.
+
+        Значения вне диапазона таблицы ограничиваются крайними строками.
+
+        Args:
+            tasks (np.ndarray): Значения задания.
+
+        Returns:
+            SpeedSetpointsSchema: Уставки в столбцовом виде.
+        """
+        tasks = np.asarray(tasks, dtype=np.float64)
+        if len(self.task) == 1:
+            lower = np.zeros(len(tasks), dtype=np.intp)
+            upper = lower
+            weight = np.zeros(len(tasks))
+        else:
+            lower = np.clip(np.searchsorted(self.task, tasks, side="right") - 1, 0, len(self.task) - 2)
+            upper = lower + 1
+            span = self.task[upper] - self.task[lower]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                weight = np.where(span > 0, (tasks - self.task[lower]) / span, 0.0)
+            weight = np.clip(weight, 0.0, 1.0)
+
+        values = self.values[lower] + (self.values[upper] - self.values[lower]) * weight[:, None]
+        nearest = np.where(weight < 0.5, lower, upper)
+        flags = self.flags[nearest]
+
+        columns: Dict[str, list] = {"roll_id": self.roll_id, "task": tasks.tolist()}
+        for i, field in enumerate(SPEED_VALUE_FIELDS):
+            column = values[:, i]
+            if field in SPEED_INT_FIELDS:
+                column = np.rint(column).astype(np.int64)
+            columns[field] = column.tolist()
+        for i, field in enumerate(SPEED_FLAG_FIELDS):
+            columns[field] = flags[:, i].tolist()
+        return SpeedSetpointsSchema(**columns)
+
+
+# Кеш таблиц скоростей: ID ролика -> RollSpeedTable.
+speed_table_cache: LRUCache[RollSpeedTable] = LRUCache(
+    maxsize=speed_table_cache_size, ttl=speed_table_cache_ttl
+)
+
+
+def to_moscow_time(moment: datetime) -> datetime:
+    """
+    Приводит момент времени к часовому поясу, в котором хранятся параметры скоростей.
+
+    Args:
+        moment (datetime): Момент времени. Время без часового пояса считается московским.
+
+    Returns:
+        datetime: Момент времени в часовом поясе Europe/Moscow.
+    """
+    if moment.tzinfo is None:
+        return moscow_tz.localize(moment)
+    return moment.astimezone(moscow_tz)
+
+
+def invalidate_speed_tables(roll_ids: Iterable[int] | None = None) -> None:
+    """
+    Сбрасывает закешированные таблицы скоростей.
+
+    Вызывается после любого изменения строк таблицы speeds.
+
+    Args:
+        roll_ids (Iterable[int] | None): ID роликов. Если None, сбрасывается весь кеш.
+    """
+    speed_lut_cache.clear()
+    if roll_ids is None:
+        speed_table_cache.clear()
+        return
+    for roll_id in roll_ids:
+        speed_table_cache.pop(roll_id)
+
+
+class SpeedLookupTable:
+    """
+    Скомпилированная бинарная таблица скоростей моталки для контроллеров приводов.
+
+    Формат (все числа little-endian):
+        - заголовок SPEED_LUT_HEADER: b"ASPD", версия, 0, ID моталки, число роликов;
+        - для каждого ролика заголовок SPEED_LUT_ROLL_HEADER (ID ролика, n),
+          затем массивы SPEED_LUT_COLUMNS по n значений и n байт флагов
+          (бит 0 — fspd, бит 1 — corr), дополненные нулями до кратности 4.
+
+    Attributes:
+        reel_id (int): ID моталки.
+        fingerprint (tuple): Отпечаток строк таблицы speeds, из которых собран артефакт.
+        content (bytes): Бинарное содержимое.
+        etag (str): ETag на основе SHA-256 содержимого.
+    """
+    __slots__ = ("reel_id", "fingerprint", "content", "etag")
+
+    def __init__(self, reel_id: int, fingerprint: tuple, content: bytes) -> None:
+        self.reel_id = reel_id
+        self.fingerprint = fingerprint
+        self.content = content
+        self.etag = f'"{hashlib.sha256(content).hexdigest()}"'
+
+    @classmethod
+    def compile(cls, reel_id: int, fingerprint: tuple, tables: List[RollSpeedTable]) -> "SpeedLookupTable":
+        """
+        Компилирует таблицы скоростей роликов в бинарный артефакт.
+
+        Args:
+            reel_id (int): ID моталки.
+            fingerprint (tuple): Отпечаток строк таблицы speeds.
+            tables (List[RollSpeedTable]): Таблицы роликов в порядке ID.
+
+        Returns:
+            SpeedLookupTable: Скомпилированная таблица.
+        """
+        parts = [SPEED_LUT_HEADER.pack(SPEED_LUT_MAGIC, SPEED_LUT_VERSION, 0, reel_id, len(tables))]
+        for table in tables:
+            count = len(table.task)
+            parts.append(SPEED_LUT_ROLL_HEADER.pack(table.roll_id, count))
+            for field, dtype in SPEED_LUT_COLUMNS:
+                column = table.task if field == "task" else table.values[:, SPEED_VALUE_FIELDS.index(field)]
+                if field in SPEED_INT_FIELDS:
+                    column = np.rint(column)
+                parts.append(column.astype(dtype).tobytes())
+            flags = np.zeros(count, dtype=np.uint8)
+            for bit in range(len(SPEED_FLAG_FIELDS)):
+                flags |= table.flags[:, bit].astype(np.uint8) << bit
+            parts.append(flags.tobytes() + bytes(-count % 4))
+        return cls(reel_id, fingerprint, b"".join(parts))
+
+
+# Кеш бинарных таблиц: ID моталки -> SpeedLookupTable.
+speed_lut_cache: LRUCache[SpeedLookupTable] = LRUCache(maxsize=speed_lut_cache_size)
+
+
+class SpeedService(BaseService):
+    """
+    Сервис для расчёта уставок скоростей формирующих роликов моталок.
+    """
+    def __init__(self, session: AsyncSession, emf_model: EmfModel = linear_emf_model):
+        """
+        Инициализирует SpeedService.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия базы данных.
+            emf_model (EmfModel): Модель ЭДС двигателя для пересчёта таблиц скоростей.
+        """
+        super().__init__(session)
+        self.data_manager = SpeedDataManager(session)
+        self.emf_model = emf_model
+
+    async def get_roll_setpoints(self, roll_id: int, tasks: List[float]) -> SpeedSetpointsSchema:
+        """
+        Вычисляет уставки ролика для набора заданий.
+
+        Args:
+            roll_id (int): ID формирующего ролика.
+            tasks (List[float]): Значения задания.
+
+        Returns:
+            SpeedSetpointsSchema: Уставки в столбцовом виде.
+
+        Raises:
+            HTTPException: 404, если для ролика нет таблицы скоростей.
+        """
+        tables = await self.get_tables([roll_id])
+        if roll_id not in tables:
+            raise_with_log(status.HTTP_404_NOT_FOUND, "Таблица скоростей ролика не найдена")
+        return tables[roll_id].interpolate(np.asarray(tasks, dtype=np.float64))
+
+    async def get_reel_setpoints(self, reel_id: int, tasks: List[float]) -> List[SpeedSetpointsSchema]:
+        """
+        Вычисляет уставки всех роликов моталки для набора заданий.
+
+        Args:
+            reel_id (int): ID моталки.
+            tasks (List[float]): Значения задания.
+
+        Returns:
+            List[SpeedSetpointsSchema]: Уставки каждого ролика, у которого есть таблица скоростей.
+
+        Raises:
+            HTTPException: 404, если у моталки нет роликов с таблицами скоростей.
+        """
+        roll_ids = await self.data_manager.get_roll_ids(reel_id)
+        tables = await self.get_tables(roll_ids)
+        if not tables:
+            raise_with_log(status.HTTP_404_NOT_FOUND, "Таблицы скоростей моталки не найдены")
+        task_array = np.asarray(tasks, dtype=np.float64)
+        return [tables[roll_id].interpolate(task_array) for roll_id in roll_ids if roll_id in tables]
+
+    async def get_speeds(self, roll_id: int) -> List[SpeedSchema]:
+        """
+        Получает строки таблицы скоростей ролика.
+
+        Args:
+            roll_id (int): ID формирующего ролика.
+
+        Returns:
+            List[SpeedSchema]: Строки таблицы, отсортированные по заданию.
+        """
+        statement = select(SpeedModel).where(SpeedModel.roll_id == roll_id).order_by(SpeedModel.task)
+        speeds = await self.data_manager.get_all(statement)
+        return [SpeedSchema.model_validate(speed) for speed in speeds]
+
+    async def replace_speeds(self, roll_id: int, speeds: List[SpeedParamsSchema]) -> SpeedHistorySchema:
+        """
+        Заменяет таблицу скоростей ролика и сохраняет новую версию в истории.
+
+        Args:
+            roll_id (int): ID формирующего ролика.
+            speeds (List[SpeedParamsSchema]): Новые строки таблицы скоростей.
+
+        Returns:
+            SpeedHistorySchema: Сохранённая версия набора параметров.
+
+        Raises:
+            HTTPException: 404, если ролик не найден.
+            HTTPException: 409, если одновременно записана другая версия с тем же временем.
+        """
+        if await self.session.get(RollModel, roll_id) is None:
+            raise_with_log(status.HTTP_404_NOT_FOUND, "Ролик не найден")
+        rows = sorted((speed.model_dump() for speed in speeds), key=lambda row: row["task"])
+        await self.session.execute(delete(SpeedModel).where(SpeedModel.roll_id == roll_id))
+        if rows:
+            await self.session.execute(insert(SpeedModel), [{**row, "roll_id": roll_id} for row in rows])
+        history = await self.data_manager.add_history(roll_id, rows)
+        await self.session.commit()
+        invalidate_speed_tables([roll_id])
+        return self._history_schema(history)
+
+    async def record_history(self, roll_id: int) -> SpeedHistorySchema:
+        """
+        Сохраняет текущую таблицу скоростей ролика как новую версию в истории.
+
+        Args:
+            roll_id (int): ID формирующего ролика.
+
+        Returns:
+            SpeedHistorySchema: Сохранённая версия набора параметров.
+        """
+        speeds = await self.get_speeds(roll_id)
+        rows = [SpeedParamsSchema.model_validate(speed).model_dump() for speed in speeds]
+        history = await self.data_manager.add_history(roll_id, rows)
+        await self.session.commit()
+        return self._history_schema(history)
+
+    async def get_speeds_as_of(self, roll_id: int, moment: datetime) -> SpeedHistorySchema:
+        """
+        Получает набор параметров скоростей ролика, действовавший в момент времени.
+
+        Args:
+            roll_id (int): ID формирующего ролика.
+            moment (datetime): Момент времени.
+
+        Returns:
+            SpeedHistorySchema: Действовавшая версия набора параметров.
+
+        Raises:
+            HTTPException: 404, если на этот момент версий нет.
+        """
+        history = await self.data_manager.get_history_as_of(roll_id, moment)
+        if history is None:
+            raise_with_log(status.HTTP_404_NOT_FOUND, "Параметры скоростей на этот момент не найдены")
+        return self._history_schema(history)
+
+    async def get_speeds_diff(self, roll_id: int, moment_from: datetime, moment_to: datetime) -> SpeedDiffSchema:
+        """
+        Сравнивает наборы параметров скоростей ролика, действовавшие в два момента времени.
+
+        Строки сопоставляются по значению задания.
+
+        Args:
+            roll_id (int): ID формирующего ролика.
+            moment_from (datetime): Первый момент времени.
+            moment_to (datetime): Второй момент времени.
+
+        Returns:
+            SpeedDiffSchema: Добавленные, удалённые и изменившиеся строки.
+        """
+        before = await self.data_manager.get_history_as_of(roll_id, moment_from)
+        after = await self.data_manager.get_history_as_of(roll_id, moment_to)
+        rows_before = {row["task"]: row for row in (before.speeds if before else [])}
+        rows_after = {row["task"]: row for row in (after.speeds if after else [])}
+
+        changed: List[SpeedFieldChangeSchema] = []
+        for task in sorted(rows_before.keys() & rows_after.keys()):
+            fields = [f for f in SPEED_PARAM_FIELDS if rows_before[task][f] != rows_after[task][f]]
+            if fields:
+                changed.append(SpeedFieldChangeSchema(
+                    task=task, before=rows_before[task], after=rows_after[task], fields=fields,
+                ))
+        return SpeedDiffSchema(
+            roll_id=roll_id,
+            from_valid_from=to_moscow_time(before.valid_from) if before else None,
+            to_valid_from=to_moscow_time(after.valid_from) if after else None,
+            added=[rows_after[task] for task in sorted(rows_after.keys() - rows_before.keys())],
+            removed=[rows_before[task] for task in sorted(rows_before.keys() - rows_after.keys())],
+            changed=changed,
+        )
+
+    async def recalculate(self, motor: SpeedMotorSchema) -> SpeedRecalculationSchema:
+        """
+        Пересчитывает ЭДС и флаги коррекции всех строк таблиц скоростей.
+
+        Значения bemf, aemf, memf и corr вычисляет модель ЭДС ``emf_model``
+        (по умолчанию linear_emf_model). Строки загружаются одним запросом в столбцовом
+        виде, пересчитываются векторно, и в базу одним пакетным UPDATE
+        записываются только изменившиеся строки. Для изменившихся роликов
+        сохраняется новая версия в истории.
+
+        Args:
+            motor (SpeedMotorSchema): Параметры двигателя.
+
+        Returns:
+            SpeedRecalculationSchema: Количество изменённых строк и время этапов.
+        """
+        started = time.perf_counter()
+        columns = await self.data_manager.load_columns(motor.roll_ids)
+        loaded = time.perf_counter()
+
+        bemf, aemf, memf, corr = self.emf_model(columns["bmav"], columns["amav"], motor)
+        unchanged = (
+            np.isclose(bemf, columns["bemf"])
+            & np.isclose(aemf, columns["aemf"])
+            & np.isclose(memf, columns["memf"])
+            & (corr == columns["corr"])
+        )
+        changed = np.flatnonzero(~unchanged)
+        computed = time.perf_counter()
+
+        changed_rolls: List[int] = []
+        if changed.size:
+            columns.update(bemf=bemf, aemf=aemf, memf=memf, corr=corr)
+            updated_at = datetime.now(moscow_tz)
+            await self.data_manager.bulk_update([
+                {"id": row_id, "bemf": b, "aemf": a, "memf": m, "corr": c, "updated_at": updated_at}
+                for row_id, b, a, m, c in zip(
+                    columns["id"][changed].tolist(),
+                    bemf[changed].tolist(),
+                    aemf[changed].tolist(),
+                    memf[changed].tolist(),
+                    corr[changed].tolist(),
+                )
+            ])
+            changed_rolls = np.unique(columns["roll_id"][changed]).tolist()
+            for roll_id in changed_rolls:
+                start, end = np.searchsorted(columns["roll_id"], [roll_id, roll_id + 1])
+                rows = [
+                    dict(zip(SPEED_PARAM_FIELDS, values))
+                    for values in zip(*(columns[field][start:end].tolist() for field in SPEED_PARAM_FIELDS))
+                ]
+                await self.data_manager.add_history(roll_id, rows)
+            await self.session.commit()
+            invalidate_speed_tables(changed_rolls)
+        written = time.perf_counter()
+
+        return SpeedRecalculationSchema(
+            rows_total=len(columns["id"]),
+            rows_changed=int(changed.size),
+            rolls_changed=len(changed_rolls),
+            load_ms=(loaded - started) * 1000,
+            compute_ms=(computed - loaded) * 1000,
+            write_ms=(written - computed) * 1000,
+            total_ms=(written - started) * 1000,
+        )
+
+    async def get_reel_lut(self, reel_id: int) -> SpeedLookupTable:
+        """
+        Получает бинарную таблицу скоростей моталки.
+
+        Перед выдачей закешированного артефакта одним агрегатным запросом
+        проверяется отпечаток строк таблицы speeds, поэтому изменения,
+        сделанные другими процессами, тоже приводят к перекомпиляции. Таблицы
+        роликов при этом загружаются заново и обновляют кеш таблиц.
+
+        Args:
+            reel_id (int): ID моталки.
+
+        Returns:
+            SpeedLookupTable: Скомпилированная таблица.
+
+        Raises:
+            HTTPException: 404, если у моталки нет роликов с таблицами скоростей.
+        """
+        fingerprint = await self.data_manager.get_reel_fingerprint(reel_id)
+        if not fingerprint[0]:
+            raise_with_log(status.HTTP_404_NOT_FOUND, "Таблицы скоростей моталки не найдены")
+        lut = speed_lut_cache.get(reel_id)
+        if lut is None or lut.fingerprint != fingerprint:
+            roll_ids = await self.data_manager.get_roll_ids(reel_id)
+            tables = await self.data_manager.load_tables(roll_ids)
+            for table in tables:
+                speed_table_cache.set(table.roll_id, table)
+            lut = SpeedLookupTable.compile(reel_id, fingerprint, tables)
+            speed_lut_cache.set(reel_id, lut)
+        return lut
+
+    @staticmethod
+    def _history_schema(history: SpeedHistoryModel) -> SpeedHistorySchema:
+        """
+        Преобразует версию в схему с моментом начала действия в московском времени.
+
+        SQLite не хранит часовой пояс, поэтому он восстанавливается явно.
+        """
+        return SpeedHistorySchema(
+            roll_id=history.roll_id,
+            valid_from=to_moscow_time(history.valid_from),
+            speeds=history.speeds,
+        )
+
+    async def get_tables(self, roll_ids: List[int]) -> Dict[int, RollSpeedTable]:
+        """
+        Получает таблицы скоростей роликов, загружая отсутствующие в кеше одним запросом.
+
+        Args:
+            roll_ids (List[int]): ID формирующих роликов.
+
+        Returns:
+            Dict[int, RollSpeedTable]: Таблицы скоростей по ID ролика.
+        """
+        tables: Dict[int, RollSpeedTable] = {}
+        missing: List[int] = []
+        for roll_id in roll_ids:
+            table = speed_table_cache.get(roll_id)
+            if table is None:
+                missing.append(roll_id)
+            else:
+                tables[roll_id] = table
+        if missing:
+            for table in await self.data_manager.load_tables(missing):
+                speed_table_cache.set(table.roll_id, table)
+                tables[table.roll_id] = table
+        return tables
+
+
+class SpeedDataManager(BaseDataManager[SpeedSchema]):
+    """
+    Менеджер данных для таблиц скоростей.
+    """
+    def __init__(self, session: AsyncSession):
+        """
+        Инициализирует SpeedDataManager.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия базы данных.
+        """
+        super().__init__(session, SpeedSchema)
+
+    async def get_roll_ids(self, reel_id: int) -> List[int]:
+        """
+        Получает ID роликов моталки.
+
+        Args:
+            reel_id (int): ID моталки.
+
+        Returns:
+            List[int]: ID роликов в порядке возрастания.
+        """
+        statement = select(RollModel.id).where(RollModel.reel_id == reel_id).order_by(RollModel.id)
+        return list((await self.session.scalars(statement)).all())
+
+    async def get_reel_fingerprint(self, reel_id: int) -> tuple:
+        """
+        Вычисляет отпечаток строк таблиц скоростей моталки.
+
+        Количество строк, наибольший ID и наибольшее время обновления меняются
+        при любой вставке, удалении или изменении строк.
+
+        Args:
+            reel_id (int): ID моталки.
+
+        Returns:
+            tuple: (количество строк, наибольший ID, наибольшее updated_at).
+        """
+        statement = (
+            select(func.count(SpeedModel.id), func.max(SpeedModel.id), func.max(SpeedModel.updated_at))
+            .join(RollModel, RollModel.id == SpeedModel.roll_id)
+            .where(RollModel.reel_id == reel_id)
+        )
+        return tuple((await self.session.execute(statement)).one())
+
+    async def load_tables(self, roll_ids: List[int]) -> List[RollSpeedTable]:
+        """
+        Загружает таблицы скоростей роликов одним запросом только нужных столбцов.
+
+        Args:
+            roll_ids (List[int]): ID формирующих роликов.
+
+        Returns:
+            List[RollSpeedTable]: Таблицы роликов, у которых есть строки скоростей.
+        """
+        columns = [getattr(SpeedModel, field) for field in ("task", *SPEED_VALUE_FIELDS, *SPEED_FLAG_FIELDS)]
+        statement = (
+            select(SpeedModel.roll_id, *columns)
+            .where(SpeedModel.roll_id.in_(roll_ids))
+            .order_by(SpeedModel.roll_id, SpeedModel.task)
+        )
+        rows_by_roll: Dict[int, List[tuple]] = {}
+        for roll_id, *row in (await self.session.execute(statement)).all():
+            rows_by_roll.setdefault(roll_id, []).append(tuple(row))
+        return [RollSpeedTable.from_rows(roll_id, rows) for roll_id, rows in rows_by_roll.items()]
+
+    async def load_columns(self, roll_ids: List[int] | None = None) -> Dict[str, np.ndarray]:
+        """
+        Загружает строки таблиц скоростей одним запросом в столбцовом виде.
+
+        Строки отсортированы по (roll_id, task), поэтому строки одного ролика
+        образуют непрерывный диапазон.
+
+        Args:
+            roll_ids (List[int] | None): ID роликов. Если None, загружаются все строки.
+
+        Returns:
+            Dict[str, np.ndarray]: Массивы id, roll_id и SPEED_PARAM_FIELDS.
+        """
+        fields = ("id", "roll_id", *SPEED_PARAM_FIELDS)
+        statement = select(*(getattr(SpeedModel, field) for field in fields)).order_by(SpeedModel.roll_id, SpeedModel.task)
+        if roll_ids is not None:
+            statement = statement.where(SpeedModel.roll_id.in_(roll_ids))
+        rows = (await self.session.execute(statement)).all()
+        data = list(zip(*rows)) if rows else [()] * len(fields)
+        dtypes = {
+            "id": np.int64,
+            "roll_id": np.int64,
+            **{field: np.int64 for field in SPEED_INT_FIELDS},
+            **{field: bool for field in SPEED_FLAG_FIELDS},
+        }
+        return {
+            field: np.asarray(values, dtype=dtypes.get(field, np.float64))
+            for field, values in zip(fields, data)
+        }
+
+    async def bulk_update(self, params: List[Dict[str, Any]]) -> None:
+        """
+        Обновляет строки таблицы скоростей одним пакетным UPDATE по первичному ключу.
+
+        Args:
+            params (List[Dict[str, Any]]): Значения для обновления, каждое с ключом id.
+        """
+        await self.session.execute(update(SpeedModel), params)
+
+    async def add_history(self, roll_id: int, rows: List[Dict[str, Any]]) -> SpeedHistoryModel:
+        """
+        Добавляет версию набора параметров скоростей ролика без фиксации транзакции.
+
+        Args:
+            roll_id (int): ID формирующего ролика.
+            rows (List[Dict[str, Any]]): Строки таблицы скоростей.
+
+        Returns:
+            SpeedHistoryModel: Добавленная версия.
+
+        Raises:
+            HTTPException: 409, если версия ролика с тем же моментом начала действия уже записана.
+        """
+        history = SpeedHistoryModel(
+            roll_id=roll_id,
+            valid_from=datetime.now(moscow_tz),
+            speeds=[{field: row[field] for field in SPEED_PARAM_FIELDS} for row in rows],
+        )
+        self.session.add(history)
+        try:
+            await self.session.flush()
+        except IntegrityError:
+            await self.session.rollback()
+            raise_with_log(status.HTTP_409_CONFLICT, "Версия таблицы скоростей с этим временем уже записана")
+        return history
+
+    async def get_history_as_of(self, roll_id: int, moment: datetime) -> SpeedHistoryModel | None:
+        """
+        Находит версию, действовавшую в момент времени, одним поиском по индексу.
+
+        Args:
+            roll_id (int): ID формирующего ролика.
+            moment (datetime): Момент времени.
+
+        Returns:
+            SpeedHistoryModel | None: Последняя версия, начавшая действовать не позже момента.
+        """
+        statement = (
+            select(SpeedHistoryModel)
+            .where(
+                SpeedHistoryModel.roll_id == roll_id,
+                SpeedHistoryModel.valid_from <= to_moscow_time(moment),
+            )
+            .order_by(SpeedHistoryModel.valid_from.desc())
+            .limit(1)
+        )
+        return await self.get_one(statement)
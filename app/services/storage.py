@@ -0,0 +1,394 @@
+from datetime import datetime
+from typing import List
+
+from fastapi import status
+from sqlalchemy import select, update, delete, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.const import storage_number_cache_size
+from app.database.upsert import dialect_insert
+from app.models.storage import (
+    StorageLocationModel,
+    StorageEquipmentModel,
+    StorageMovementModel,
+    StorageStockModel
+)
+from app.schemas.storage import (
+    StorageEquipmentSchema,
+    StorageMovementSchema,
+    StorageStockSchema
+)
+from app.services.base import BaseService, BaseDataManager
+from app.utils.cache import LRUCache
+from app.utils.exc import raise_with_log
+
+# Горячий кеш поиска по номенклатурному номеру: номер -> список оборудования.
+# Запись удаляется при любом изменении оборудования с этим номером.
+equipment_number_cache: LRUCache[List[StorageEquipmentSchema]] = LRUCache(maxsize=storage_number_cache_size)
+
+
+class StorageService(BaseService):
+    """
+    Сервис для учёта оборудования на складах.
+
+    Все изменения количества выполняются атомарным
+    ``UPDATE ... SET qty = qty + :delta RETURNING`` и сопровождаются записью
+    в журнал движений и инкрементальным обновлением сводного остатка.
+    """
+    def __init__(self, session: AsyncSession):
+        """
+        Инициализирует StorageService.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия базы данных.
+        """
+        super().__init__(session)
+        self.data_manager = StorageDataManager(session)
+
+    async def add_equipment(self, equipment: StorageEquipmentSchema) -> StorageEquipmentSchema:
+        """
+        Добавляет оборудование на склад и учитывает его в сводном остатке.
+
+        Args:
+            equipment (StorageEquipmentSchema): Оборудование для добавления.
+
+        Returns:
+            StorageEquipmentSchema: Добавленное оборудование.
+        """
+        model = StorageEquipmentModel(**equipment.model_dump(exclude={"id"}))
+        return await self.data_manager.add_equipment(model)
+
+    async def check_in(self, equipment_id: int, qty: int, notes: str | None = None) -> StorageMovementSchema:
+        """
+        Оприходует оборудование.
+
+        Args:
+            equipment_id (int): ID оборудования.
+            qty (int): Количество.
+            notes (str | None): Примечание к движению.
+
+        Returns:
+            StorageMovementSchema: Запись журнала движений.
+        """
+        return await self.data_manager.adjust_qty(equipment_id, qty, notes)
+
+    async def check_out(self, equipment_id: int, qty: int, notes: str | None = None) -> StorageMovementSchema:
+        """
+        Списывает оборудование со склада.
+
+        Args:
+            equipment_id (int): ID оборудования.
+            qty (int): Количество.
+            notes (str | None): Примечание к движению.
+
+        Returns:
+            StorageMovementSchema: Запись журнала движений.
+
+        Raises:
+            HTTPException: 409, если на складе недостаточно оборудования.
+        """
+        return await self.data_manager.adjust_qty(equipment_id, -qty, notes)
+
+    async def get_by_number(self, number: str) -> List[StorageEquipmentSchema]:
+        """
+        Получает оборудование по номенклатурному номеру.
+
+        Повторные запросы обслуживаются из кеша за O(1) без обращения к базе.
+
+        Args:
+            number (str): Номенклатурный номер.
+
+        Returns:
+            List[StorageEquipmentSchema]: Оборудование с этим номером.
+        """
+        cached = equipment_number_cache.get(number)
+        if cached is not None:
+            return cached
+        statement = select(StorageEquipmentModel).where(StorageEquipmentModel.number == number)
+        equipment = await self.data_manager.get_all(statement)
+        result = [StorageEquipmentSchema.model_validate(e) for e in equipment]
+        equipment_number_cache.set(number, result)
+        return result
+
+    async def search(self, q: str, limit: int) -> List[StorageEquipmentSchema]:
+        """
+        Ищет оборудование по подстроке в названии или характеристиках.
+
+        В PostgreSQL запрос обслуживается триграммными индексами. Символы
+        шаблона ``%`` и ``_`` в строке поиска экранируются и ищутся буквально.
+
+        Args:
+            q (str): Строка для поиска.
+            limit (int): Максимальное количество записей.
+
+        Returns:
+            List[StorageEquipmentSchema]: Найденное оборудование.
+        """
+        escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"%{escaped}%"
+        statement = (
+            select(StorageEquipmentModel)
+            .where(or_(
+                StorageEquipmentModel.name.ilike(pattern, escape="\\"),
+                StorageEquipmentModel.specs.ilike(pattern, escape="\\"),
+            ))
+            .limit(limit)
+        )
+        equipment = await self.data_manager.get_all(statement)
+        return [StorageEquipmentSchema.model_validate(e) for e in equipment]
+
+    async def get_by_group(self, group: str, location_id: int | None = None) -> List[StorageEquipmentSchema]:
+        """
+        Получает оборудование группы, при необходимости в одном месте хранения.
+
+        Args:
+            group (str): Группа оборудования.
+            location_id (int | None): ID места хранения.
+
+        Returns:
+            List[StorageEquipmentSchema]: Оборудование группы.
+        """
+        statement = select(StorageEquipmentModel).where(StorageEquipmentModel.group == group)
+        if location_id is not None:
+            statement = statement.where(StorageEquipmentModel.location_id == location_id)
+        equipment = await self.data_manager.get_all(statement)
+        return [StorageEquipmentSchema.model_validate(e) for e in equipment]
+
+    async def get_by_place(self, place: str) -> List[StorageEquipmentSchema]:
+        """
+        Получает оборудование, размещённое на указанном месте склада.
+
+        Место ищется среди основного, Б/У и нового размещения.
+
+        Args:
+            place (str): Место на складе.
+
+        Returns:
+            List[StorageEquipmentSchema]: Оборудование на этом месте.
+        """
+        statement = (
+            select(StorageEquipmentModel)
+            .join(StorageLocationModel, StorageEquipmentModel.location_id == StorageLocationModel.id)
+            .where(or_(
+                StorageLocationModel.place == place,
+                StorageLocationModel.used_place == place,
+                StorageLocationModel.new_place == place,
+            ))
+        )
+        equipment = await self.data_manager.get_all(statement)
+        return [StorageEquipmentSchema.model_validate(e) for e in equipment]
+
+    async def get_movements(self, equipment_id: int, limit: int) -> List[StorageMovementSchema]:
+        """
+        Получает последние движения оборудования.
+
+        Args:
+            equipment_id (int): ID оборудования.
+            limit (int): Максимальное количество записей.
+
+        Returns:
+            List[StorageMovementSchema]: Движения, начиная с последнего.
+        """
+        statement = (
+            select(StorageMovementModel)
+            .where(StorageMovementModel.equipment_id == equipment_id)
+            .order_by(StorageMovementModel.id.desc())
+            .limit(limit)
+        )
+        movements = await self.data_manager.get_all(statement)
+        return [StorageMovementSchema.model_validate(m) for m in movements]
+
+    async def get_stock(self, location_id: int | None = None) -> List[StorageStockSchema]:
+        """
+        Получает сводные остатки по местам хранения и группам.
+
+        Args:
+            location_id (int | None): ID места хранения для фильтрации.
+
+        Returns:
+            List[StorageStockSchema]: Сводные остатки.
+        """
+        statement = select(StorageStockModel).order_by(StorageStockModel.location_id, StorageStockModel.group)
+        if location_id is not None:
+            statement = statement.where(StorageStockModel.location_id == location_id)
+        stock = await self.data_manager.get_all(statement)
+        return [StorageStockSchema.model_validate(s) for s in stock]
+
+    async def get_low_stock(self, threshold: int) -> List[StorageStockSchema]:
+        """
+        Получает группы, остаток которых не превышает порога.
+
+        Отчёт строится по сводной таблице и не просматривает оборудование.
+
+        Args:
+            threshold (int): Пороговое количество.
+
+        Returns:
+            List[StorageStockSchema]: Сводные остатки ниже порога.
+        """
+        statement = (
+            select(StorageStockModel)
+            .where(StorageStockModel.qty <= threshold)
+            .order_by(StorageStockModel.qty, StorageStockModel.location_id)
+        )
+        stock = await self.data_manager.get_all(statement)
+        return [StorageStockSchema.model_validate(s) for s in stock]
+
+    async def rebuild_stock(self) -> int:
+        """
+        Полностью пересчитывает сводные остатки по таблице оборудования.
+
+        Используется для первичного заполнения и восстановления сводной таблицы.
+
+        Returns:
+            int: Количество строк сводной таблицы.
+        """
+        return await self.data_manager.rebuild_stock()
+
+
+class StorageDataManager(BaseDataManager[StorageMovementSchema]):
+    """
+    Менеджер данных для журнала движений и сводных остатков.
+    """
+    def __init__(self, session: AsyncSession):
+        """
+        Инициализирует StorageDataManager.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия базы данных.
+        """
+        super().__init__(session, StorageMovementSchema)
+
+    async def add_equipment(self, model: StorageEquipmentModel) -> StorageEquipmentSchema:
+        """
+        Добавляет оборудование, начальное движение и обновляет сводный остаток.
+
+        Args:
+            model (StorageEquipmentModel): Модель оборудования.
+
+        Returns:
+            StorageEquipmentSchema: Добавленное оборудование.
+        """
+        self.session.add(model)
+        await self.session.flush()
+        self.session.add(StorageMovementModel(
+            equipment_id=model.id,
+            location_id=model.location_id,
+            group=model.group,
+            delta=model.qty,
+            qty_after=model.qty,
+            notes="Постановка на учёт",
+        ))
+        await self._add_to_stock(model.location_id, model.group, model.qty)
+        await self.session.commit()
+        equipment_number_cache.pop(model.number)
+        return StorageEquipmentSchema.model_validate(model)
+
+    async def adjust_qty(self, equipment_id: int, delta: int, notes: str | None) -> StorageMovementSchema:
+        """
+        Атомарно изменяет количество оборудования.
+
+        Условие ``qty + delta >= 0`` проверяется в том же UPDATE, поэтому
+        параллельные списания не могут увести остаток в минус.
+
+        Args:
+            equipment_id (int): ID оборудования.
+            delta (int): Приращение количества.
+            notes (str | None): Примечание к движению.
+
+        Returns:
+            StorageMovementSchema: Запись журнала движений.
+
+        Raises:
+            HTTPException: 404, если оборудование не найдено.
+            HTTPException: 409, если на складе недостаточно оборудования.
+        """
+        statement = (
+            update(StorageEquipmentModel)
+            .where(
+                StorageEquipmentModel.id == equipment_id,
+                StorageEquipmentModel.qty + delta >= 0,
+            )
+            .values(qty=StorageEquipmentModel.qty + delta)
+            .returning(
+                StorageEquipmentModel.qty,
+                StorageEquipmentModel.location_id,
+                StorageEquipmentModel.group,
+                StorageEquipmentModel.number,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        row = (await self.session.execute(statement)).one_or_none()
+
+        if row is None:
+            exists = await self.session.scalar(
+                select(StorageEquipmentModel.id).where(StorageEquipmentModel.id == equipment_id)
+            )
+            await self.session.rollback()
+            if exists is None:
+                raise_with_log(status.HTTP_404_NOT_FOUND, "Оборудование не найдено")
+            raise_with_log(status.HTTP_409_CONFLICT, "Недостаточно оборудования на складе")
+
+        qty_after, location_id, group, number = row
+        movement = StorageMovementModel(
+            equipment_id=equipment_id,
+            location_id=location_id,
+            group=group,
+            delta=delta,
+            qty_after=qty_after,
+            notes=notes,
+        )
+        self.session.add(movement)
+        await self._add_to_stock(location_id, group, delta)
+        await self.session.commit()
+        equipment_number_cache.pop(number)
+        return StorageMovementSchema.model_validate(movement)
+
+    async def rebuild_stock(self) -> int:
+        """
+        Пересчитывает сводные остатки одним INSERT ... SELECT.
+
+        Returns:
+            int: Количество строк сводной таблицы.
+        """
+        await self.session.execute(delete(StorageStockModel))
+        totals = (
+            select(
+                StorageEquipmentModel.location_id,
+                StorageEquipmentModel.group,
+                func.sum(StorageEquipmentModel.qty),
+                func.now(),
+            )
+            .group_by(StorageEquipmentModel.location_id, StorageEquipmentModel.group)
+        )
+        await self.session.execute(
+            dialect_insert(self.session, StorageStockModel).from_select(
+                ["location_id", "group", "qty", "updated_at"], totals
+            )
+        )
+        await self.session.commit()
+        return await self.session.scalar(select(func.count()).select_from(StorageStockModel))
+
+    async def _add_to_stock(self, location_id: int, group: str, delta: int) -> None:
+        """
+        Инкрементально изменяет сводный остаток места хранения и группы.
+
+        Args:
+            location_id (int): ID места хранения.
+            group (str): Группа оборудования.
+            delta (int): Приращение количества.
+        """
+        statement = dialect_insert(self.session, StorageStockModel).values(
+            location_id=location_id,
+            group=group,
+            qty=delta,
+            updated_at=datetime.now(),
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[StorageStockModel.location_id, StorageStockModel.group],
+            set_={
+                "qty": StorageStockModel.qty + statement.excluded.qty,
+                "updated_at": statement.excluded.updated_at,
+            },
+        )
+        await self.session.execute(statement)
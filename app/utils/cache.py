@@ -0,0 +1,95 @@
+"""
+Модуль с ограниченным по размеру LRU-кешем для данных в памяти процесса.
+
+LRUCache хранит не более ``maxsize`` записей и вытесняет давно не
+использованные. Для каждой записи можно задать время жизни: просроченные
+записи считаются отсутствующими и удаляются при обращении.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class LRUCache(Generic[V]):
+    """
+    Ограниченный LRU-кеш с необязательным временем жизни записей.
+
+    Чтение и запись выполняются за O(1).
+    """
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None) -> None:
+        """
+        Инициализирует LRUCache.
+
+        Args:
+            maxsize (int): Максимальное количество записей.
+            ttl (float | None): Время жизни записи в секундах по умолчанию.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[V, Optional[float]]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> V | Any:
+        """
+        Возвращает значение по ключу и отмечает его как недавно использованное.
+
+        Args:
+            key (Hashable): Ключ.
+            default (Any): Значение, если ключ отсутствует или запись просрочена.
+
+        Returns:
+            V | Any: Значение из кеша или default.
+        """
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            return default
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None) -> None:
+        """
+        Сохраняет значение, вытесняя самую старую запись при переполнении.
+
+        Args:
+            key (Hashable): Ключ.
+            value (V): Значение.
+            ttl (float | None): Время жизни записи в секундах.
+                По умолчанию используется ttl кеша.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> V | Any:
+        """
+        Удаляет запись из кеша.
+
+        Args:
+            key (Hashable): Ключ.
+            default (Any): Значение, если ключ отсутствует.
+
+        Returns:
+            V | Any: Удалённое значение или default.
+        """
+        item = self._data.pop(key, _MISSING)
+        return default if item is _MISSING else item[0]
+
+    def clear(self) -> None:
+        """Очищает кеш."""
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,63 @@
+"""
+Модуль прореживания временных рядов для построения графиков.
+
+Алгоритм Largest-Triangle-Three-Buckets (LTTB) оставляет первую и последнюю
+точки ряда, делит остальные на ``n - 2`` корзины и из каждой корзины
+выбирает точку, образующую треугольник наибольшей площади с точкой,
+выбранной в предыдущей корзине, и средней точкой следующей корзины.
+Форма графика при этом сохраняется, включая пики и провалы.
+
+Выбор в корзине зависит от предыдущего выбора, поэтому корзины
+обрабатываются по очереди, а площади внутри корзины и средние точки всех
+корзин вычисляются векторно.
+"""
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n: int) -> np.ndarray:
+    """
+    Выбирает индексы точек ряда по алгоритму LTTB.
+
+    Args:
+        x (np.ndarray): Значения по оси X, отсортированные по возрастанию.
+        y (np.ndarray): Значения по оси Y.
+        n (int): Количество точек результата.
+
+    Returns:
+        np.ndarray: Возрастающие индексы выбранных точек. Если точек не больше n
+            или n < 3, возвращаются все индексы.
+
+    Raises:
+        ValueError: Если длины x и y различаются.
+    """
+    size = len(x)
+    if len(y) != size:
+        raise ValueError("Длины x и y должны совпадать")
+    if n >= size or n < 3:
+        return np.arange(size)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = (np.linspace(1, size - 1, n - 1)).astype(np.intp)
+    starts, ends = edges[:-1], edges[1:]
+
+    cumulative_x = np.r_[0.0, np.cumsum(x)]
+    cumulative_y = np.r_[0.0, np.cumsum(y)]
+    counts = ends - starts
+    mean_x = (cumulative_x[ends] - cumulative_x[starts]) / counts
+    mean_y = (cumulative_y[ends] - cumulative_y[starts]) / counts
+    next_x = np.r_[mean_x[1:], x[-1]]
+    next_y = np.r_[mean_y[1:], y[-1]]
+
+    selected = np.empty(n, dtype=np.intp)
+    selected[0], selected[-1] = 0, size - 1
+    previous = 0
+    for bucket, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+        bucket_x, bucket_y = x[start:end], y[start:end]
+        area = np.abs(
+            (x[previous] - next_x[bucket]) * (bucket_y - y[previous])
+            - (x[previous] - bucket_x) * (next_y[bucket] - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return selected
@@ -0,0 +1,31 @@
+"""
+Модуль для обработки условных запросов с заголовком If-None-Match.
+
+Сравнение выполняется по слабому правилу (RFC 9110, 13.1.2): префикс W/
+не учитывается, а значение ``*`` совпадает с любым текущим тегом.
+"""
+
+
+def _opaque(tag: str) -> str:
+    """Возвращает тег без префикса слабого сравнения."""
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Проверяет, совпадает ли текущий тег с заголовком If-None-Match.
+
+    Args:
+        if_none_match (str | None): Значение заголовка If-None-Match.
+        etag (str): Текущий тег ресурса.
+
+    Returns:
+        bool: True, если клиенту можно ответить 304 Not Modified.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = _opaque(etag)
+    return any(_opaque(tag) == current for tag in if_none_match.split(","))
@@ -1,15 +1,16 @@
 import inspect
+from typing import Dict
 
 from fastapi.exceptions import HTTPException
 from loguru import logger
 
 
-def raise_with_log(status_code: int, detail: str) -> None:
+def raise_with_log(status_code: int, detail: str, headers: Dict[str, str] | None = None) -> None:
     """Wrapper function for logging and raising exceptions."""
 
     desc = f"<HTTPException status_code={status_code} detail={detail}>"
     logger.error(f"{desc} | runner={runner_info()}")
-    raise HTTPException(status_code, detail)
+    raise HTTPException(status_code, detail, headers)
 
 
 def runner_info() -> str:
@@ -0,0 +1,188 @@
+"""
+Модуль с кольцевым буфером записей в столбцовом виде на массивах NumPy.
+
+Для каждого ключа (например, адреса датчика) выделяется строка фиксированной
+длины в двумерном структурированном массиве, поэтому память буфера известна
+заранее и не зависит от потока записей: запись занимает ``dtype.itemsize``
+байт вместо сотен байт объекта pydantic. Новые записи затирают самые старые.
+
+Буфер может храниться в отображаемых в память файлах .npy, тогда его
+содержимое переживает перезапуск процесса.
+"""
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from loguru import logger
+from numpy.lib.format import open_memmap
+
+
+class ColumnarRingBuffer:
+    """
+    Кольцевой буфер последних записей для каждого ключа.
+
+    Записи каждого ключа затираются в порядке поступления, а окно записей
+    возвращается упорядоченным по полю ts.
+
+    Attributes:
+        dtype (np.dtype): Структурированный тип записи, содержащий поле ts.
+        capacity (int): Количество записей на ключ.
+        max_keys (int): Наибольшее количество ключей.
+        path (str | None): Каталог файлов буфера или None для буфера в памяти.
+    """
+    def __init__(self, dtype: np.dtype, capacity: int, max_keys: int, path: Optional[str] = None) -> None:
+        """
+        Инициализирует ColumnarRingBuffer.
+
+        Args:
+            dtype (np.dtype): Структурированный тип записи, содержащий поле ts.
+            capacity (int): Количество записей на ключ.
+            max_keys (int): Наибольшее количество ключей.
+            path (str | None): Каталог файлов буфера. Существующие файлы с той же
+                формой открываются, иначе создаются заново.
+        """
+        self.dtype = np.dtype(dtype)
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self.path = path
+        self._slots: Dict[str, int] = {}
+        if path is None:
+            self._data = np.zeros((max_keys, capacity), dtype=self.dtype)
+            self._heads = np.zeros((max_keys, 2), dtype=np.int64)
+        else:
+            self._open(path)
+
+    def _open(self, path: str) -> None:
+        """
+        Открывает или создаёт файлы буфера в каталоге path.
+        """
+        os.makedirs(path, exist_ok=True)
+        data_path = os.path.join(path, "data.npy")
+        heads_path = os.path.join(path, "heads.npy")
+        keys_path = os.path.join(path, "keys.json")
+        shape = (self.max_keys, self.capacity)
+        if os.path.exists(data_path) and os.path.exists(heads_path) and os.path.exists(keys_path):
+            data = open_memmap(data_path, mode="r+")
+            if data.shape == shape and data.dtype == self.dtype:
+                self._data = data
+                self._heads = open_memmap(heads_path, mode="r+")
+                with open(keys_path, encoding="utf-8") as file:
+                    self._slots = {key: slot for key, slot in json.load(file)}
+                return
+            logger.warning("Файлы кольцевого буфера {} не совпадают по форме и будут пересозданы", path)
+            del data
+        self._data = open_memmap(data_path, mode="w+", dtype=self.dtype, shape=shape)
+        self._heads = open_memmap(heads_path, mode="w+", dtype=np.int64, shape=(self.max_keys, 2))
+        self._save_keys()
+
+    def _save_keys(self) -> None:
+        """
+        Сохраняет соответствие ключей строкам буфера.
+        """
+        if self.path is not None:
+            with open(os.path.join(self.path, "keys.json"), "w", encoding="utf-8") as file:
+                json.dump(list(self._slots.items()), file, ensure_ascii=False)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._slots
+
+    def keys(self) -> List[str]:
+        """Ключи, для которых есть записи."""
+        return list(self._slots)
+
+    @property
+    def nbytes(self) -> int:
+        """Память, занимаемая записями буфера, в байтах."""
+        return self._data.nbytes + self._heads.nbytes
+
+    def extend(self, keys: Iterable[str], records: np.ndarray) -> int:
+        """
+        Добавляет записи пакетом.
+
+        Записи сортируются по (ключ, ts) и раскладываются по строкам буфера
+        одной операцией. Записи новых ключей сверх max_keys
+        отбрасываются.
+
+        Args:
+            keys (Iterable[str]): Ключ каждой записи.
+            records (np.ndarray): Записи типа dtype.
+
+        Returns:
+            int: Количество добавленных записей.
+        """
+        slots = np.fromiter((self._slot(key) for key in keys), dtype=np.int64, count=len(records))
+        accepted = slots >= 0
+        if not accepted.all():
+            slots, records = slots[accepted], records[accepted]
+        if not len(slots):
+            return 0
+
+        order = np.lexsort((records["ts"], slots))
+        slots, records = slots[order], records[order]
+        unique, starts, counts = np.unique(slots, return_index=True, return_counts=True)
+        rank = np.arange(len(slots)) - np.repeat(starts, counts)
+        total = np.repeat(counts, counts)
+        keep = rank >= total - self.capacity
+        heads = self._heads[slots, 0]
+        positions = (heads + rank) % self.capacity
+        self._data[slots[keep], positions[keep]] = records[keep]
+        self._heads[unique, 0] = (self._heads[unique, 0] + counts) % self.capacity
+        self._heads[unique, 1] = np.minimum(self._heads[unique, 1] + counts, self.capacity)
+        return int(accepted.sum())
+
+    def window(self, key: str, since: Optional[int] = None) -> np.ndarray:
+        """
+        Возвращает записи ключа в порядке возрастания ts.
+
+        Args:
+            key (str): Ключ.
+            since (int | None): Наименьшее значение ts возвращаемых записей.
+
+        Returns:
+            np.ndarray: Копия записей типа dtype.
+        """
+        slot = self._slots.get(key)
+        if slot is None:
+            return np.empty(0, dtype=self.dtype)
+        head, count = self._heads[slot].tolist()
+        row = self._data[slot]
+        records = np.concatenate((row[head:], row[:head])) if count == self.capacity else row[:count].copy()
+        if since is not None:
+            records = records[records["ts"] >= since]
+        return records[np.argsort(records["ts"], kind="stable")]
+
+    def flush(self) -> None:
+        """
+        Записывает изменения отображаемых файлов на диск.
+        """
+        for array in (self._data, self._heads):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    def clear(self) -> None:
+        """
+        Удаляет все записи.
+        """
+        self._slots.clear()
+        self._heads[:] = 0
+        self._save_keys()
+
+    def _slot(self, key: str) -> int:
+        """
+        Возвращает строку буфера ключа, выделяя её для нового ключа.
+
+        Returns:
+            int: Номер строки или -1, если свободных строк нет.
+        """
+        slot = self._slots.get(key)
+        if slot is None:
+            if len(self._slots) >= self.max_keys:
+                return -1
+            slot = self._slots[key] = len(self._slots)
+            self._heads[slot] = 0
+            self._save_keys()
+        return slot
@@ -6,4 +6,6 @@ echo "Применение миграции"
 poetry run alembic upgrade head
 
 echo "Запуск сервера uvicorn"
-poetry run uvicorn app.main:app --host 0.0.0.0 --port 8000 --proxy-headers --forwarded-allow-ips=*
\ No newline at end of file
+# Заголовки X-Forwarded-* принимаются только от обратного прокси: адрес клиента
+# из них используется для ограничения попыток входа по IP (app/services/rate_limit.py).
+poetry run uvicorn app.main:app --host 0.0.0.0 --port 8000 --proxy-headers --forwarded-allow-ips="${FORWARDED_ALLOW_IPS:-127.0.0.1}"
\ No newline at end of file
@@ -19,6 +19,21 @@ from app.models.converters import (
     ConverterModel,
     UnitModel
 )
+from app.models.speed import ReelModel, RollModel, SpeedModel, SpeedHistoryModel
+from app.models.sensors import (
+    SensorReadingModel,
+    SensorRollupModel,
+    SensorLatestModel,
+    SensorDeviceModel,
+    SensorAlertRuleModel,
+    SensorAlertModel
+)
+from app.models.storage import (
+    StorageLocationModel,
+    StorageEquipmentModel,
+    StorageMovementModel,
+    StorageStockModel
+)
 from app.core.config import config as settings
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,113 @@
+"""add_sensor_reading_ts
+
+Revision ID: 0a8aeab8af42
+Revises: aecf3661c95f
+Create Date: 2026-10-19 03:24:15.525241
+
+"""
+from datetime import datetime
+from functools import lru_cache
+from typing import Sequence, Union
+
+from alembic import op
+import pytz
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a8aeab8af42'
+down_revision: Union[str, None] = 'aecf3661c95f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Правила разбора времени повторяют parse_sensor_date на момент миграции:
+# ISO 8601 или SENSOR_DATE_FORMATS, время без пояса считается московским,
+# неразобранная строка заменяется временем приёма показания.
+SENSOR_DATE_FORMATS = ("%d.%m.%Y %H:%M:%S", "%d.%m.%Y %H:%M", "%Y/%m/%d %H:%M:%S")
+MS_PER_DAY = 86_400_000
+BACKFILL_CHUNK_SIZE = 10_000
+moscow_tz = pytz.timezone('Europe/Moscow')
+
+sensor_readings = sa.table(
+    'sensor_readings',
+    sa.column('id', sa.Integer()),
+    sa.column('date', sa.String()),
+    sa.column('received_at', sa.DateTime(timezone=True)),
+    sa.column('ts', sa.BigInteger()),
+    sa.column('day', sa.Integer()),
+)
+
+
+def _to_epoch_ms(moment: datetime) -> int:
+    if moment.tzinfo is None:
+        moment = moscow_tz.localize(moment)
+    return int(moment.timestamp() * 1000)
+
+
+@lru_cache(maxsize=65536)
+def _parse_date(date: str) -> int | None:
+    value = date.strip()
+    try:
+        return _to_epoch_ms(datetime.fromisoformat(value))
+    except ValueError:
+        pass
+    for date_format in SENSOR_DATE_FORMATS:
+        try:
+            return _to_epoch_ms(datetime.strptime(value, date_format))
+        except ValueError:
+            continue
+    return None
+
+
+def _backfill_ts() -> None:
+    """Заполняет ts и day существующих показаний порциями по id."""
+    bind = op.get_bind()
+    statement = (
+        sa.update(sensor_readings)
+        .where(sensor_readings.c.id == sa.bindparam('_id'))
+        .values(ts=sa.bindparam('_ts'), day=sa.bindparam('_day'))
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(sensor_readings.c.id, sensor_readings.c.date, sensor_readings.c.received_at)
+            .where(sensor_readings.c.id > last_id)
+            .order_by(sensor_readings.c.id)
+            .limit(BACKFILL_CHUNK_SIZE)
+        ).all()
+        if not rows:
+            break
+        params = []
+        for row in rows:
+            ts = _parse_date(row.date)
+            if ts is None:
+                ts = _to_epoch_ms(row.received_at)
+            params.append({'_id': row.id, '_ts': ts, '_day': ts // MS_PER_DAY})
+        bind.execute(statement, params)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.add_column('sensor_readings', sa.Column('ts', sa.BigInteger(), nullable=False, server_default='0'))
+    op.add_column('sensor_readings', sa.Column('day', sa.Integer(), nullable=False, server_default='0'))
+    _backfill_ts()
+    # Значение по умолчанию нужно только для добавления столбцов к существующим строкам:
+    # показание без времени должно отклоняться, а не датироваться 1970 годом.
+    with op.batch_alter_table('sensor_readings') as batch_op:
+        batch_op.alter_column('ts', existing_type=sa.BigInteger(), server_default=None)
+        batch_op.alter_column('day', existing_type=sa.Integer(), server_default=None)
+    op.drop_index(op.f('ix_sensor_readings_address'), table_name='sensor_readings')
+    op.create_index('ix_sensor_readings_address_ts', 'sensor_readings', ['address', 'ts'], unique=False, postgresql_include=['status', 'battery', 'temperature'])
+    op.create_index('ix_sensor_readings_day', 'sensor_readings', ['day'], unique=False)
+    # ### end Alembic commands ###
+
+
+def downgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index('ix_sensor_readings_day', table_name='sensor_readings')
+    op.drop_index('ix_sensor_readings_address_ts', table_name='sensor_readings', postgresql_include=['status', 'battery', 'temperature'])
+    op.create_index(op.f('ix_sensor_readings_address'), 'sensor_readings', ['address'], unique=False)
+    op.drop_column('sensor_readings', 'day')
+    op.drop_column('sensor_readings', 'ts')
+    # ### end Alembic commands ###
@@ -0,0 +1,25 @@
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.models.auth  # noqa: F401 pylint: disable=unused-import
+import app.models.converters  # noqa: F401 pylint: disable=unused-import
+import app.models.manuals  # noqa: F401 pylint: disable=unused-import
+import app.models.sensors  # noqa: F401 pylint: disable=unused-import
+import app.models.speed  # noqa: F401 pylint: disable=unused-import
+import app.models.storage  # noqa: F401 pylint: disable=unused-import
+from app.models.base import SQLModel
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db_session(session_factory):
+    async with session_factory() as session:
+        yield session
@@ -1,61 +1,65 @@
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
 import pytest
+from fastapi import FastAPI, HTTPException
 from fastapi.testclient import TestClient
-from unittest.mock import Mock, patch
-from app.routers.v1.posts import router, get_post, get_posts
-from app.schemas.posts import PostSchema
+from app.routers.v1.posts import router
 from app.schemas.auth import UserSchema
+from app.schemas.posts import PostSchema, PostFeedSchema
+from app.services.auth import get_current_user
 
-client = TestClient(router)
+app = FastAPI()
+app.include_router(router)
+client = TestClient(app)
+
+def _post(post_id: int) -> PostSchema:
+    return PostSchema(
+        id=post_id, user_id=1, title=f"Post {post_id}", content="Content", description="",
+        created_at=datetime(2024, 12, 1), updated_at=datetime(2024, 12, 1),
+    )
 
 @pytest.fixture
 def mock_post_service():
+    app.dependency_overrides[get_current_user] = lambda: UserSchema(name="Иван", email="ivan@example.com")
     with patch('app.routers.v1.posts.PostService') as mock:
         yield mock
+    app.dependency_overrides.clear()
 
-@pytest.fixture
-def mock_current_user():
-    return UserSchema(id=1, username="testuser")
-
-def test_get_post(mock_post_service, mock_current_user):
+def test_get_post(mock_post_service):
     mock_service = mock_post_service.return_value
-    mock_service.get_post.return_value = PostSchema(id=1, title="Test Post", content="Test Content")
-    
-    response = client.get("/1", headers={"Authorization": "Bearer test_token"})
+    mock_service.get_post = AsyncMock(return_value=_post(1))
+
+    response = client.get("/posts/1")
     assert response.status_code == 200
-    assert response.json() == {"id": 1, "title": "Test Post", "content": "Test Content"}
+    assert response.json()["title"] == "Post 1"
+    mock_service.get_post.assert_awaited_once_with(1)
 
-def test_get_post_not_found(mock_post_service, mock_current_user):
+def test_get_post_not_found(mock_post_service):
     mock_service = mock_post_service.return_value
-    mock_service.get_post.side_effect = ValueError("Post not found")
-    
-    response = client.get("/999", headers={"Authorization": "Bearer test_token"})
+    mock_service.get_post = AsyncMock(side_effect=HTTPException(status_code=404, detail="Пост не найден"))
+
+    response = client.get("/posts/999")
     assert response.status_code == 404
 
-def test_get_posts(mock_post_service, mock_current_user):
+def test_get_posts_feed(mock_post_service):
     mock_service = mock_post_service.return_value
-    mock_service.get_posts.return_value = [
-        PostSchema(id=1, title="Post 1", content="Content 1"),
-        PostSchema(id=2, title="Post 2", content="Content 2")
-    ]
-    
-    response = client.get("/", headers={"Authorization": "Bearer test_token"})
-    assert response.status_code == 200
-    assert len(response.json()) == 2
-    assert response.json()[0] == {"id": 1, "title": "Post 1", "content": "Content 1"}
-    assert response.json()[1] == {"id": 2, "title": "Post 2", "content": "Content 2"}
+    mock_service.get_feed = AsyncMock(return_value=PostFeedSchema(
+        items=[], next_cursor=None, page=2, pages=2, total=3,
+    ))
 
-def test_get_posts_empty(mock_post_service, mock_current_user):
-    mock_service = mock_post_service.return_value
-    mock_service.get_posts.return_value = []
-    
-    response = client.get("/", headers={"Authorization": "Bearer test_token"})
+    response = client.get("/posts/?cursor=abc&limit=2")
     assert response.status_code == 200
-    assert response.json() == []
+    assert response.json()["page"] == 2
+    mock_service.get_feed.assert_awaited_once_with("abc", 2)
+
+def test_get_posts_limit_out_of_range(mock_post_service):
+    response = client.get("/posts/?limit=0")
+    assert response.status_code == 422
 
 def test_get_post_unauthorized():
-    response = client.get("/1")
+    response = client.get("/posts/1")
     assert response.status_code == 401
 
 def test_get_posts_unauthorized():
-    response = client.get("/")
+    response = client.get("/posts/")
     assert response.status_code == 401
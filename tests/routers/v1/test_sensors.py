@@ -0,0 +1,134 @@
+import json
+from functools import partial
+import numpy as np
+from unittest.mock import AsyncMock, patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.routers.v1.sensors import router
+from app.services.sensor_anomalies import SensorAnomalyDetector
+from app.services.sensor_events import SensorEventHub
+from app.services.sensors import SensorIngestBuffer, encode_binary_batch, read_body
+
+app = FastAPI()
+app.include_router(router)
+client = TestClient(app)
+
+payload = {"sensors": [{
+    "name": "Датчик", "address": "00:01", "date": "2024-11-01 10:00:00",
+    "status": "ok", "battery": 3.1, "temperature": 40.5,
+}]}
+
+def test_receive_data_is_buffered():
+    with patch("app.routers.v1.sensors.sensor_buffer", SensorIngestBuffer(capacity=1)):
+        response = client.post("/sensors/receive_data", json=payload)
+        assert response.status_code == 202
+        assert response.json() == {"accepted": 1, "pending": 1, "duplicates": 0}
+
+        response = client.post("/sensors/receive_data", json=payload)
+        assert response.json() == {"accepted": 0, "pending": 1, "duplicates": 1}
+
+        later = {"sensors": [{**payload["sensors"][0], "date": "2024-11-01 10:01:00"}]}
+        response = client.post("/sensors/receive_data", json=later)
+        assert response.status_code == 429
+
+        response = client.get("/sensors/ingest/stats")
+        assert response.json()["rejected"] == 1
+
+def test_get_readings_streams_ndjson():
+    async def readings(*_args, **_kwargs):
+        yield '{"ts": 1}\n'
+        yield '{"ts": 2}\n'
+
+    with patch("app.routers.v1.sensors.stream_readings", side_effect=readings) as mock:
+        response = client.get("/sensors/00:01/readings", params={"from": "2024-11-01T10:00:00", "to": "2024-11-01T12:00:00"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.text.splitlines() == ['{"ts": 1}', '{"ts": 2}']
+    assert mock.call_args.args[0] == "00:01"
+
+def test_get_readings_validates_max_points():
+    response = client.get("/sensors/00:01/readings", params={
+        "from": "2024-11-01T10:00:00", "to": "2024-11-01T12:00:00", "max_points": 2,
+    })
+    assert response.status_code == 422
+
+def test_get_latest_supports_conditional_get():
+    latest = (b'[{"address": "00:01"}]', '"abc"')
+    with patch("app.routers.v1.sensors.SensorService") as mock:
+        mock.return_value.get_latest = AsyncMock(return_value=latest)
+        response = client.get("/sensors/latest")
+        assert response.status_code == 200
+        assert response.json() == [{"address": "00:01"}]
+        assert response.headers["etag"] == '"abc"'
+
+        response = client.get("/sensors/latest", headers={"If-None-Match": '"abc"'})
+        assert response.status_code == 304
+        response = client.get("/sensors/latest", headers={"If-None-Match": "*"})
+        assert response.status_code == 304
+
+def test_receive_ndjson_and_binary():
+    record = payload["sensors"][0]
+    with patch("app.routers.v1.sensors.sensor_buffer", SensorIngestBuffer(capacity=10)):
+        lines = [json.dumps({**record, "date": f"2024-11-01 10:0{i}:00"}).encode() for i in range(3)]
+        response = client.post("/sensors/receive_ndjson", content=b"\n".join(lines))
+        assert response.status_code == 202
+        assert response.json() == {"accepted": 3, "pending": 3, "duplicates": 0}
+
+        batch = encode_binary_batch([{**record, "ts": 1_730_444_400_000 + i * 60_000} for i in range(3, 5)])
+        response = client.post("/sensors/receive_binary", content=batch)
+        assert response.status_code == 202
+        assert response.json() == {"accepted": 2, "pending": 5, "duplicates": 0}
+
+        response = client.post("/sensors/receive_binary", content=batch[:-1])
+        assert response.status_code == 422
+
+        response = client.post("/sensors/receive_ndjson", content=b"x" * 10_000)
+        assert response.status_code == 413
+        with patch("app.routers.v1.sensors.read_body", partial(read_body, limit=len(batch) - 1)):
+            response = client.post("/sensors/receive_binary", content=batch)
+        assert response.status_code == 413
+
+def test_get_active_alerts():
+    with patch("app.routers.v1.sensors.SensorAlertService") as mock:
+        mock.return_value.get_alerts = AsyncMock(return_value=[])
+        response = client.get("/sensors/alerts", params={"active": True, "address": "00:01"})
+    assert response.status_code == 200
+    assert response.json() == []
+    mock.return_value.get_alerts.assert_awaited_once_with(True, "00:01", 100)
+
+def test_get_anomalies_returns_precomputed_state():
+    detector = SensorAnomalyDetector(max_sensors=2, warmup=1, threshold=1.0)
+    detector.update(["00:01"] * 3, np.array([0, 60_000, 120_000]), np.array([90.0, 90.0, 90.0]), np.array([40.0, 41.0, 60.0]))
+    with patch("app.routers.v1.sensors.sensor_anomaly_detector", detector):
+        response = client.get("/sensors/anomalies")
+    assert response.status_code == 200
+    [anomaly] = response.json()
+    assert anomaly["address"] == "00:01"
+    assert anomaly["fields"] == ["temperature"]
+
+def test_live_stream_over_sse_and_websocket():
+    hub = SensorEventHub()
+    subscribe = hub.subscribe
+
+    def subscribe_and_publish(addresses=None):
+        subscriber = subscribe(addresses)
+        hub.publish("reading", [{"address": "00:01", "ts": 1}, {"address": "00:02", "ts": 2}])
+        hub.close()
+        return subscriber
+
+    with patch("app.routers.v1.sensors.sensor_event_hub", hub), \
+            patch.object(hub, "subscribe", side_effect=subscribe_and_publish):
+        response = client.get("/sensors/stream", params={"address": "00:02"})
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text == 'event: reading\ndata: [{"address": "00:02", "ts": 2}]\n\n'
+
+        with client.websocket_connect("/sensors/ws") as websocket:
+            message = websocket.receive_json()
+        assert message == {"event": "reading", "data": [{"address": "00:01", "ts": 1}, {"address": "00:02", "ts": 2}]}
+
+def test_get_cabinets():
+    with patch("app.routers.v1.sensors.CabinetHealthService") as mock:
+        mock.return_value.get_overview = AsyncMock(return_value=[])
+        response = client.get("/sensors/cabinets")
+    assert response.status_code == 200
+    assert response.json() == []
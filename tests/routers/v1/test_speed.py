@@ -0,0 +1,47 @@
+from unittest.mock import AsyncMock, patch
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.routers.v1.speed import router
+from app.schemas.speed import SpeedSetpointsSchema
+from app.services.speed import SpeedLookupTable
+
+app = FastAPI()
+app.include_router(router)
+client = TestClient(app)
+
+@pytest.fixture
+def mock_speed_service():
+    with patch('app.routers.v1.speed.SpeedService') as mock:
+        yield mock
+
+def test_get_roll_setpoints(mock_speed_service):
+    mock_service = mock_speed_service.return_value
+    mock_service.get_roll_setpoints = AsyncMock(return_value=SpeedSetpointsSchema(
+        roll_id=1, task=[1.0, 2.0], tspd=[100, 200], fspd=[False, True], bmav=[1, 2],
+        bemf=[0.1, 0.2], amav=[3, 4], aemf=[0.3, 0.4], memf=[0.5, 0.6], corr=[False, False],
+    ))
+
+    response = client.post("/speeds/setpoints", json={"roll_id": 1, "tasks": [1.0, 2.0]})
+    assert response.status_code == 200
+    assert response.json()["tspd"] == [100, 200]
+    mock_service.get_roll_setpoints.assert_awaited_once_with(1, [1.0, 2.0])
+
+def test_get_reel_setpoints_requires_tasks(mock_speed_service):
+    response = client.post("/speeds/reels/1/setpoints", json={"tasks": []})
+    assert response.status_code == 422
+
+def test_get_reel_lut_supports_conditional_get(mock_speed_service):
+    lut = SpeedLookupTable(1, (3, 3, None), b"ASPD\x01\x00")
+    mock_speed_service.return_value.get_reel_lut = AsyncMock(return_value=lut)
+
+    response = client.get("/speeds/reels/1/lut")
+    assert response.status_code == 200
+    assert response.content == lut.content
+    assert response.headers["etag"] == lut.etag
+
+    response = client.get("/speeds/reels/1/lut", headers={"If-None-Match": lut.etag})
+    assert response.status_code == 304
+    response = client.get("/speeds/reels/1/lut", headers={"If-None-Match": f"W/{lut.etag}"})
+    assert response.status_code == 304
+    assert response.content == b""
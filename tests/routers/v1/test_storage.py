@@ -0,0 +1,35 @@
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.routers.v1.storage import router
+from app.schemas.storage import StorageStockSchema
+
+app = FastAPI()
+app.include_router(router)
+client = TestClient(app)
+
+@pytest.fixture
+def mock_storage_service():
+    with patch('app.routers.v1.storage.StorageService') as mock:
+        yield mock
+
+def test_get_low_stock(mock_storage_service):
+    mock_service = mock_storage_service.return_value
+    mock_service.get_low_stock = AsyncMock(return_value=[
+        StorageStockSchema(location_id=1, group="Предохранитель", qty=0, updated_at=datetime(2024, 12, 1))
+    ])
+
+    response = client.get("/storage/stock/low?threshold=2")
+    assert response.status_code == 200
+    assert response.json()[0]["group"] == "Предохранитель"
+    mock_service.get_low_stock.assert_awaited_once_with(2)
+
+def test_get_low_stock_negative_threshold(mock_storage_service):
+    response = client.get("/storage/stock/low?threshold=-1")
+    assert response.status_code == 422
+
+def test_check_out_unauthorized(mock_storage_service):
+    response = client.post("/storage/1/check_out", json={"qty": 1})
+    assert response.status_code == 401
@@ -0,0 +1,189 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+from jose import jwt
+from passlib.context import CryptContext
+from sqlalchemy import event, select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import selectinload
+
+import app.models.posts  # noqa: F401 pylint: disable=unused-import
+from app.const import token_algorithm
+from app.core.config import config
+from app.models.auth import UserModel
+from app.models.posts import PostModel
+from app.schemas.auth import CreateUserSchema, UserSchema
+from app.services.auth import AuthDataManager, AuthService, PasswordHasher, get_current_user, token_cache
+
+
+def _token(**claims) -> str:
+    return jwt.encode(
+        {"name": "Иван", "sub": "ivan@example.com", **claims},
+        key=config.token_key.get_secret_value(), algorithm=token_algorithm,
+    )
+
+async def _status(token: str) -> int:
+    with pytest.raises(HTTPException) as exc:
+        await get_current_user(token)
+    return exc.value.status_code
+
+@pytest.mark.asyncio
+async def test_verified_token_is_served_from_cache():
+    token_cache.clear()
+    token = AuthService(None)._create_access_token("Иван", "ivan@example.com")
+    assert "exp" in jwt.get_unverified_claims(token)
+
+    user = await get_current_user(token)
+    assert (user.name, user.email) == ("Иван", "ivan@example.com")
+
+    with patch("app.services.auth.jwt.decode") as decode:
+        assert await get_current_user(token) is user
+    decode.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_legacy_and_expired_tokens():
+    token_cache.clear()
+    later = datetime.now(timezone.utc) + timedelta(minutes=5)
+    earlier = datetime.now(timezone.utc) - timedelta(minutes=5)
+
+    legacy = _token(expires_at=later.strftime("%Y-%m-%d %H:%M:%S"))
+    assert (await get_current_user(legacy)).email == "ivan@example.com"
+
+    assert await _status(_token(expires_at=earlier.strftime("%Y-%m-%d %H:%M:%S"))) == 401
+    assert await _status(_token(exp=int(earlier.timestamp()))) == 401
+    assert await _status(_token()) == 401
+    assert await _status(legacy[:-2] + "xx") == 401
+
+    token = _token(exp=int(time.time()) + 1)
+    await get_current_user(token)
+    with patch("app.services.auth.time.time", return_value=time.time() + 2):
+        assert await _status(token) == 401
+    assert len(token_cache) == 1
+
+@pytest.mark.asyncio
+async def test_repeated_requests_decode_token_once():
+    token_cache.clear()
+    token = AuthService(None)._create_access_token("Иван", "ivan@example.com")
+
+    with patch("app.services.auth.jwt.decode", wraps=jwt.decode) as decode:
+        for _ in range(100):
+            await get_current_user(token)
+        assert decode.call_count == 1
+
+        for _ in range(10):
+            token_cache.clear()
+            await get_current_user(token)
+        assert decode.call_count == 11
+
+@pytest.mark.skipif(not os.environ.get("AEDB_BENCHMARK"), reason="микробенчмарк: AEDB_BENCHMARK=1")
+def test_auth_overhead_microbenchmark(capsys):
+    token = AuthService(None)._create_access_token("Иван", "ivan@example.com")
+    loop = asyncio.new_event_loop()
+    rounds = 2000
+
+    def per_request(clear: bool) -> float:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            if clear:
+                token_cache.clear()
+            loop.run_until_complete(get_current_user(token))
+        return (time.perf_counter() - started) / rounds * 1e6
+
+    try:
+        uncached, cached = per_request(clear=True), per_request(clear=False)
+    finally:
+        loop.close()
+    with capsys.disabled():
+        print(f"\nget_current_user: {uncached:.1f} мкс без кеша, {cached:.1f} мкс с кешем")
+
+def _hasher(rounds: int, **kwargs) -> PasswordHasher:
+    return PasswordHasher(context=CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds), **kwargs)
+
+@pytest.mark.asyncio
+async def test_hashing_runs_in_pool_without_blocking_the_loop():
+    hasher = _hasher(10, workers=1)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    task = asyncio.create_task(ticker())
+    hashed = await asyncio.gather(*(hasher.hash(f"secret{i}") for i in range(3)))
+    task.cancel()
+
+    assert ticks > 3
+    assert await hasher.verify(hashed[0], "secret0")
+    stats = hasher.stats()
+    assert (stats.completed, stats.in_flight, stats.waiting) == (4, 0, 0)
+    assert stats.max_wait_ms > 0
+
+@pytest.mark.asyncio
+async def test_waiting_queue_is_bounded():
+    hasher = _hasher(8, workers=1, max_waiting=1)
+    results = await asyncio.gather(*(hasher.hash("secret") for _ in range(3)), return_exceptions=True)
+    assert [isinstance(r, HTTPException) and r.status_code == 503 for r in results] == [False, False, True]
+    assert hasher.stats().rejected == 1
+
+@pytest.mark.asyncio
+async def test_password_is_rehashed_on_login_when_cost_changes(db_session):
+    login = OAuth2PasswordRequestForm(username="ivan@example.com", password="secret")
+    with patch("app.services.auth.password_hasher", _hasher(4)):
+        await AuthService(db_session).create_user(CreateUserSchema(name="Иван", email=login.username, password="secret"))
+        await AuthService(db_session).authenticate(login)
+    old_hash = await db_session.scalar(select(UserModel.hashed_password))
+
+    hasher = _hasher(5)
+    with patch("app.services.auth.password_hasher", hasher):
+        token = await AuthService(db_session).authenticate(login)
+        with pytest.raises(HTTPException) as exc:
+            await AuthService(db_session).authenticate(OAuth2PasswordRequestForm(username=login.username, password="x"))
+    assert exc.value.status_code == 401
+    assert token.access_token
+    new_hash = await db_session.scalar(select(UserModel.hashed_password))
+    assert old_hash.startswith("$2b$04$") and new_hash.startswith("$2b$05$")
+    assert hasher.stats().rehashed == 1
+
+@pytest.mark.asyncio
+async def test_user_lookup_fetches_one_row_and_no_posts(db_session):
+    user = UserModel(email="ivan@example.com", name="Иван", hashed_password="hash")
+    db_session.add(user)
+    await db_session.flush()
+    db_session.add_all([
+        PostModel(user_id=user.id, title=f"Пост {i}", content="", description="") for i in range(50)
+    ])
+    await db_session.commit()
+    db_session.expunge_all()
+
+    executed = []
+
+    def count_rows(_conn, cursor, statement, *_args):
+        # aiosqlite читает все строки результата при выполнении запроса.
+        executed.append((statement, len(cursor._rows)))
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "after_cursor_execute", count_rows)
+    try:
+        found = await AuthDataManager(db_session, UserSchema).get_user("ivan@example.com")
+    finally:
+        event.remove(engine, "after_cursor_execute", count_rows)
+
+    assert found.hashed_password == "hash"
+    assert [rows for _, rows in executed] == [1]
+    assert "posts" not in executed[0][0]
+
+    model = await db_session.scalar(select(UserModel))
+    with pytest.raises(InvalidRequestError):
+        model.posts
+    model = await db_session.scalar(
+        select(UserModel).options(selectinload(UserModel.posts)).execution_options(populate_existing=True)
+    )
+    assert len(model.posts) == 50
@@ -0,0 +1,62 @@
+import pytest
+
+from app.models.converters import CabinetModel, ConverterModel, LocationModel, MillShopModel, ProductionLineModel
+from app.schemas.sensors import SensorDeviceSchema, SensorRecord
+from app.services.cabinet_health import CabinetHealthService, refresh_cabinet_health, refresh_on_flush
+from app.services.sensor_alerts import SensorAlertService
+from app.services.sensors import SensorIngestBuffer
+
+BASE_TS = 1_730_444_400_000
+
+
+def _record(address: str, minute: int, battery: float, temperature: float) -> SensorRecord:
+    return {
+        "name": address, "address": address, "date": "", "status": "ok",
+        "battery": battery, "temperature": temperature, "ts": BASE_TS + minute * 60_000,
+    }
+
+async def _hierarchy(db_session) -> None:
+    db_session.add_all([
+        MillShopModel(id=1, name="ЛПЦ-10"),
+        ProductionLineModel(id=1, mill_shop_id=1, name="Стан 2000"),
+        LocationModel(id=1, production_line_id=1, name="ЭМП-1"),
+        CabinetModel(id=1, location_id=1, name="Шкаф 1"),
+        CabinetModel(id=2, location_id=1, name="Шкаф 2"),
+        ConverterModel(id=1, cabinet_id=1, brand="Siemens", model="S120"),
+        ConverterModel(id=2, cabinet_id=1, brand="Siemens", model="S120"),
+    ])
+    await db_session.commit()
+    await refresh_cabinet_health(db_session)
+    await db_session.commit()
+
+@pytest.mark.asyncio
+async def test_cabinet_health_is_refreshed_on_flush_and_device_moves(db_session, session_factory):
+    await _hierarchy(db_session)
+    devices = SensorAlertService(db_session)
+    await devices.set_device(SensorDeviceSchema(address="00:01", name="Датчик 1", cabinet_id=1))
+    await devices.set_device(SensorDeviceSchema(address="00:02", name="Датчик 2", cabinet_id=1))
+    service = CabinetHealthService(db_session)
+
+    overview = await service.get_overview()
+    assert [(c.cabinet, c.converter_count, c.sensor_count, c.max_temperature) for c in overview] == [
+        ("Шкаф 1", 2, 0, None), ("Шкаф 2", 0, 0, None),
+    ]
+    assert (overview[0].mill_shop, overview[0].production_line, overview[0].location) == ("ЛПЦ-10", "Стан 2000", "ЭМП-1")
+
+    buffer = SensorIngestBuffer(capacity=100, session_factory=session_factory)
+    buffer.add_flush_handler(refresh_on_flush)
+    buffer.ingest_records([
+        _record("00:01", 0, battery=3.4, temperature=45), _record("00:02", 0, battery=3.1, temperature=52),
+        _record("00:01", 1, battery=3.3, temperature=47), _record("00:09", 1, battery=2.0, temperature=90),
+    ])
+    await buffer.flush()
+
+    db_session.expire_all()
+    [first, second] = await service.get_overview()
+    assert (first.sensor_count, first.max_temperature, first.min_battery, first.ts) == (2, 52, 3.1, BASE_TS + 60_000)
+    assert second.sensor_count == 0
+
+    await devices.set_device(SensorDeviceSchema(address="00:02", name="Датчик 2", cabinet_id=2))
+    [first, second] = await service.get_overview()
+    assert (first.sensor_count, first.max_temperature, first.min_battery) == (1, 47, 3.3)
+    assert (second.sensor_count, second.max_temperature, second.converter_count) == (1, 52, 0)
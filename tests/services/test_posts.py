@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from app.models.auth import UserModel
+from app.models.posts import PostModel
+from app.services.posts import AuthorLoader, PostService, post_count_cache
+
+
+async def _add_posts(db_session, count: int = 5) -> None:
+    post_count_cache.clear()
+    db_session.add_all([
+        UserModel(id=1, email="ivan@example.com", name="Иван", hashed_password="x"),
+        UserModel(id=2, email="petr@example.com", name="Пётр", hashed_password="x"),
+    ])
+    # Два поста с одинаковой датой проверяют сортировку по id внутри даты
+    start = datetime(2024, 12, 1)
+    db_session.add_all([
+        PostModel(
+            id=i, user_id=1 + i % 2, title=f"Пост {i}", content="", description="",
+            created_at=start + timedelta(minutes=min(i, count - 1)),
+        )
+        for i in range(1, count + 1)
+    ])
+    await db_session.commit()
+
+@pytest.mark.asyncio
+async def test_feed_walks_all_posts_by_cursor(db_session):
+    await _add_posts(db_session)
+    service = PostService(db_session)
+
+    seen, pages, cursor = [], [], None
+    while True:
+        feed = await service.get_feed(cursor, 2)
+        seen += [p.id for p in feed.items]
+        pages.append((feed.page, feed.pages, feed.total))
+        cursor = feed.next_cursor
+        if cursor is None:
+            break
+
+    assert seen == [5, 4, 3, 2, 1]
+    assert pages == [(1, 3, 5), (2, 3, 5), (3, 3, 5)]
+
+@pytest.mark.asyncio
+async def test_feed_loads_authors_in_one_query(db_session):
+    await _add_posts(db_session)
+    await PostService(db_session).get_total()
+    statements = []
+    engine = db_session.bind.sync_engine
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        feed = await PostService(db_session).get_feed(None, 5)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert {p.id: p.author.name for p in feed.items} == {5: "Пётр", 4: "Иван", 3: "Пётр", 2: "Иван", 1: "Пётр"}
+    assert len(statements) == 2
+    assert sum("FROM users" in s for s in statements) == 1
+
+@pytest.mark.asyncio
+async def test_total_is_cached(db_session):
+    await _add_posts(db_session, count=2)
+    service = PostService(db_session)
+    assert (await service.get_feed(None, 1)).total == 2
+
+    db_session.add(PostModel(id=3, user_id=1, title="Пост 3", content="", description=""))
+    await db_session.commit()
+    assert (await service.get_feed(None, 1)).total == 2
+
+    post_count_cache.clear()
+    assert (await service.get_feed(None, 1)).total == 3
+
+@pytest.mark.asyncio
+async def test_get_post_and_bad_cursor(db_session):
+    await _add_posts(db_session, count=1)
+    service = PostService(db_session)
+
+    assert (await service.get_post(1)).title == "Пост 1"
+    with pytest.raises(HTTPException) as exc:
+        await service.get_post(2)
+    assert exc.value.status_code == 404
+    with pytest.raises(HTTPException) as exc:
+        await service.get_feed("не-курсор", 10)
+    assert exc.value.status_code == 400
+
+@pytest.mark.asyncio
+async def test_author_loader_propagates_query_errors():
+    session = Mock(execute=AsyncMock(side_effect=RuntimeError("database is down")))
+    loader = AuthorLoader(session)
+
+    with pytest.raises(RuntimeError):
+        await asyncio.wait_for(loader.load_many([1, 2, 1]), timeout=1)
+    session.execute.assert_awaited_once()
+    assert loader._task.done()
@@ -0,0 +1,77 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.routers.v1.auth import router
+from app.services.rate_limit import DatabaseRateLimitBackend, LoginThrottle, MemoryRateLimitBackend, bucket_key
+
+
+async def _takes(backend, count: int, capacity: int = 3, refill: float = 1.0) -> list[float]:
+    return [await backend.take("email:ivan@example.com", capacity, refill) for _ in range(count)]
+
+@pytest.mark.asyncio
+async def test_memory_bucket_refills_and_expires():
+    backend = MemoryRateLimitBackend(maxsize=2)
+    with patch("app.services.rate_limit.time.monotonic", return_value=100.0):
+        assert await _takes(backend, 4) == [0, 0, 0, 1.0]
+    with patch("app.services.rate_limit.time.monotonic", return_value=101.5):
+        assert await _takes(backend, 2) == [0, 0.5]
+    with patch("app.services.rate_limit.time.monotonic", return_value=110.0):
+        assert await backend.take("email:ivan@example.com", 3, 1.0) == 0
+        assert len(backend._buckets) == 1
+    with patch("app.services.rate_limit.time.monotonic", return_value=200.0):
+        assert backend._buckets.get("email:ivan@example.com") is None
+
+@pytest.mark.asyncio
+async def test_database_bucket_is_shared_between_backends(session_factory):
+    first = DatabaseRateLimitBackend(session_factory)
+    second = DatabaseRateLimitBackend(session_factory)
+    with patch("app.services.rate_limit.time.time", return_value=1000.0):
+        assert await _takes(first, 2) == [0, 0]
+        assert await _takes(second, 2) == [0, 1.0]
+    with patch("app.services.rate_limit.time.time", return_value=1002.0):
+        assert await _takes(second, 3) == [0, 0, 1.0]
+
+@pytest.mark.asyncio
+async def test_throttle_limits_by_email_and_ip():
+    throttle = LoginThrottle(MemoryRateLimitBackend())
+    for _ in range(5):
+        await throttle.check("Ivan@example.com", "10.0.0.1")
+    with pytest.raises(HTTPException) as exc:
+        await throttle.check("ivan@example.com ", "10.0.0.2")
+    assert exc.value.status_code == 429
+    assert int(exc.value.headers["Retry-After"]) > 0
+
+    for i in range(15):
+        await throttle.check(f"user{i}@example.com", "10.0.0.1")
+    with pytest.raises(HTTPException):
+        await throttle.check("other@example.com", "10.0.0.1")
+    await throttle.check("other@example.com", "10.0.0.3")
+    assert throttle.rejected == 2
+
+@pytest.mark.asyncio
+async def test_bucket_keys_have_fixed_length(session_factory):
+    throttle = LoginThrottle(DatabaseRateLimitBackend(session_factory))
+    with patch.object(throttle.backend, "take", wraps=throttle.backend.take) as take:
+        await throttle.check(" Ivan@Example.com", "127.0.0.1")
+        await throttle.check("x" * 10_000 + "@example.com", "127.0.0.1")
+    keys = [call.args[0] for call in take.call_args_list]
+    assert keys[0] == bucket_key("email", "ivan@example.com")
+    assert keys[1] == keys[3] == bucket_key("ip", "127.0.0.1")
+    assert {len(key) for key in keys} <= {67, 70}
+
+def test_login_is_rejected_before_authentication():
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+    with patch("app.services.rate_limit.login_throttle", LoginThrottle(MemoryRateLimitBackend())), \
+            patch("app.routers.v1.auth.AuthService") as service:
+        service.return_value.authenticate = AsyncMock(return_value={"access_token": "x", "token_type": "bearer"})
+        statuses = [
+            client.post("/token", data={"username": "ivan@example.com", "password": "x"}).status_code
+            for _ in range(6)
+        ]
+    assert statuses == [200] * 5 + [429]
+    assert service.return_value.authenticate.await_count == 5
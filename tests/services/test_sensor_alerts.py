@@ -0,0 +1,148 @@
+import pytest
+from fastapi import HTTPException
+
+from app.schemas.sensors import (
+    SensorAlertRuleCreateSchema,
+    SensorAlertRuleSchema,
+    SensorDeviceSchema,
+    SensorRecord,
+)
+from app.services.sensor_alerts import SensorAlertEngine, SensorAlertService
+from app.services.sensors import SensorIngestBuffer, sensor_window
+
+BASE_TS = 1_730_444_400_000
+
+
+def _record(address: str, minute: float, battery: float = 3.5, temperature: float = 40.0) -> SensorRecord:
+    return {
+        "name": address, "address": address, "date": "", "status": "ok",
+        "battery": battery, "temperature": temperature, "ts": BASE_TS + int(minute * 60_000),
+    }
+
+async def _setup(db_session, session_factory) -> SensorIngestBuffer:
+    sensor_window.clear()
+    service = SensorAlertService(db_session)
+    await service.add_rule(SensorAlertRuleCreateSchema(field="battery", kind="min", threshold=3.0))
+    await service.add_rule(SensorAlertRuleCreateSchema(group="Шкаф", field="temperature", kind="max", threshold=60))
+    await service.add_rule(SensorAlertRuleCreateSchema(field="temperature", kind="rise", threshold=5, window=300))
+    await service.set_device(SensorDeviceSchema(address="00:01", name="Датчик 1", group="Шкаф"))
+    buffer = SensorIngestBuffer(capacity=100, session_factory=session_factory)
+    buffer.add_flush_handler(SensorAlertEngine().evaluate)
+    return buffer
+
+@pytest.mark.asyncio
+async def test_alerts_fire_and_resolve_once(db_session, session_factory):
+    buffer = await _setup(db_session, session_factory)
+    service = SensorAlertService(db_session)
+
+    buffer.ingest_records([_record("00:01", 0, battery=2.9, temperature=61), _record("00:02", 0, temperature=61)])
+    await buffer.flush()
+    active = await service.get_alerts(active=True, address=None, limit=10)
+    assert sorted((a.address, a.kind) for a in active) == [("00:01", "max"), ("00:01", "min")]
+
+    buffer.ingest_records([_record("00:01", 1, battery=2.8, temperature=62)])
+    await buffer.flush()
+    assert len(await service.get_alerts(active=True, address=None, limit=10)) == 2
+
+    buffer.ingest_records([_record("00:01", 2, battery=3.4, temperature=50)])
+    await buffer.flush()
+    assert await service.get_alerts(active=True, address=None, limit=10) == []
+    history = await service.get_alerts(active=False, address="00:01", limit=10)
+    assert sorted((a.kind, a.value, a.resolved_at) for a in history) == [
+        ("max", 61.0, BASE_TS + 120_000), ("min", 2.9, BASE_TS + 120_000),
+    ]
+
+@pytest.mark.asyncio
+async def test_every_reading_of_a_batch_is_evaluated_in_ts_order(db_session, session_factory):
+    buffer = await _setup(db_session, session_factory)
+    service = SensorAlertService(db_session)
+
+    buffer.ingest_records([_record("00:02", 1, battery=3.4), _record("00:02", 0, battery=2.9)])
+    await buffer.flush()
+    assert await service.get_alerts(active=True, address="00:02", limit=10) == []
+    [alert] = await service.get_alerts(active=False, address="00:02", limit=10)
+    assert (alert.kind, alert.value, alert.fired_at, alert.resolved_at) == ("min", 2.9, BASE_TS, BASE_TS + 60_000)
+
+    buffer.ingest_records([_record("00:02", 2, battery=2.9)])
+    await buffer.flush()
+    buffer.ingest_records([
+        _record("00:02", 3, battery=3.4), _record("00:02", 4, battery=2.7), _record("00:02", 5, battery=2.6),
+    ])
+    await buffer.flush()
+    history = await service.get_alerts(active=False, address="00:02", limit=10)
+    assert [(a.value, a.fired_at, a.resolved_at) for a in history] == [
+        (2.7, BASE_TS + 240_000, None),
+        (2.9, BASE_TS + 120_000, BASE_TS + 180_000),
+        (2.9, BASE_TS, BASE_TS + 60_000),
+    ]
+
+@pytest.mark.asyncio
+async def test_rise_rule_uses_recent_window(db_session, session_factory):
+    buffer = await _setup(db_session, session_factory)
+    service = SensorAlertService(db_session)
+
+    buffer.ingest_records([_record("00:03", 0, temperature=40), _record("00:03", 3, temperature=44)])
+    await buffer.flush()
+    assert await service.get_alerts(active=True, address="00:03", limit=10) == []
+
+    buffer.ingest_records([_record("00:03", 4, temperature=46)])
+    await buffer.flush()
+    [alert] = await service.get_alerts(active=True, address="00:03", limit=10)
+    assert (alert.kind, alert.value) == ("rise", 6.0)
+
+    buffer.ingest_records([_record("00:03", 10, temperature=47)])
+    await buffer.flush()
+    assert await service.get_alerts(active=True, address="00:03", limit=10) == []
+
+def test_check_is_vectorized_over_rules_and_sensors():
+    rules = [
+        SensorAlertRuleSchema(id=1, field="battery", kind="min", threshold=3.0),
+        SensorAlertRuleSchema(id=2, group="Шкаф", field="temperature", kind="max", threshold=60),
+    ]
+    applicable, violated, observed = SensorAlertEngine().check(
+        rules,
+        {"00:01": "Шкаф"},
+        [_record("00:01", 0, battery=2.5, temperature=70), _record("00:02", 0, battery=3.5, temperature=70)],
+    )
+    assert applicable.tolist() == [[True, True], [True, False]]
+    assert violated.tolist() == [[True, False], [True, False]]
+    assert observed.tolist() == [[2.5, 3.5], [70.0, 70.0]]
+
+@pytest.mark.asyncio
+async def test_disabling_rule_resolves_its_alerts(db_session, session_factory):
+    buffer = await _setup(db_session, session_factory)
+    service = SensorAlertService(db_session)
+    buffer.ingest_records([_record("00:02", 0, battery=2.9)])
+    await buffer.flush()
+    [alert] = await service.get_alerts(active=True, address="00:02", limit=10)
+
+    rule = SensorAlertRuleCreateSchema(field="battery", kind="min", threshold=3.0, enabled=False)
+    assert (await service.update_rule(alert.rule_id, rule)).enabled is False
+    assert await service.get_alerts(active=True, address="00:02", limit=10) == []
+
+    with pytest.raises(HTTPException) as exc:
+        await service.update_rule(42, rule)
+    assert exc.value.status_code == 404
+
+@pytest.mark.asyncio
+async def test_group_change_resolves_alerts_of_rules_no_longer_applicable(db_session, session_factory):
+    buffer = await _setup(db_session, session_factory)
+    service = SensorAlertService(db_session)
+    await service.set_device(SensorDeviceSchema(address="00:02", name="Датчик 2", group="Шкаф"))
+    buffer.ingest_records([_record("00:01", 0, temperature=61), _record("00:02", 0, temperature=61)])
+    await buffer.flush()
+    alerts = await service.get_alerts(active=True, address=None, limit=10)
+    assert sorted(a.address for a in alerts) == ["00:01", "00:02"]
+
+    await service.set_device(SensorDeviceSchema(address="00:02", name="Датчик 2", group="Щит"))
+    assert [a.address for a in await service.get_alerts(active=True, address=None, limit=10)] == ["00:01"]
+
+    rule = SensorAlertRuleCreateSchema(group="Щит", field="temperature", kind="max", threshold=60)
+    await service.update_rule(alerts[0].rule_id, rule)
+    assert await service.get_alerts(active=True, address=None, limit=10) == []
+
+@pytest.mark.asyncio
+async def test_delete_unknown_rule(db_session):
+    with pytest.raises(HTTPException) as exc:
+        await SensorAlertService(db_session).delete_rule(42)
+    assert exc.value.status_code == 404
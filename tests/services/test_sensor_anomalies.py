@@ -0,0 +1,75 @@
+import numpy as np
+
+from app.services.sensor_anomalies import SensorAnomalyDetector
+
+MINUTE = 60_000
+
+
+def _feed(detector, address, temperatures, batteries, start=0):
+    n = len(temperatures)
+    ts = np.arange(start, start + n) * MINUTE
+    detector.update([address] * n, ts, np.asarray(batteries), np.asarray(temperatures))
+
+
+def test_stable_sensors_are_not_flagged():
+    detector = SensorAnomalyDetector(max_sensors=4, alpha=0.1, threshold=3.0, warmup=10)
+    rng = np.random.default_rng(0)
+    _feed(detector, "00:01", 40 + rng.normal(0, 0.5, 100), np.linspace(100, 90, 100))
+    assert detector.anomalies() == []
+
+
+def test_temperature_jump_is_flagged_against_own_baseline():
+    detector = SensorAnomalyDetector(max_sensors=4, alpha=0.1, threshold=3.0, warmup=10)
+    rng = np.random.default_rng(1)
+    _feed(detector, "00:01", 40 + rng.normal(0, 0.5, 50), np.full(50, 90.0))
+    _feed(detector, "00:02", 80 + rng.normal(0, 0.5, 50), np.full(50, 90.0))
+    _feed(detector, "00:01", [48.0], [90.0], start=50)
+    _feed(detector, "00:02", [80.2], [90.0], start=50)
+
+    [anomaly] = detector.anomalies()
+    assert anomaly.address == "00:01"
+    assert anomaly.fields == ["temperature"]
+    assert anomaly.temperature == 48.0
+    assert anomaly.temperature_z > 3
+    assert detector.anomalies() is detector.anomalies()
+
+    _feed(detector, "00:01", [40.0], [90.0], start=51)
+    assert detector.anomalies() == []
+
+
+def test_discharge_rate_is_tracked_per_hour():
+    detector = SensorAnomalyDetector(max_sensors=4, alpha=0.1, threshold=3.0, warmup=10)
+    batteries = 100 - np.arange(50) * 0.01 + np.tile([0.0, 0.002], 25)
+    _feed(detector, "00:01", np.full(50, 40.0), batteries)
+    _feed(detector, "00:01", [40.0], [batteries[-1] - 1.0], start=50)
+
+    [anomaly] = detector.anomalies()
+    assert anomaly.fields == ["discharge_rate"]
+    assert anomaly.discharge_rate < -50
+
+
+def test_batch_with_interleaved_sensors_matches_sequential_updates():
+    rng = np.random.default_rng(2)
+    temperatures = 40 + rng.normal(0, 1, (2, 30))
+    batteries = np.linspace(100, 95, 30)
+    sequential = SensorAnomalyDetector(max_sensors=4, warmup=5)
+    batched = SensorAnomalyDetector(max_sensors=4, warmup=5)
+    for i in range(30):
+        for k, address in enumerate(("00:01", "00:02")):
+            sequential.update([address], np.array([i * MINUTE]), batteries[i:i + 1], temperatures[k, i:i + 1])
+
+    addresses = ["00:02", "00:01"] * 30
+    ts = np.repeat(np.arange(30) * MINUTE, 2)[::-1]
+    battery = np.repeat(batteries, 2)[::-1]
+    temperature = np.stack([temperatures[1], temperatures[0]], axis=1).ravel()[::-1]
+    batched.update(addresses[::-1], ts, battery, temperature)
+
+    np.testing.assert_allclose(batched._mean, sequential._mean)
+    np.testing.assert_allclose(batched._var, sequential._var)
+    np.testing.assert_allclose(batched._z, sequential._z)
+
+
+def test_sensors_beyond_capacity_are_ignored():
+    detector = SensorAnomalyDetector(max_sensors=1)
+    detector.update(["00:01", "00:02"], np.array([0, 0]), np.array([90.0, 90.0]), np.array([40.0, 40.0]))
+    assert detector._addresses == ["00:01"]
@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+import pytest
+
+from app.schemas.sensors import SensorAlertRuleCreateSchema, SensorDeviceSchema, SensorRecord
+from app.services.sensor_alerts import SensorAlertEngine, SensorAlertService
+from app.services.sensor_events import SensorEventHub, get_group_addresses, stream_events
+from app.services.sensors import SensorIngestBuffer
+
+BASE_TS = 1_730_444_400_000
+
+
+def _record(address: str, minute: int, battery: float = 3.5) -> SensorRecord:
+    return {
+        "name": address, "address": address, "date": "", "status": "ok",
+        "battery": battery, "temperature": 40.0, "ts": BASE_TS + minute * 60_000,
+    }
+
+@pytest.mark.asyncio
+async def test_publish_filters_by_address():
+    hub = SensorEventHub()
+    everyone = hub.subscribe()
+    only_first = hub.subscribe(["00:01", "00:09"])
+    nobody = hub.subscribe(["00:03"])
+
+    hub.publish("reading", [{"address": "00:01", "ts": 1}, {"address": "00:02", "ts": 2}, {"address": "00:01", "ts": 3}])
+
+    event, data = await everyone.get(0.1)
+    assert (event, [item["ts"] for item in json.loads(data)]) == ("reading", [1, 2, 3])
+    event, data = await only_first.get(0.1)
+    assert [item["ts"] for item in json.loads(data)] == [1, 3]
+    with pytest.raises(asyncio.TimeoutError):
+        await nobody.get(0.01)
+    assert hub.published == 1
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_dropped_without_blocking():
+    hub = SensorEventHub(queue_size=2)
+    slow = hub.subscribe()
+    fast = hub.subscribe()
+
+    for ts in range(3):
+        hub.publish("reading", [{"address": "00:01", "ts": ts}])
+        assert await fast.get(0.1)
+
+    assert (len(hub), hub.dropped) == (1, 1)
+    assert slow.closed
+    assert await slow.get(0.1) is None
+
+    hub.close()
+    assert await fast.get(0.1) is None
+
+@pytest.mark.asyncio
+async def test_stream_events_formats_sse_and_unsubscribes():
+    hub = SensorEventHub()
+    subscriber = hub.subscribe()
+    hub.publish("alert", [{"address": "00:01", "active": True}])
+    subscriber.close()
+
+    chunks = [chunk async for chunk in stream_events(subscriber, hub, keepalive=0.01)]
+    assert chunks == ['event: alert\ndata: [{"address": "00:01", "active": true}]\n\n']
+    assert len(hub) == 0
+
+@pytest.mark.asyncio
+async def test_committed_readings_and_alerts_are_published(db_session, session_factory):
+    service = SensorAlertService(db_session)
+    await service.add_rule(SensorAlertRuleCreateSchema(field="battery", kind="min", threshold=3.0))
+    await service.set_device(SensorDeviceSchema(address="00:01", name="Датчик 1", group="Шкаф"))
+    assert await get_group_addresses(["Шкаф"], session_factory) == {"00:01"}
+
+    hub = SensorEventHub()
+    subscriber = hub.subscribe({"00:01"})
+    buffer = SensorIngestBuffer(capacity=100, session_factory=session_factory)
+    buffer.add_flush_handler(SensorAlertEngine().evaluate)
+    buffer.add_commit_handler(hub.on_commit)
+
+    buffer.ingest_records([_record("00:01", 0, battery=2.9), _record("00:02", 0)])
+    await buffer.flush()
+
+    event, data = await subscriber.get(0.1)
+    assert (event, [r["address"] for r in json.loads(data)]) == ("reading", ["00:01"])
+    event, data = await subscriber.get(0.1)
+    [alert] = json.loads(data)
+    assert (event, alert["field"], alert["active"]) == ("alert", "battery", True)
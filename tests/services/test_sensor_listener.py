@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from app.const import sensor_max_line_bytes
+from app.services.sensor_listener import LineProtocolParser, SensorListener
+from app.services.sensors import SensorIngestBuffer, parse_sensor_date
+
+
+def test_line_protocol_parser():
+    parser = LineProtocolParser()
+    records = parser.parse([
+        b"00:01,1730444400,ok,3.5,40.5",
+        b"00:02,1730444400123,low,2.9,-1",
+        b"00:03,2024-11-01 10:00:00,ok,3.5,40.5\r",
+        b"",
+        b"00:04,yesterday,ok,3.5,40.5",
+        b"00:05,1730444400,ok,3.5",
+        b"00:06,1730444400,ok,nan,40.5",
+    ])
+    assert [(r["address"], r["ts"], r["status"], r["temperature"]) for r in records] == [
+        ("00:01", 1_730_444_400_000, "ok", 40.5),
+        ("00:02", 1_730_444_400_123, "low", -1.0),
+        ("00:03", parse_sensor_date("2024-11-01 10:00:00"), "ok", 40.5),
+    ]
+    assert parser.errors == 3
+
+async def _wait_for(predicate) -> None:
+    for _ in range(200):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+
+@pytest.mark.asyncio
+async def test_listener_accepts_udp_and_tcp_over_loopback():
+    buffer = SensorIngestBuffer(capacity=100)
+    listener = SensorListener(buffer)
+    await listener.start("127.0.0.1", udp_port=0, tcp_port=0)
+    try:
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(
+            asyncio.DatagramProtocol, remote_addr=listener.udp_address
+        )
+        transport.sendto(b"00:01,1730444400,ok,3.5,40.5\n00:02,1730444400,ok,3.4,41.0")
+        transport.close()
+        await _wait_for(lambda: buffer.pending == 2)
+
+        reader, writer = await asyncio.open_connection(*listener.tcp_address)
+        writer.write(b"00:03,1730444400,ok,3.5,40.5\n00:03,17304")
+        await writer.drain()
+        writer.write(b"44401,ok,3.5,40.6\nbroken\n00:03,1730444402,ok,3.5,40.7")
+        writer.close()
+        await writer.wait_closed()
+        await _wait_for(lambda: buffer.pending == 5)
+    finally:
+        await listener.stop()
+
+    assert buffer.pending == 5
+    assert [r["ts"] for r in buffer._pending[2:]] == [1_730_444_400_000, 1_730_444_401_000, 1_730_444_402_000]
+    assert (listener.received, listener.parser.errors) == (5, 1)
+
+@pytest.mark.asyncio
+async def test_stop_closes_open_tcp_connections():
+    buffer = SensorIngestBuffer(capacity=100)
+    listener = SensorListener(buffer)
+    await listener.start("127.0.0.1", tcp_port=0)
+    reader, writer = await asyncio.open_connection(*listener.tcp_address)
+    try:
+        writer.write(b"00:01,1730444400,ok,3.5,40.5\n")
+        await writer.drain()
+        await _wait_for(lambda: buffer.pending == 1)
+
+        await asyncio.wait_for(listener.stop(), timeout=2)
+        assert await asyncio.wait_for(reader.read(), timeout=2) == b""
+    finally:
+        writer.close()
+    assert buffer.pending == 1
+
+@pytest.mark.asyncio
+async def test_overlong_tcp_line_closes_connection():
+    buffer = SensorIngestBuffer(capacity=100)
+    listener = SensorListener(buffer)
+    await listener.start("127.0.0.1", tcp_port=0)
+    reader, writer = await asyncio.open_connection(*listener.tcp_address)
+    try:
+        writer.write(b"00:01,1730444400,ok,3.5,40.5\n")
+        writer.write(b"x" * (sensor_max_line_bytes + 1))
+        await writer.drain()
+        assert await asyncio.wait_for(reader.read(), timeout=2) == b""
+    finally:
+        writer.close()
+        await listener.stop()
+    assert buffer.pending == 1
+    assert listener.parser.errors == 1
@@ -0,0 +1,95 @@
+import gzip
+import json
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import event, func, select
+
+from app.models.sensors import SensorReadingModel, SensorRollupModel
+from app.schemas.sensors import Sensor
+from app.services.sensor_retention import SensorRetentionJob
+from app.services.sensors import SensorIngestBuffer
+
+NOW = datetime(2024, 11, 10, 12, tzinfo=timezone.utc)
+
+
+async def _ingest(session_factory, dates: list[str]) -> None:
+    buffer = SensorIngestBuffer(session_factory=session_factory)
+    buffer.ingest([
+        Sensor(name="Датчик", address="00:01", date=date, status="ok", battery=3.1, temperature=40.5)
+        for date in dates
+    ])
+    await buffer.flush()
+
+async def _days(session_factory) -> list[int]:
+    async with session_factory() as session:
+        return (await session.scalars(select(SensorReadingModel.day).distinct().order_by(SensorReadingModel.day))).all()
+
+@pytest.mark.asyncio
+async def test_expired_days_are_archived_and_dropped(session_factory, tmp_path):
+    await _ingest(session_factory, [
+        "2024-11-01T10:00:00Z", "2024-11-01T11:00:00Z", "2024-11-02T10:00:00Z", "2024-11-09T10:00:00Z",
+    ])
+    job = SensorRetentionJob(retention_days=7, archive_path=str(tmp_path), pause=0, session_factory=session_factory)
+
+    result = await job.run(now=NOW)
+    assert result.deleted == 3
+    assert [path.split("/")[-1] for path in result.archived] == [
+        "sensor_readings_2024-11-01.ndjson.gz", "sensor_readings_2024-11-02.ndjson.gz",
+    ]
+    with gzip.open(result.archived[0], "rt", encoding="utf-8") as archive:
+        rows = [json.loads(line) for line in archive]
+    assert [row["date"] for row in rows] == ["2024-11-01T10:00:00Z", "2024-11-01T11:00:00Z"]
+    assert not list(tmp_path.glob("*.tmp"))
+
+    assert await _days(session_factory) == [result.days[-1] + 7]
+    async with session_factory() as session:
+        count = await session.scalar(
+            select(func.sum(SensorRollupModel.count)).where(SensorRollupModel.resolution == 86_400_000)
+        )
+    assert count == 4
+
+    assert (await job.run(now=NOW)).deleted == 0
+
+@pytest.mark.asyncio
+async def test_pass_is_bounded_and_disabled_without_retention(session_factory):
+    await _ingest(session_factory, ["2024-11-01T10:00:00Z", "2024-11-02T10:00:00Z", "2024-11-03T10:00:00Z"])
+
+    assert (await SensorRetentionJob(retention_days=None, session_factory=session_factory).run(now=NOW)).days == []
+
+    job = SensorRetentionJob(retention_days=1, max_days=2, pause=0, session_factory=session_factory)
+    result = await job.run(now=NOW)
+    assert (len(result.days), result.deleted, result.archived) == (2, 2, [])
+    assert len(await _days(session_factory)) == 1
+
+@pytest.mark.asyncio
+async def test_readings_arriving_after_archive_are_kept_until_next_pass(session_factory, tmp_path):
+    await _ingest(session_factory, [f"2024-11-01T10:00:0{i}Z" for i in range(3)])
+    job = SensorRetentionJob(retention_days=7, archive_path=str(tmp_path), pause=0, session_factory=session_factory)
+    archive_day = job.archive_day
+
+    async def archive_then_receive(day, last_id):
+        path = await archive_day(day, last_id)
+        await _ingest(session_factory, ["2024-11-01T10:00:09Z"])
+        return path
+
+    job.archive_day = archive_then_receive
+    async with session_factory() as session:
+        engine = session.bind.sync_engine
+    deletes = []
+    listener = lambda conn, cursor, statement, *args: deletes.append(statement) if statement.startswith("DELETE") else None
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        result = await job.run(now=NOW)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert (result.deleted, len(deletes)) == (3, 1)
+    assert len(await _days(session_factory)) == 1
+
+    job.archive_day = archive_day
+    result = await job.run(now=NOW)
+    assert result.deleted == 1
+    assert await _days(session_factory) == []
+    with gzip.open(result.archived[0], "rt", encoding="utf-8") as archive:
+        rows = [json.loads(line) for line in archive]
+    assert [row["date"][-3:] for row in rows] == ["00Z", "01Z", "02Z", "09Z"]
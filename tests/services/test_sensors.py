@@ -0,0 +1,341 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select
+
+import app.services.sensors as sensors_module
+from app.models.sensors import SensorDeviceModel, SensorReadingModel
+from app.schemas.sensors import Sensor, SensorData
+from app.services.sensors import (
+    MS_PER_DAY,
+    SensorIngestBuffer,
+    SensorService,
+    decode_binary_batch,
+    encode_binary_batch,
+    ingest_ndjson,
+    parse_sensor_date,
+    get_recent_readings,
+    select_rollup_resolution,
+    sensor_latest_cache,
+    sensor_window,
+    stream_readings,
+)
+
+
+def _sensors(count: int, address: str | None = None, date: str = "2024-11-01 10:00:00") -> list[Sensor]:
+    def reading_date(i: int) -> str:
+        # Показания одного датчика различаются временем, иначе они отбрасываются как повторы.
+        if address is None or i == 0:
+            return date
+        return str(datetime.fromisoformat(date) + timedelta(seconds=i))
+
+    return [
+        Sensor(name="Датчик", address=address or f"00:{i:02x}", date=reading_date(i),
+               status="ok", battery=3.1, temperature=40.5 + i)
+        for i in range(count)
+    ]
+
+async def _count(session_factory) -> int:
+    async with session_factory() as session:
+        return await session.scalar(select(func.count(SensorReadingModel.id)))
+
+@pytest.mark.asyncio
+async def test_buffer_flushes_in_batches(session_factory):
+    buffer = SensorIngestBuffer(capacity=100, batch_size=4, flush_interval=60, session_factory=session_factory)
+
+    result = buffer.ingest(_sensors(10))
+    assert (result.accepted, result.pending) == (10, 10)
+    assert await _count(session_factory) == 0
+
+    assert await buffer.flush() == 10
+    assert await _count(session_factory) == 10
+    stats = buffer.stats()
+    assert (stats.pending, stats.accepted, stats.written, stats.flushes) == (0, 10, 10, 1)
+
+@pytest.mark.asyncio
+async def test_failing_flush_handler_is_isolated(session_factory):
+    buffer = SensorIngestBuffer(capacity=100, flush_interval=60, session_factory=session_factory)
+    calls = []
+
+    async def failing(session, batch, latest):
+        await session.execute(insert(SensorDeviceModel), [{"address": "00:00", "name": "Датчик"}])
+        raise ValueError("bad rule")
+
+    async def counting(session, batch, latest):
+        calls.append(len(batch))
+
+    buffer.add_flush_handler(failing)
+    buffer.add_flush_handler(counting)
+    buffer.ingest(_sensors(3))
+    assert await buffer.flush() == 3
+
+    assert (buffer.pending, buffer.stats().handler_errors, calls) == (0, 1, [3])
+    assert await _count(session_factory) == 3
+    async with session_factory() as session:
+        assert await session.scalar(select(func.count()).select_from(SensorDeviceModel)) == 0
+
+@pytest.mark.asyncio
+async def test_full_buffer_rejects_with_429(session_factory):
+    buffer = SensorIngestBuffer(capacity=5, batch_size=100, flush_interval=60, session_factory=session_factory)
+    buffer.ingest(_sensors(4))
+
+    with pytest.raises(HTTPException) as exc:
+        buffer.ingest(_sensors(2, date="2024-11-01 10:01:00"))
+    assert exc.value.status_code == 429
+    assert (buffer.pending, buffer.rejected) == (4, 2)
+
+@pytest.mark.asyncio
+async def test_background_flush_by_size_and_on_stop(session_factory):
+    buffer = SensorIngestBuffer(capacity=100, batch_size=5, flush_interval=60, session_factory=session_factory)
+    await buffer.start()
+
+    buffer.ingest(_sensors(5))
+    for _ in range(100):
+        if buffer.written == 5:
+            break
+        await asyncio.sleep(0.01)
+    assert await _count(session_factory) == 5
+
+    buffer.ingest(_sensors(3, date="2024-11-01 10:01:00"))
+    await buffer.stop()
+    assert await _count(session_factory) == 8
+    assert buffer.pending == 0
+
+def test_parse_sensor_date():
+    expected = int(datetime(2024, 11, 1, 7, tzinfo=timezone.utc).timestamp() * 1000)
+    assert parse_sensor_date("2024-11-01 10:00:00") == expected
+    assert parse_sensor_date("2024-11-01T07:00:00Z") == expected
+    assert parse_sensor_date("01.11.2024 10:00:00") == expected
+    assert parse_sensor_date("вчера") is None
+
+@pytest.mark.asyncio
+async def test_readings_are_streamed_by_time_range(session_factory):
+    buffer = SensorIngestBuffer(session_factory=session_factory)
+    for hour in (9, 10, 11):
+        buffer.ingest(_sensors(2, address="00:01", date=f"2024-11-01 {hour:02d}:00:00"))
+    buffer.ingest(_sensors(1, address="00:02", date="2024-11-01 10:00:00"))
+    buffer.ingest(_sensors(1, address="00:01", date="вчера"))
+    await buffer.flush()
+
+    chunks = [
+        chunk async for chunk in stream_readings(
+            "00:01", datetime(2024, 11, 1, 10), datetime(2024, 11, 1, 12), session_factory,
+        )
+    ]
+    readings = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert len(readings) == 4
+    assert {r["address"] for r in readings} == {"00:01"}
+    assert readings[0]["ts"] == parse_sensor_date("2024-11-01 10:00:00")
+    assert readings[-1]["ts"] == parse_sensor_date("2024-11-01 11:00:01")
+    assert readings[0]["ts"] // MS_PER_DAY == 20028
+
+@pytest.mark.asyncio
+async def test_rollups_are_maintained_incrementally(session_factory, db_session):
+    buffer = SensorIngestBuffer(batch_size=3, session_factory=session_factory)
+    buffer.ingest(_sensors(2, address="00:01", date="2024-11-01 10:00:10"))
+    buffer.ingest(_sensors(3, address="00:01", date="2024-11-01 10:00:50"))
+    await buffer.flush()
+    buffer.ingest(_sensors(1, address="00:01", date="2024-11-01 10:01:00"))
+    buffer.ingest(_sensors(1, address="00:02", date="2024-11-01 10:00:00"))
+    await buffer.flush()
+    service = SensorService(db_session)
+
+    minutes = await service.get_rollups("00:01", datetime(2024, 11, 1, 10), datetime(2024, 11, 1, 11), step=60_000)
+    assert minutes.resolution == 60_000
+    assert [(b.count, b.temperature_min, b.temperature_max) for b in minutes.buckets] == [(5, 40.5, 42.5), (1, 40.5, 40.5)]
+    assert minutes.buckets[0].temperature_avg == pytest.approx((40.5 + 41.5 + 40.5 + 41.5 + 42.5) / 5)
+
+    hours = await service.get_rollups("00:01", datetime(2024, 10, 1), datetime(2024, 12, 1))
+    assert hours.resolution == 3_600_000
+    assert [b.count for b in hours.buckets] == [6]
+
+    with pytest.raises(HTTPException) as exc:
+        await service.get_rollups("00:01", datetime(2024, 11, 2), datetime(2024, 11, 1))
+    assert exc.value.status_code == 400
+
+@pytest.mark.asyncio
+async def test_duplicate_readings_are_dropped(session_factory, db_session):
+    buffer = SensorIngestBuffer(batch_size=10, session_factory=session_factory)
+    result = buffer.ingest(_sensors(2, address="00:01") + _sensors(1, address="00:01"))
+    assert (result.accepted, result.duplicates) == (2, 1)
+    assert buffer.ingest(_sensors(2, address="00:01")).accepted == 0
+    await buffer.flush()
+
+    restarted = SensorIngestBuffer(batch_size=10, session_factory=session_factory)
+    assert restarted.ingest(_sensors(3, address="00:01")).accepted == 3
+    assert await restarted.flush() == 1
+    assert await _count(session_factory) == 3
+
+    stats = buffer.stats()
+    assert (stats.accepted, stats.duplicates, stats.written) == (2, 3, 2)
+    assert (restarted.stats().written, restarted.stats().duplicates_stored) == (1, 2)
+
+    rollups = await SensorService(db_session).get_rollups(
+        "00:01", datetime(2024, 11, 1, 10), datetime(2024, 11, 1, 11), step=60_000
+    )
+    assert [b.count for b in rollups.buckets] == [3]
+
+@pytest.mark.asyncio
+async def test_readings_dropped_after_failed_flush_can_be_resent(session_factory):
+    buffer = SensorIngestBuffer(capacity=5, batch_size=10, session_factory=session_factory)
+    buffer.ingest(_sensors(5, address="00:01"))
+
+    def failing_factory():
+        # Пока пакет записывается, в буфер приходят новые показания и занимают его ёмкость
+        buffer.ingest(_sensors(3, address="00:02"))
+        raise ConnectionError("database is down")
+
+    buffer._session_factory = failing_factory
+    assert await buffer.flush() == 0
+    assert (buffer.pending, buffer.dropped) == (5, 3)
+
+    buffer._session_factory = session_factory
+    await buffer.flush()
+    result = buffer.ingest(_sensors(5, address="00:01"))
+    assert (result.accepted, result.duplicates) == (3, 2)
+    await buffer.flush()
+    assert await _count(session_factory) == 8
+
+def test_select_rollup_resolution():
+    assert select_rollup_resolution(1_000) == 60_000
+    assert select_rollup_resolution(600_000) == 60_000
+    assert select_rollup_resolution(3_600_000) == 3_600_000
+    assert select_rollup_resolution(7 * MS_PER_DAY) == MS_PER_DAY
+
+@pytest.mark.asyncio
+async def test_readings_are_downsampled_with_max_points(session_factory):
+    buffer = SensorIngestBuffer(session_factory=session_factory)
+    for minute in range(60):
+        buffer.ingest(_sensors(1, address="00:01", date=f"2024-11-01 10:{minute:02d}:00"))
+    await buffer.flush()
+
+    chunks = [
+        chunk async for chunk in stream_readings(
+            "00:01", datetime(2024, 11, 1, 10), datetime(2024, 11, 1, 11), session_factory, max_points=10,
+        )
+    ]
+    readings = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert len(readings) == 10
+    assert readings[0]["ts"] == parse_sensor_date("2024-11-01 10:00:00")
+    assert readings[-1]["ts"] == parse_sensor_date("2024-11-01 10:59:00")
+
+@pytest.mark.asyncio
+async def test_large_range_is_downsampled_in_chunks(session_factory, monkeypatch):
+    start = parse_sensor_date("2024-11-01 00:00:00")
+    rows = [
+        {
+            "name": "Датчик", "address": "00:01", "date": "", "ts": start + i * 1000,
+            "day": (start + i * 1000) // MS_PER_DAY, "status": "ok", "battery": 3.1,
+            "temperature": 99.0 if i == 12_345 else 40.0 + (i % 50) / 10,
+            "received_at": datetime(2024, 11, 1, tzinfo=timezone.utc),
+        }
+        for i in range(20_000)
+    ]
+    async with session_factory() as session:
+        await session.execute(insert(SensorReadingModel), rows)
+        await session.commit()
+
+    monkeypatch.setattr("app.services.sensors.sensor_downsample_candidates", 400)
+    held = []
+    original_lttb = sensors_module.lttb
+    monkeypatch.setattr(sensors_module, "lttb", lambda x, y, n: held.append(len(x)) or original_lttb(x, y, n))
+    chunks = [
+        chunk async for chunk in stream_readings(
+            "00:01", datetime(2024, 11, 1), datetime(2024, 11, 2), session_factory, max_points=50,
+        )
+    ]
+    readings = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert len(readings) == 50
+    assert held[0] <= 400
+    assert readings[0]["ts"] == start
+    assert readings[-1]["ts"] == start + 19_999_000
+    assert max(r["temperature"] for r in readings) == 99.0
+
+@pytest.mark.asyncio
+async def test_latest_state_is_upserted_and_mirrored(session_factory, db_session):
+    sensor_latest_cache.clear()
+    buffer = SensorIngestBuffer(session_factory=session_factory)
+    buffer.ingest(_sensors(1, address="00:01", date="2024-11-01 10:00:00"))
+    buffer.ingest(_sensors(2, address="00:02", date="2024-11-01 10:00:00"))
+    await buffer.flush()
+    buffer.ingest(_sensors(1, address="00:01", date="2024-11-01 09:00:00"))
+    buffer.ingest(_sensors(1, address="00:02", date="2024-11-01 11:00:00"))
+    await buffer.flush()
+
+    body, etag = await SensorService(db_session).get_latest()
+    latest = json.loads(body)
+    assert [(s["address"], s["ts"]) for s in latest] == [
+        ("00:01", parse_sensor_date("2024-11-01 10:00:00")),
+        ("00:02", parse_sensor_date("2024-11-01 11:00:00")),
+    ]
+    assert (await SensorService(db_session).get_latest())[1] == etag
+
+    sensor_latest_cache.clear()
+    assert await SensorService(db_session).get_latest() == (body, etag)
+
+def test_recent_readings_are_served_from_window():
+    sensor_window.clear()
+    now = datetime.now(timezone.utc)
+    buffer = SensorIngestBuffer(capacity=10)
+    buffer.ingest(_sensors(2, address="00:01", date=now.isoformat()))
+    buffer.ingest(_sensors(1, address="00:01", date=(now.replace(year=now.year - 1)).isoformat()))
+
+    recent = get_recent_readings("00:01", 60)
+    assert len(recent.ts) == 2
+    assert recent.temperature == [40.5, 41.5]
+    assert get_recent_readings("00:02", 60).ts == []
+
+async def _chunks(payload: bytes, size: int):
+    for start in range(0, len(payload), size):
+        yield payload[start:start + size]
+
+@pytest.mark.asyncio
+async def test_ndjson_stream_is_ingested_in_batches():
+    buffer = SensorIngestBuffer(capacity=100)
+    lines = [sensor.model_dump_json().encode() for sensor in _sensors(7)]
+    payload = b"\n".join(lines) + b"\n\n"
+
+    result = await ingest_ndjson(_chunks(payload, 17), buffer, batch_size=3)
+    assert (result.accepted, result.pending) == (7, 7)
+    assert buffer._pending[0]["ts"] == parse_sensor_date("2024-11-01 10:00:00")
+
+    lines = [sensor.model_dump_json().encode() for sensor in _sensors(4, date="2024-11-01 10:01:00")]
+    bad = b"\n".join(lines + [b'{"name": "x"}'])
+    with pytest.raises(HTTPException) as exc:
+        await ingest_ndjson(_chunks(bad, 64), buffer, batch_size=3)
+    assert exc.value.status_code == 422
+    assert exc.value.detail.startswith("Строка 5:")
+    assert buffer.pending == 10
+
+    for value in ("NaN", "Infinity"):
+        line = f'{{"name": "x", "address": "00:09", "date": "2024-11-01 10:02:00", "status": "ok", "battery": {value}, "temperature": 40}}'
+        with pytest.raises(HTTPException) as exc:
+            await ingest_ndjson(_chunks(line.encode(), 64), buffer)
+        assert exc.value.status_code == 422
+    with pytest.raises(ValidationError):
+        SensorData.model_validate_json(
+            '{"sensors": [{"name": "x", "address": "00:09", "date": "", "status": "ok", "battery": NaN, "temperature": Infinity}]}'
+        )
+    assert buffer.pending == 10
+
+def test_binary_batch_round_trip_and_validation():
+    records = [
+        {"name": "Датчик", "address": f"00:0{i}", "date": "", "status": "ok",
+         "battery": 3.5, "temperature": 40.0 + i, "ts": 1_730_444_400_000 + i}
+        for i in range(3)
+    ]
+    payload = encode_binary_batch(records)
+    decoded = decode_binary_batch(payload)
+    assert [(r["address"], r["temperature"], r["ts"]) for r in decoded] == [
+        (r["address"], r["temperature"], r["ts"]) for r in records
+    ]
+    assert decoded[0]["date"] == "2024-11-01T07:00:00.000Z"
+
+    for broken in (payload[:-1], b"XXXX" + payload[4:], payload[:10]):
+        with pytest.raises(HTTPException) as exc:
+            decode_binary_batch(broken)
+        assert exc.value.status_code == 422
@@ -0,0 +1,188 @@
+from datetime import datetime, timedelta, timezone
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.models.speed import ReelModel, RollModel, SpeedModel
+from app.schemas.speed import SpeedMotorSchema, SpeedParamsSchema
+from app.services.speed import (
+    SPEED_LUT_HEADER,
+    SPEED_LUT_ROLL_HEADER,
+    SpeedService,
+    invalidate_speed_tables,
+    speed_lut_cache,
+    speed_table_cache,
+)
+
+
+async def _add_reel(db_session) -> None:
+    invalidate_speed_tables()
+    db_session.add(ReelModel(id=1, name="Моталка 1"))
+    db_session.add_all([RollModel(id=1, name="Ролик 1", reel_id=1), RollModel(id=2, name="Ролик 2", reel_id=1)])
+    for roll_id in (1, 2):
+        for task, tspd, fspd in ((1.0, 100, False), (3.0, 300, True), (2.0, 200, False)):
+            db_session.add(SpeedModel(
+                roll_id=roll_id, task=task * roll_id, tspd=tspd, fspd=fspd,
+                bmav=tspd + 10, bemf=task * 1.5, amav=tspd + 20, aemf=task * 2.5,
+                memf=task * 3.5, corr=fspd,
+            ))
+    await db_session.commit()
+
+@pytest.mark.asyncio
+async def test_roll_setpoints_are_interpolated(db_session):
+    await _add_reel(db_session)
+    tasks = [0.5, 1.0, 1.25, 2.5, 3.0, 10.0]
+
+    setpoints = await SpeedService(db_session).get_roll_setpoints(1, tasks)
+
+    assert setpoints.task == tasks
+    assert setpoints.tspd == [100, 100, 125, 250, 300, 300]
+    np.testing.assert_allclose(setpoints.bemf, np.interp(tasks, [1, 2, 3], [1.5, 3.0, 4.5]))
+    np.testing.assert_allclose(setpoints.memf, np.interp(tasks, [1, 2, 3], [3.5, 7.0, 10.5]))
+    assert setpoints.fspd == [False, False, False, True, True, True]
+    assert setpoints.corr == setpoints.fspd
+
+@pytest.mark.asyncio
+async def test_reel_setpoints_use_cached_tables(db_session):
+    await _add_reel(db_session)
+    service = SpeedService(db_session)
+
+    setpoints = await service.get_reel_setpoints(1, [2.0, 4.0])
+    assert [s.roll_id for s in setpoints] == [1, 2]
+    assert setpoints[0].tspd == [200, 300]
+    assert setpoints[1].tspd == [100, 200]
+    assert len(speed_table_cache) == 2
+
+    table = speed_table_cache.get(1)
+    await service.get_roll_setpoints(1, [1.0])
+    assert speed_table_cache.get(1) is table
+
+    invalidate_speed_tables([1])
+    assert 1 not in speed_table_cache
+    assert 2 in speed_table_cache
+
+@pytest.mark.asyncio
+async def test_setpoints_for_unknown_roll(db_session):
+    await _add_reel(db_session)
+
+    with pytest.raises(HTTPException) as exc:
+        await SpeedService(db_session).get_roll_setpoints(42, [1.0])
+    assert exc.value.status_code == 404
+
+def _params(task: float, tspd: int, corr: bool = False) -> SpeedParamsSchema:
+    return SpeedParamsSchema(
+        task=task, tspd=tspd, fspd=False, bmav=tspd, bemf=1.0,
+        amav=tspd, aemf=2.0, memf=3.0, corr=corr,
+    )
+
+@pytest.mark.asyncio
+async def test_speed_history_as_of_and_diff(db_session):
+    await _add_reel(db_session)
+    service = SpeedService(db_session)
+    await service.get_tables([1])
+
+    first = await service.replace_speeds(1, [_params(2.0, 200), _params(1.0, 100)])
+    assert 1 not in speed_table_cache
+    assert [s.task for s in first.speeds] == [1.0, 2.0]
+
+    second = await service.replace_speeds(1, [_params(1.0, 110), _params(3.0, 300, corr=True)])
+    assert (await service.get_roll_setpoints(1, [1.0, 3.0])).tspd == [110, 300]
+
+    as_of_first = await service.get_speeds_as_of(1, first.valid_from + timedelta(microseconds=1))
+    assert as_of_first.valid_from == first.valid_from
+    assert [s.tspd for s in as_of_first.speeds] == [100, 200]
+    assert (await service.get_speeds_as_of(1, datetime.now(timezone.utc))).valid_from == second.valid_from
+
+    with pytest.raises(HTTPException) as exc:
+        await service.get_speeds_as_of(1, first.valid_from - timedelta(days=1))
+    assert exc.value.status_code == 404
+
+    diff = await service.get_speeds_diff(1, first.valid_from, second.valid_from)
+    assert [s.task for s in diff.added] == [3.0]
+    assert [s.task for s in diff.removed] == [2.0]
+    assert [(c.task, c.fields) for c in diff.changed] == [(1.0, ["tspd", "bmav", "amav"])]
+
+@pytest.mark.asyncio
+async def test_version_with_same_valid_from_conflicts(db_session):
+    await _add_reel(db_session)
+    service = SpeedService(db_session)
+    moment = datetime(2024, 12, 1, 10, tzinfo=timezone.utc)
+
+    with patch("app.services.speed.datetime") as clock:
+        clock.now.return_value = moment
+        await service.replace_speeds(1, [_params(1.0, 100)])
+        with pytest.raises(HTTPException) as exc:
+            await service.replace_speeds(1, [_params(1.0, 120)])
+    assert exc.value.status_code == 409
+    assert [s.tspd for s in await service.get_speeds(1)] == [100]
+
+@pytest.mark.asyncio
+async def test_recalculate_updates_only_changed_rows(db_session):
+    await _add_reel(db_session)
+    service = SpeedService(db_session)
+    await service.get_tables([1, 2])
+    motor = SpeedMotorSchema(emf_per_speed=0.01, emf_limit=3.15)
+
+    result = await service.recalculate(motor)
+    assert (result.rows_total, result.rows_changed, result.rolls_changed) == (6, 6, 2)
+    assert len(speed_table_cache) == 0
+
+    speeds = await service.get_speeds(1)
+    assert [(s.bemf, s.aemf, s.memf, s.corr) for s in speeds] == [
+        (1.1, 1.2, 1.2, False), (2.1, 2.2, 2.2, False), (3.1, 3.2, 3.2, True),
+    ]
+    history = await service.get_speeds_as_of(1, datetime.now(timezone.utc))
+    assert [s.memf for s in history.speeds] == [1.2, 2.2, 3.2]
+    assert [s.tspd for s in history.speeds] == [100, 200, 300]
+
+    result = await service.recalculate(motor)
+    assert (result.rows_total, result.rows_changed, result.rolls_changed) == (6, 0, 0)
+
+    result = await service.recalculate(SpeedMotorSchema(emf_per_speed=0.01, emf_limit=2.0, roll_ids=[2]))
+    assert (result.rows_total, result.rows_changed, result.rolls_changed) == (3, 1, 1)
+
+@pytest.mark.asyncio
+async def test_recalculate_uses_pluggable_emf_model(db_session):
+    await _add_reel(db_session)
+
+    def constant_model(bmav, amav, motor):
+        emf = np.full(bmav.shape, motor.emf_limit)
+        return emf, emf, emf, np.zeros(bmav.shape, dtype=bool)
+
+    service = SpeedService(db_session, emf_model=constant_model)
+    await service.recalculate(SpeedMotorSchema(emf_per_speed=1.0, emf_limit=5.0, roll_ids=[1]))
+    speeds = await service.get_speeds(1)
+    assert {(s.bemf, s.aemf, s.memf, s.corr) for s in speeds} == {(5.0, 5.0, 5.0, False)}
+
+@pytest.mark.asyncio
+async def test_reel_lut_is_compiled_and_cached_until_rows_change(db_session):
+    await _add_reel(db_session)
+    service = SpeedService(db_session)
+
+    lut = await service.get_reel_lut(1)
+    magic, version, _, reel_id, rolls = SPEED_LUT_HEADER.unpack_from(lut.content)
+    assert (magic, version, reel_id, rolls) == (b"ASPD", 1, 1, 2)
+    roll_id, count = SPEED_LUT_ROLL_HEADER.unpack_from(lut.content, SPEED_LUT_HEADER.size)
+    assert (roll_id, count) == (1, 3)
+    offset = SPEED_LUT_HEADER.size + SPEED_LUT_ROLL_HEADER.size
+    np.testing.assert_array_equal(np.frombuffer(lut.content, "<f4", count, offset), [1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(np.frombuffer(lut.content, "<i4", count, offset + 4 * count), [100, 200, 300])
+    flags = np.frombuffer(lut.content, np.uint8, count, offset + 7 * 4 * count)
+    np.testing.assert_array_equal(flags, [0, 0, 3])
+
+    assert await service.get_reel_lut(1) is lut
+
+    speed = (await db_session.execute(select(SpeedModel).where(SpeedModel.roll_id == 2))).scalars().first()
+    speed.tspd += 1
+    await db_session.commit()
+    updated = await service.get_reel_lut(1)
+    assert updated.etag != lut.etag
+    assert speed_lut_cache.get(1) is updated
+
+    with pytest.raises(HTTPException) as exc:
+        await service.get_reel_lut(42)
+    assert exc.value.status_code == 404
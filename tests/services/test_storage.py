@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app.models.storage import StorageLocationModel
+from app.schemas.storage import StorageEquipmentSchema
+from app.services.storage import StorageService, equipment_number_cache
+
+
+async def _add_equipment(db_session, qty: int = 5) -> StorageEquipmentSchema:
+    equipment_number_cache.clear()
+    db_session.add(StorageLocationModel(id=1, name="Коил-Бокс"))
+    await db_session.commit()
+    equipment = StorageEquipmentSchema(
+        group="Автоматический выключатель", name="Merlin Gerin", specs="С60А 6А",
+        qty=qty, install=None, number="100200", notes=None, location_id=1,
+    )
+    return await StorageService(db_session).add_equipment(equipment)
+
+@pytest.mark.asyncio
+async def test_check_in_and_out_update_ledger_and_stock(db_session):
+    equipment = await _add_equipment(db_session)
+    service = StorageService(db_session)
+
+    movement = await service.check_in(equipment.id, 3)
+    assert movement.delta == 3
+    assert movement.qty_after == 8
+
+    movement = await service.check_out(equipment.id, 6, "Замена на стане")
+    assert movement.delta == -6
+    assert movement.qty_after == 2
+
+    movements = await service.get_movements(equipment.id, 10)
+    assert [m.delta for m in movements] == [-6, 3, 5]
+
+    stock = await service.get_stock()
+    assert [(s.location_id, s.group, s.qty) for s in stock] == [(1, "Автоматический выключатель", 2)]
+
+@pytest.mark.asyncio
+async def test_check_out_more_than_available_is_rejected(db_session):
+    equipment = await _add_equipment(db_session, qty=1)
+    service = StorageService(db_session)
+
+    with pytest.raises(HTTPException) as exc:
+        await service.check_out(equipment.id, 2)
+    assert exc.value.status_code == 409
+
+    with pytest.raises(HTTPException) as exc:
+        await service.check_out(equipment.id + 1, 1)
+    assert exc.value.status_code == 404
+
+    stock = await service.get_stock()
+    assert stock[0].qty == 1
+
+@pytest.mark.asyncio
+async def test_concurrent_check_outs_never_oversell(db_session, session_factory):
+    equipment = await _add_equipment(db_session, qty=3)
+
+    async def check_out() -> bool:
+        async with session_factory() as session:
+            try:
+                await StorageService(session).check_out(equipment.id, 1)
+                return True
+            except HTTPException:
+                return False
+
+    results = await asyncio.gather(*(check_out() for _ in range(5)))
+    assert sum(results) == 3
+
+    service = StorageService(db_session)
+    assert (await service.get_stock())[0].qty == 0
+    assert len(await service.get_movements(equipment.id, 10)) == 4
+
+@pytest.mark.asyncio
+async def test_low_stock_and_rebuild(db_session):
+    equipment = await _add_equipment(db_session, qty=1)
+    service = StorageService(db_session)
+
+    low = await service.get_low_stock(threshold=1)
+    assert [s.qty for s in low] == [1]
+
+    await service.check_in(equipment.id, 4)
+    assert await service.get_low_stock(threshold=1) == []
+
+    assert await service.rebuild_stock() == 1
+    assert (await service.get_stock())[0].qty == 5
+
+@pytest.mark.asyncio
+async def test_number_lookup_is_cached_and_invalidated_on_write(db_session):
+    equipment = await _add_equipment(db_session, qty=2)
+    service = StorageService(db_session)
+
+    found = await service.get_by_number("100200")
+    assert [e.qty for e in found] == [2]
+    assert equipment_number_cache.get("100200") is found
+    assert await service.get_by_number("100200") is found
+
+    await service.check_out(equipment.id, 1)
+    assert "100200" not in equipment_number_cache
+    assert [e.qty for e in await service.get_by_number("100200")] == [1]
+
+@pytest.mark.asyncio
+async def test_search_group_and_place_lookups(db_session):
+    await _add_equipment(db_session)
+    location = await db_session.get(StorageLocationModel, 1)
+    location.used_place = "полка 1"
+    await db_session.commit()
+    service = StorageService(db_session)
+
+    assert len(await service.search("merlin", 10)) == 1
+    assert len(await service.search("С60А", 10)) == 1
+    assert await service.search("%", 10) == []
+    assert await service.search("С60_", 10) == []
+    assert len(await service.get_by_group("Автоматический выключатель", location_id=1)) == 1
+    assert await service.get_by_group("Автоматический выключатель", location_id=2) == []
+    assert len(await service.get_by_place("полка 1")) == 1
+
+def test_negative_quantity_is_rejected():
+    with pytest.raises(ValidationError):
+        StorageEquipmentSchema(
+            group="Предохранитель", name=None, specs=None, qty=-1,
+            install=None, number=None, notes=None, location_id=1,
+        )
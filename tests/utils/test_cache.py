@@ -0,0 +1,25 @@
+from unittest.mock import patch
+from app.utils.cache import LRUCache
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+def test_lru_cache_expires_entries():
+    cache = LRUCache(maxsize=2, ttl=10)
+    with patch("app.utils.cache.time.monotonic", return_value=100.0):
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=100)
+    with patch("app.utils.cache.time.monotonic", return_value=150.0):
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.pop("b") == 2
+        assert len(cache) == 0
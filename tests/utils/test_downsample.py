@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from app.utils.downsample import lttb
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(10_000, dtype=np.float64)
+    y = np.sin(x / 500)
+    y[4321] = 25.0
+    y[7000] = -25.0
+
+    indices = lttb(x, y, 100)
+
+    assert len(indices) == 100
+    assert indices[0] == 0 and indices[-1] == 9_999
+    assert np.all(np.diff(indices) > 0)
+    assert 4321 in indices and 7000 in indices
+
+def test_lttb_returns_all_points_when_short():
+    x = np.arange(5, dtype=np.float64)
+    np.testing.assert_array_equal(lttb(x, x, 10), np.arange(5))
+    np.testing.assert_array_equal(lttb(x, x, 2), np.arange(5))
+
+def test_lttb_rejects_mismatched_lengths():
+    with pytest.raises(ValueError):
+        lttb(np.arange(5), np.arange(4), 3)
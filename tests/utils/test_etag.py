@@ -0,0 +1,13 @@
+from app.utils.etag import etag_matches
+
+
+def test_etag_matches_weak_list_and_wildcard():
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches('"x", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert etag_matches('"abc"', 'W/"abc"')
+    assert not etag_matches('"abd"', etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches("", etag)
@@ -0,0 +1,36 @@
+import numpy as np
+
+from app.utils.ringbuffer import ColumnarRingBuffer
+
+DTYPE = np.dtype([("ts", "<i8"), ("value", "<f4")])
+
+
+def _records(ts: list[int]) -> np.ndarray:
+    return np.array([(t, t / 10) for t in ts], dtype=DTYPE)
+
+def test_ring_buffer_keeps_last_records_per_key():
+    buffer = ColumnarRingBuffer(DTYPE, capacity=4, max_keys=2)
+
+    assert buffer.extend(["a", "b", "a"], _records([1, 10, 2])) == 3
+    assert buffer.extend(["a"] * 5, _records([3, 4, 5, 6, 7])) == 5
+    assert buffer.window("a")["ts"].tolist() == [4, 5, 6, 7]
+    assert buffer.window("a", since=6)["ts"].tolist() == [6, 7]
+    assert buffer.window("b")["value"].tolist() == [1.0]
+    assert buffer.window("c").size == 0
+
+    assert buffer.extend(["c", "b"], _records([1, 11])) == 1
+    assert buffer.keys() == ["a", "b"]
+    assert buffer.nbytes == 2 * 4 * DTYPE.itemsize + 2 * 2 * 8
+
+def test_ring_buffer_survives_reopen(tmp_path):
+    buffer = ColumnarRingBuffer(DTYPE, capacity=3, max_keys=2, path=str(tmp_path))
+    buffer.extend(["a", "a", "b", "a", "a"], _records([1, 2, 3, 4, 5]))
+    buffer.flush()
+    del buffer
+
+    reopened = ColumnarRingBuffer(DTYPE, capacity=3, max_keys=2, path=str(tmp_path))
+    assert reopened.window("a")["ts"].tolist() == [2, 4, 5]
+    assert reopened.window("b")["ts"].tolist() == [3]
+
+    resized = ColumnarRingBuffer(DTYPE, capacity=5, max_keys=2, path=str(tmp_path))
+    assert len(resized) == 0